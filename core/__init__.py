@@ -0,0 +1,3 @@
+"""
+Shared building blocks for the syndrome decoding and low-weight codeword packages.
+"""
@@ -0,0 +1,253 @@
+"""
+Packed binary archive of SD/LW instances.
+
+Layout (all integers little-endian):
+    [0, 8)      magic b"SDPACK01"
+    [8, 16)     offset of the index
+    [16, 24)    number of instances
+    data        for each instance, H^T (m rows of n - m bits) then s (m bits), packed in
+                uint64 words as in core.gf2, each block aligned on 8 bytes
+    index       structured array INDEX_DTYPE, one record per instance
+
+The archive is memory-mapped on open and an instance is only read when it is loaded.
+
+Usage (from the repository root):
+    python3 -m core.archive pack <archive> <instance files or directories>...
+    python3 -m core.archive unpack <archive> <output_dir> [names]...
+    python3 -m core.archive list <archive>
+"""
+
+import os
+import sys
+import mmap
+import struct
+import argparse
+
+import numpy as np
+
+from core.gf2 import GF2Matrix, nb_words
+from core.instance import Instance, read_text_instance, format_text_instance, write_text_instance
+
+MAGIC = b"SDPACK01"
+HEADER = struct.Struct("<8sQQ")
+
+INDEX_DTYPE = np.dtype([
+    ("name", "S64"),
+    ("kind", "S2"),
+    ("n", "<i8"),
+    ("seed", "<i8"),
+    ("w", "<i8"),       # -1 for LW instances
+    ("H_offset", "<i8"),
+    ("s_offset", "<i8"),  # -1 for LW instances
+])
+
+
+def _write_words(f, words):
+    """Write a uint64 array at the current (8-byte aligned) position and return its offset."""
+    offset = f.tell()
+    f.write(np.ascontiguousarray(words, dtype="<u8").tobytes())
+    return offset
+
+
+def write_archive(archive_path, instances):
+    """
+    Write instances to a packed archive, one at a time.
+
+    Args:
+        archive_path (str): Path to the archive to create.
+        instances (iterable): (name, Instance) pairs.
+
+    Returns:
+        int: Number of instances written.
+    """
+    records = []
+    seen = set()
+    with open(archive_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, 0))  # Patched once the index is written
+        for name, instance in instances:
+            encoded = name.encode("utf-8")
+            if len(encoded) > INDEX_DTYPE["name"].itemsize:
+                raise ValueError(f"Instance name too long for the archive index: {name}")
+            if name in seen:
+                raise ValueError(f"Duplicate instance name: {name}")
+            seen.add(name)
+            if instance.H_transpose.nrows != instance.n // 2:
+                raise ValueError(f"Only instances with n // 2 equations can be archived (not reduced ones): {name}")
+            H_offset = _write_words(f, instance.H_transpose.words)
+            s_offset = -1
+            if instance.kind == "SD":
+                s_offset = _write_words(f, GF2Matrix.from_strings([instance.s_transpose]).words)
+            w = instance.w if instance.w is not None else -1
+            records.append((encoded, instance.kind.encode("ascii"), instance.n, instance.seed, w, H_offset, s_offset))
+
+        index = np.array(records, dtype=INDEX_DTYPE)
+        index_offset = f.tell()
+        f.write(index.tobytes())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, index_offset, len(records)))
+    return len(records)
+
+
+class InstanceArchive:
+    """
+    Read-only, memory-mapped view of a packed archive.
+
+    Loaded matrices are views on the mapped file: they are read-only, use copy() before
+    modifying them in place.
+    """
+
+    def __init__(self, archive_path):
+        self.path = archive_path
+        self._file = open(archive_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{archive_path} is not an instance archive.")
+        self.index = np.frombuffer(self._mmap, dtype=INDEX_DTYPE, count=count, offset=index_offset)
+        self._positions = {record["name"].decode("utf-8"): i for i, record in enumerate(self.index)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.index = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Loaded instances still reference the mapping, it is released with them
+            pass
+        self._file.close()
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def names(self):
+        """Names of the archived instances, in archive order."""
+        return list(self._positions)
+
+    def load(self, name):
+        """
+        Load one instance without reading the others.
+
+        Args:
+            name (str): Name of the instance (its original file name).
+
+        Returns:
+            Instance: The instance, whose H_transpose is a view on the mapped file.
+        """
+        record = self.index[self._positions[name]]
+        n = int(record["n"])
+        m = n // 2
+        nw = nb_words(n - m)
+        words = np.frombuffer(self._mmap, dtype="<u8", count=m * nw, offset=int(record["H_offset"])).reshape(m, nw)
+        H_transpose = GF2Matrix(words, n - m)
+
+        kind = record["kind"].decode("ascii")
+        if kind == "SD":
+            s_words = np.frombuffer(self._mmap, dtype="<u8", count=nb_words(m), offset=int(record["s_offset"]))
+            s_transpose = GF2Matrix(s_words.reshape(1, -1), m).to_strings()[0]
+            return Instance(kind, n, int(record["seed"]), int(record["w"]), H_transpose, s_transpose)
+        return Instance(kind, n, int(record["seed"]), None, H_transpose, None)
+
+
+def find_instance_files(paths):
+    """
+    Expand files and directories into instance files (regular files without an extension).
+
+    Args:
+        paths (list of str): Files or directories, searched recursively.
+
+    Returns:
+        list of str: Instance file paths.
+    """
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for root, _, entries in os.walk(path):
+            files.extend(os.path.join(root, e) for e in sorted(entries) if '.' not in e)
+    return files
+
+
+def import_text_files(archive_path, paths):
+    """
+    Pack text instance files into an archive, checking that the conversion is lossless.
+
+    Args:
+        archive_path (str): Path to the archive to create.
+        paths (list of str): Instance files or directories.
+
+    Returns:
+        int: Number of instances written.
+    """
+    def instances():
+        for file_name in find_instance_files(paths):
+            instance = read_text_instance(file_name)
+            with open(file_name, "rb") as f:
+                if f.read() != format_text_instance(instance):
+                    raise ValueError(f"{file_name} does not follow the generator format exactly, it cannot be packed losslessly.")
+            yield os.path.basename(file_name), instance
+
+    return write_archive(archive_path, instances())
+
+
+def export_text_files(archive_path, output_dir, names=None):
+    """
+    Unpack instances of an archive to text files named after the instances.
+
+    Args:
+        archive_path (str): Path to the archive.
+        output_dir (str): Directory receiving the text files.
+        names (list of str or None): Instances to export (default: all).
+
+    Returns:
+        int: Number of instances written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    with InstanceArchive(archive_path) as archive:
+        names = names or archive.names()
+        for name in names:
+            write_text_instance(archive.load(name), os.path.join(output_dir, name))
+    return len(names)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m core.archive", description="Packed binary archive of SD/LW instances.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pack = subparsers.add_parser("pack", help="Pack text instances into an archive")
+    pack.add_argument("archive", help="Path to the archive to create")
+    pack.add_argument("inputs", nargs="+", help="Instance files or directories")
+
+    unpack = subparsers.add_parser("unpack", help="Export instances to the text format")
+    unpack.add_argument("archive", help="Path to the archive")
+    unpack.add_argument("output_dir", help="Directory receiving the text files")
+    unpack.add_argument("names", nargs="*", help="Instances to export (default: all)")
+
+    listing = subparsers.add_parser("list", help="List the archived instances")
+    listing.add_argument("archive", help="Path to the archive")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        count = import_text_files(args.archive, args.inputs)
+        print(f"{count} instances packed into {args.archive}")
+    elif args.command == "unpack":
+        count = export_text_files(args.archive, args.output_dir, args.names)
+        print(f"{count} instances written to {args.output_dir}")
+    else:
+        with InstanceArchive(args.archive) as archive:
+            for record in archive.index:
+                w = record["w"] if record["w"] >= 0 else "-"
+                print(f"{record['name'].decode('utf-8')}\t{record['kind'].decode('ascii')}\tn={record['n']}\tseed={record['seed']}\tw={w}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
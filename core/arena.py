@@ -0,0 +1,361 @@
+import itertools
+
+import numpy as np
+
+from core.compress import open_text
+
+# Number of literals rendered at once when clauses are written to a file
+WRITE_BLOCK_LITS = 1 << 20
+
+
+def _grow(array, size):
+    """Return array, or a copy with doubled capacity if it cannot hold size elements."""
+    if size <= len(array):
+        return array
+    grown = np.empty(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def format_clauses(lits, offsets, prefixes=None):
+    """
+    Render consecutive clauses of a flat literal array as DIMACS lines.
+
+    Every line is '<literals> 0', preceded by its prefix and a space when prefixes are given
+    (the weight or 'h' of WCNF clauses). Literals are converted in one pass over the block,
+    without building one list per clause.
+
+    Args:
+        lits (np.ndarray): Literals of the clauses, concatenated.
+        offsets (np.ndarray): Offsets of the clauses in lits (one more than the number of clauses).
+        prefixes (list of str or None): One prefix per clause.
+
+    Returns:
+        str: The lines, each terminated by '\n'.
+    """
+    nclauses = len(offsets) - 1
+    if nclauses == 0:
+        return ""
+    starts = offsets[:-1] - offsets[0]
+    ends = offsets[1:] - offsets[0]
+    extra = 1 if prefixes is None else 2  # Tokens added per clause: '0' and the prefix
+    # Position of the first literal of every clause in the token stream
+    shift = np.arange(nclauses, dtype=np.int64) * extra + (extra - 1)
+    tokens = np.empty(len(lits) + extra * nclauses, dtype=object)
+    tokens[np.arange(len(lits)) + np.repeat(shift, ends - starts)] = list(map(str, lits.tolist()))
+    tokens[ends + shift] = "0"
+    if prefixes is not None:
+        tokens[starts + shift - 1] = prefixes
+    separators = np.full(len(tokens), " ", dtype=object)
+    separators[ends + shift] = "\n"
+    stream = np.empty(2 * len(tokens), dtype=object)
+    stream[0::2] = tokens
+    stream[1::2] = separators
+    return "".join(stream.tolist())
+
+
+class ClauseArena:
+    """
+    Compact clause store: all literals in one flat int32 array, clause i being
+    lits[offsets[i]:offsets[i + 1]].
+
+    It costs 4 bytes per literal (plus 8 per clause) instead of a Python list of int
+    objects per clause, and has the append/extend interface of pysat's CNF so the
+    builders can fill it directly.
+
+    Attributes:
+        nv (int): Largest variable seen so far.
+    """
+
+    def __init__(self, capacity=1024):
+        self._lits = np.empty(capacity, dtype=np.int32)
+        self._offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self._nlits = 0
+        self._nclauses = 0
+        self.nv = 0
+
+    @property
+    def lits(self):
+        """Literals of all clauses, concatenated (a view, valid until the next append)."""
+        return self._lits[:self._nlits]
+
+    @property
+    def offsets(self):
+        """Start offsets of the clauses in lits, followed by the total number of literals."""
+        return self._offsets[:self._nclauses + 1]
+
+    def __len__(self):
+        return self._nclauses
+
+    def __iter__(self):
+        return self.iter_clauses()
+
+    def __repr__(self):
+        return f"ClauseArena(nv={self.nv}, clauses={self._nclauses}, literals={self._nlits})"
+
+    @property
+    def nbytes(self):
+        """Memory used by the stored clauses."""
+        return self.lits.nbytes + self.offsets.nbytes
+
+    def append_arrays(self, lits, lengths):
+        """
+        Bulk append of clauses given as flat arrays.
+
+        Args:
+            lits (array-like): Literals of the new clauses, concatenated.
+            lengths (array-like): Number of literals of each new clause.
+        """
+        lits = np.asarray(lits, dtype=np.int32).reshape(-1)
+        lengths = np.asarray(lengths, dtype=np.int64).reshape(-1)
+        if int(lengths.sum()) != len(lits):
+            raise ValueError("The clause lengths do not match the number of literals.")
+        nlits = self._nlits + len(lits)
+        nclauses = self._nclauses + len(lengths)
+        self._lits = _grow(self._lits, nlits)
+        self._offsets = _grow(self._offsets, nclauses + 1)
+        self._lits[self._nlits:nlits] = lits
+        np.cumsum(lengths, out=self._offsets[self._nclauses + 1:nclauses + 1])
+        self._offsets[self._nclauses + 1:nclauses + 1] += self._nlits
+        if len(lits):
+            self.nv = max(self.nv, int(np.abs(lits).max()))
+        self._nlits = nlits
+        self._nclauses = nclauses
+
+    def append(self, clause):
+        """Append one clause (list of literals)."""
+        self.append_arrays(clause, [len(clause)])
+
+    def extend(self, clauses):
+        """
+        Append a list of clauses, e.g. the clauses of a pysat encoding.
+
+        Args:
+            clauses (list of list of int): The clauses (any iterable of clauses is accepted).
+        """
+        if not hasattr(clauses, "__len__"):
+            clauses = list(clauses)
+        lengths = np.fromiter(map(len, clauses), dtype=np.int64, count=len(clauses))
+        lits = np.fromiter(itertools.chain.from_iterable(clauses), dtype=np.int32, count=int(lengths.sum()))
+        self.append_arrays(lits, lengths)
+
+    def append_arena(self, other, base=None, offset=0):
+        """
+        Append the clauses of another arena, optionally relabeled with relabel().
+
+        Args:
+            other (ClauseArena): Clauses to append.
+            base (int or None): Variables above base are shifted by offset (None: no relabeling).
+            offset (int): Shift applied to the variables above base.
+        """
+        lits = other.lits if base is None else relabel(other.lits, base, offset)
+        self.append_arrays(lits, np.diff(other.offsets))
+
+    def relabeled(self, base, offset):
+        """Return a copy of the arena whose variables above base are shifted by offset."""
+        arena = ClauseArena(capacity=max(1, len(self)))
+        arena.append_arena(self, base, offset)
+        return arena
+
+    def clause(self, i):
+        """Return clause i as a list of int."""
+        return self._lits[self._offsets[i]:self._offsets[i + 1]].tolist()
+
+    def iter_clauses(self, block_lits=WRITE_BLOCK_LITS):
+        """
+        Yield the clauses as lists of int, converting one block of literals at a time.
+
+        Only the clause being consumed is a Python list, so this is the way to hand the
+        formula to a pysat solver (add_to_solver) without materializing it.
+        """
+        offsets = self.offsets
+        start = 0
+        while start < self._nclauses:
+            stop = _block_end(offsets, start, block_lits)
+            flat = self._lits[offsets[start]:offsets[stop]].tolist()
+            bounds = (offsets[start:stop + 1] - offsets[start]).tolist()
+            for a, b in zip(bounds, bounds[1:]):
+                yield flat[a:b]
+            start = stop
+
+    def add_to_solver(self, solver):
+        """
+        Add every clause to an in-process pysat solver.
+
+        Args:
+            solver (pysat.solvers.Solver): The solver.
+        """
+        for clause in self.iter_clauses():
+            solver.add_clause(clause)
+
+    def write_clauses(self, fp, prefix=None, block_lits=WRITE_BLOCK_LITS):
+        """
+        Write the clauses as DIMACS lines, one block of literals at a time.
+
+        Args:
+            fp (file object): Text file.
+            prefix (str or list of str or None): Prefix of every line, or one prefix per clause.
+        """
+        offsets = self.offsets
+        start = 0
+        while start < self._nclauses:
+            stop = _block_end(offsets, start, block_lits)
+            prefixes = prefix
+            if isinstance(prefix, str):
+                prefixes = [prefix] * (stop - start)
+            elif prefix is not None:
+                prefixes = prefix[start:stop]
+            fp.write(format_clauses(self._lits[offsets[start]:offsets[stop]], offsets[start:stop + 1], prefixes))
+            start = stop
+
+    def to_fp(self, fp):
+        """Write the formula in DIMACS CNF format, as pysat's CNF.to_fp."""
+        fp.write(f"p cnf {self.nv} {self._nclauses}\n")
+        self.write_clauses(fp)
+
+    def to_file(self, file_name):
+        """Write the formula to a DIMACS CNF file, as pysat's CNF.to_file (compressed by extension, see core.compress)."""
+        with open_text(file_name, "w") as fp:
+            self.to_fp(fp)
+
+    def to_pysat(self):
+        """Return the formula as a pysat CNF (one list per clause)."""
+        from pysat.formula import CNF
+        cnf = CNF(from_clauses=list(self.iter_clauses()))
+        cnf.nv = max(cnf.nv, self.nv)
+        return cnf
+
+
+class WeightedClauseArena:
+    """
+    Compact WCNF: hard and soft clauses in two ClauseArena, soft weights in an int64 array.
+
+    Has the append/extend interface of pysat's WCNF (a clause without weight is hard).
+
+    Attributes:
+        hard (ClauseArena): Hard clauses.
+        soft (ClauseArena): Soft clauses.
+    """
+
+    def __init__(self):
+        self.hard = ClauseArena()
+        self.soft = ClauseArena()
+        self._wght = np.empty(1024, dtype=np.int64)
+
+    @property
+    def wght(self):
+        """Weights of the soft clauses."""
+        return self._wght[:len(self.soft)]
+
+    @property
+    def nv(self):
+        return max(self.hard.nv, self.soft.nv)
+
+    @property
+    def topw(self):
+        """Weight of the hard clauses in the legacy format (sum of the soft weights + 1)."""
+        return int(self.wght.sum()) + 1
+
+    def __repr__(self):
+        return f"WeightedClauseArena(nv={self.nv}, hard={len(self.hard)}, soft={len(self.soft)})"
+
+    @property
+    def nbytes(self):
+        return self.hard.nbytes + self.soft.nbytes + self.wght.nbytes
+
+    def append(self, clause, weight=None):
+        """Append one clause, hard if weight is None and soft otherwise."""
+        if weight is None:
+            self.hard.append(clause)
+        else:
+            self._add_weights([weight])
+            self.soft.append(clause)
+
+    def extend(self, clauses, weights=None):
+        """Append a list of clauses, hard unless weights are given."""
+        if weights is None:
+            self.hard.extend(clauses)
+        else:
+            self._add_weights(weights)
+            self.soft.extend(clauses)
+
+    def _add_weights(self, weights):
+        weights = np.asarray(weights, dtype=np.int64).reshape(-1)
+        count = len(self.soft)
+        self._wght = _grow(self._wght, count + len(weights))
+        self._wght[count:count + len(weights)] = weights
+
+    def write_clauses(self, fp, hard_prefix="h"):
+        """
+        Write the soft clauses ('<weight> <literals> 0') then the hard ones ('<hard_prefix> <literals> 0').
+
+        Args:
+            fp (file object): Text file.
+            hard_prefix (str): 'h' in the MSE 2022 format, the top weight in the legacy one.
+        """
+        self.soft.write_clauses(fp, list(map(str, self.wght.tolist())))
+        self.hard.write_clauses(fp, hard_prefix)
+
+    def to_fp(self, fp, format="mse22"):
+        """Write the formula in WCNF format, as pysat's WCNF.to_fp ('mse22' or 'legacy')."""
+        if format == "legacy":
+            fp.write(f"p wcnf {self.nv} {len(self.hard) + len(self.soft)} {self.topw}\n")
+            self.write_clauses(fp, str(self.topw))
+        else:
+            self.write_clauses(fp)
+
+    def to_file(self, file_name, format="mse22"):
+        """Write the formula to a WCNF file, as pysat's WCNF.to_file (compressed by extension, see core.compress)."""
+        with open_text(file_name, "w") as fp:
+            self.to_fp(fp, format)
+
+    def to_pysat(self):
+        """Return the formula as a pysat WCNF (one list per clause)."""
+        from pysat.formula import WCNF
+        wcnf = WCNF()
+        wcnf.extend(list(self.hard.iter_clauses()))
+        wcnf.extend(list(self.soft.iter_clauses()), weights=self.wght.tolist())
+        wcnf.nv = max(wcnf.nv, self.nv)
+        return wcnf
+
+
+def add_clauses(dest, arena):
+    """
+    Append the clauses of an arena to any clause destination.
+
+    Args:
+        dest (ClauseArena, WeightedClauseArena, CNF, DimacsWriter...): Object with an extend(clauses) method.
+        arena (ClauseArena): Clauses to append (as hard clauses for weighted destinations).
+    """
+    if isinstance(dest, ClauseArena):
+        dest.append_arena(arena)
+    elif isinstance(dest, WeightedClauseArena):
+        dest.hard.append_arena(arena)
+    else:
+        dest.extend(arena.iter_clauses())
+
+
+def relabel(lits, base, offset):
+    """
+    Shift the variables above base by offset, keeping the signs of the literals.
+
+    Used to move an encoding built with auxiliary variables starting at base + 1 to
+    auxiliary variables starting at base + offset + 1.
+
+    Args:
+        lits (np.ndarray): Literals.
+        base (int): Largest variable that is kept unchanged.
+        offset (int): Shift of the other variables.
+
+    Returns:
+        np.ndarray: The relabeled literals (int32).
+    """
+    lits = np.asarray(lits, dtype=np.int32)
+    shift = np.where(np.abs(lits) > base, np.int32(offset), np.int32(0))
+    return lits + np.where(lits < 0, -shift, shift)
+
+
+def _block_end(offsets, start, block_lits):
+    """Index of the clause ending the block that starts at clause start (at least one clause)."""
+    stop = int(np.searchsorted(offsets, offsets[start] + block_lits, side="right")) - 1
+    return min(max(stop, start + 1), len(offsets) - 1)
@@ -0,0 +1,108 @@
+import os
+import io
+import glob
+import time
+import contextlib
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from core.archive import find_instance_files
+
+BatchResult = namedtuple("BatchResult", ["input_file", "outputs", "seconds", "error"])
+BatchResult.__doc__ = """
+Outcome of the models generated for one instance.
+
+Attributes:
+    input_file (str): Path to the instance file.
+    outputs (list of str): Paths of the files written.
+    seconds (float): Time spent on the instance.
+    error (str or None): Traceback of the failure, None on success.
+"""
+
+
+def parse_list(spec, cast=str):
+    """
+    Parse a comma-separated command-line list, e.g. "CNF1,XNF2" or "1,3,5".
+
+    Args:
+        spec (str): The list.
+        cast (function): Conversion applied to every item.
+
+    Returns:
+        list: The items, in the given order and without duplicates.
+    """
+    items = []
+    for part in spec.split(','):
+        part = part.strip()
+        if part and cast(part) not in items:
+            items.append(cast(part))
+    return items
+
+
+def expand_inputs(patterns):
+    """
+    Expand instance files, directories (searched recursively) and glob patterns.
+
+    Args:
+        patterns (list of str): Files, directories or glob patterns such as 'Challenges/seed_*/SD'.
+
+    Returns:
+        list of str: Instance files (regular files without an extension), without duplicates.
+    """
+    paths = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+    files = []
+    for file_name in find_instance_files(paths):
+        if file_name not in files:
+            files.append(file_name)
+    return files
+
+
+def _run_quietly(job):
+    """Run task(*args) in a worker, capturing its prints and turning exceptions into an error."""
+    task, input_file, args = job
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            outputs = task(input_file, *args)
+            error = None
+        except Exception:
+            outputs = []
+            error = traceback.format_exc()
+    return BatchResult(input_file, outputs, time.time() - start, error)
+
+
+def run_batch(task, input_files, args=(), workers=None):
+    """
+    Run task(input_file, *args) for every instance over a process pool, with a progress line
+    per instance and a final summary.
+
+    Args:
+        task (function): Picklable function generating the models of one instance and
+            returning the paths it wrote.
+        input_files (list of str): Instance files.
+        args (tuple): Extra arguments of task.
+        workers (int or None): Number of worker processes (default: os.cpu_count()).
+
+    Returns:
+        list of BatchResult: One result per instance, in completion order.
+    """
+    start = time.time()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_quietly, (task, input_file, args)) for input_file in input_files]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            name = os.path.basename(result.input_file)
+            if result.error is None:
+                print(f"[{done}/{len(futures)}] {name}: {len(result.outputs)} outputs in {result.seconds:.2f}s")
+            else:
+                print(f"[{done}/{len(futures)}] {name}: FAILED\n{result.error}")
+
+    failed = sum(result.error is not None for result in results)
+    outputs = sum(len(result.outputs) for result in results)
+    print(f"{len(results) - failed}/{len(results)} instances, {outputs} outputs written in {time.time() - start:.2f}s ({failed} failed).")
+    return results
@@ -0,0 +1,137 @@
+import os
+import tempfile
+import functools
+import zipfile
+
+import numpy as np
+import pysat
+from pysat.card import CardEnc, EncType
+
+from core.arena import ClauseArena
+
+# Location and size bound of the on-disk cache (SDP_CACHE_DIR="" disables it)
+CACHE_DIR = os.environ.get("SDP_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sat-syndrome-decoding"))
+CACHE_MAX_BYTES = int(os.environ.get("SDP_CACHE_MAX_BYTES", 1 << 30))
+
+
+def atmost_cache_path(n, w, encoding, cache_dir=CACHE_DIR):
+    """Path of the cached encoding of sum(e_1..e_n) <= w (the pysat version is part of the key)."""
+    return os.path.join(cache_dir, f"atmost_n{n}_w{w}_enc{encoding}_pysat{pysat.__version__}.npz")
+
+
+def _encode(n, w, top_id, encoding):
+    """Encode sum(e_1..e_n) <= w with auxiliary variables starting at top_id + 1."""
+    res = CardEnc.atmost(lits=list(range(1, n + 1)), bound=w, top_id=top_id, encoding=encoding)
+    arena = ClauseArena(capacity=max(1, len(res.clauses)))
+    arena.extend(res.clauses)
+    return arena, res.nv
+
+
+def _load(path):
+    """Load a cached encoding, None if it is missing or unreadable."""
+    try:
+        with np.load(path) as data:
+            arena = ClauseArena(capacity=max(1, len(data["offsets"]) - 1))
+            arena.append_arrays(data["lits"], np.diff(data["offsets"]))
+            nv = int(data["nv"])
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+    try:
+        os.utime(path)  # Recently used entries are evicted last
+    except OSError:
+        pass
+    return arena, nv
+
+
+def _store(path, arena, nv, max_bytes):
+    """Write an entry atomically, then evict the least recently used ones above max_bytes."""
+    if arena.nbytes > max_bytes:
+        return
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=cache_dir, suffix=".tmp", delete=False) as f:
+        try:
+            np.savez(f, lits=arena.lits, offsets=arena.offsets, nv=nv)
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+    os.replace(f.name, path)  # Concurrent builds never see a partial entry
+    evict(cache_dir, max_bytes)
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """
+    Remove the least recently used entries until the cache holds at most max_bytes.
+
+    Args:
+        cache_dir (str): Cache directory.
+        max_bytes (int): Size bound of the cache.
+    """
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".npz"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # Removed by a concurrent eviction
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def hamming_weight_atmost(n, w, top_id, encoding, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """
+    Same clauses and nv as CardEnc.atmost(lits=[1..n], bound=w, top_id=top_id, encoding=encoding),
+    through an on-disk cache.
+
+    The encoding only depends on (n, w, encoding) once its auxiliary variables are numbered
+    from n + 1, so it is cached in that form, keyed by (n, w, encoding), and relabeled to
+    start after top_id on every use.
+
+    Args:
+        n (int): Number of variables e_1..e_n.
+        w (int): Maximum Hamming weight.
+        top_id (int): Highest variable index already used (at least n).
+        encoding (int): Cardinality constraint encoding to use.
+        cache_dir (str): Cache directory, the cache is disabled if empty.
+        max_bytes (int): Size bound of the cache.
+
+    Returns:
+        arena (ClauseArena): The clauses of the encoding.
+        nv (int): The nv of the pysat encoding.
+    """
+    if encoding == EncType.native:
+        # Native constraints are not clauses, nothing to cache
+        return _encode(n, w, top_id, encoding)
+
+    arena, nv = _base_encoding(n, w, encoding, cache_dir, max_bytes)
+
+    # Always a copy, the memoized encoding is shared by the next calls
+    offset = top_id - n
+    arena = arena.relabeled(n, offset)
+    # pysat reports nv = 0 for a trivial bound (w >= n) and top_id when no auxiliary is needed
+    return arena, nv + offset if nv >= n else nv
+
+
+@functools.lru_cache(maxsize=2)
+def _base_encoding(n, w, encoding, cache_dir, max_bytes):
+    """Encoding with auxiliaries from n + 1, from the disk cache, memoized for the models of the same instance."""
+    if not cache_dir:
+        return _encode(n, w, n, encoding)
+    path = atmost_cache_path(n, w, encoding, cache_dir)
+    cached = _load(path)
+    if cached is None:
+        cached = _encode(n, w, n, encoding)
+        try:
+            _store(path, *cached, max_bytes)
+        except OSError:
+            pass  # A read-only or full cache directory only disables caching
+    return cached
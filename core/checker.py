@@ -0,0 +1,189 @@
+from collections import namedtuple
+
+import numpy as np
+
+from core.gf2 import GF2Matrix, popcount
+
+# Upper bound on the number of uint64 words materialised at once by compute_syndromes
+CHUNK_WORDS = 1 << 23
+
+CheckResult = namedtuple("CheckResult", ["syndromes", "weights", "valid"])
+CheckResult.__doc__ = """
+Outcome of a batched verification.
+
+Attributes:
+    syndromes (np.ndarray): uint8 array of shape (batch, m), syndrome H.e of every candidate.
+    weights (np.ndarray): int64 array of length batch, Hamming weight of every candidate.
+    valid (np.ndarray): bool array of length batch, per-candidate verdict.
+"""
+
+
+def as_candidate_matrix(candidates, n):
+    """
+    Convert a batch of candidate vectors into a packed matrix, one candidate per row.
+
+    Args:
+        candidates (GF2Matrix, list of str or array-like): Candidates given as a packed matrix,
+            as binary strings, or as a 2-D array of 0/1 values.
+        n (int): Expected length of every candidate.
+
+    Returns:
+        GF2Matrix: Packed candidates of shape (batch, n).
+    """
+    if isinstance(candidates, GF2Matrix):
+        matrix = candidates
+    elif isinstance(candidates, (list, tuple)) and candidates and isinstance(candidates[0], str):
+        matrix = GF2Matrix.from_strings(candidates)
+    else:
+        bits = np.asarray(candidates, dtype=np.uint8)
+        if bits.ndim == 1:
+            bits = bits.reshape(1, -1) if bits.size else bits.reshape(0, n)
+        matrix = GF2Matrix.from_bits(bits)
+
+    if matrix.ncols != n:
+        raise ValueError(f"The candidate vectors must be of length {n}, but they are of length {matrix.ncols}.")
+    return matrix
+
+
+def syndrome_bits(s, m):
+    """
+    Convert a syndrome into a uint8 array of 0/1 values.
+
+    Args:
+        s (str, array-like or None): Syndrome as a binary string or 0/1 array, None for the zero syndrome.
+        m (int): Number of parity-check equations.
+
+    Returns:
+        np.ndarray: uint8 array of length m.
+    """
+    if s is None:
+        return np.zeros(m, dtype=np.uint8)
+    if isinstance(s, str):
+        s = np.frombuffer(s.strip().encode("ascii"), dtype=np.uint8) - ord("0")
+    s = np.asarray(s, dtype=np.uint8)
+    if s.shape != (m,):
+        raise ValueError(f"The syndrome must be of length {m}, but it is of length {s.size}.")
+    return s
+
+
+def compute_syndromes(H, candidates):
+    """
+    Compute H.e for every candidate e of a packed batch.
+
+    The parity of popcount(row & e) summed over the words of a row equals the parity of
+    popcount of the XOR of those words, so each syndrome bit costs one AND, one XOR-reduction
+    and one popcount per word. The batch is processed in chunks to bound memory.
+
+    Args:
+        H (GF2Matrix): Parity-check matrix of shape (m, n).
+        candidates (GF2Matrix): Packed candidates of shape (batch, n).
+
+    Returns:
+        np.ndarray: uint8 array of shape (batch, m).
+    """
+    m, nw = H.words.shape
+    batch = candidates.nrows
+    syndromes = np.empty((batch, m), dtype=np.uint8)
+    step = max(1, CHUNK_WORDS // max(1, m * nw))
+    for start in range(0, batch, step):
+        chunk = candidates.words[start:start + step]
+        products = H.words[np.newaxis, :, :] & chunk[:, np.newaxis, :]
+        folded = np.bitwise_xor.reduce(products, axis=2) if nw else np.zeros(products.shape[:2], dtype=np.uint64)
+        syndromes[start:start + step] = popcount(folded) & 1
+    return syndromes
+
+
+def check_candidates(H, candidates, s=None, w=None):
+    """
+    Verify a batch of candidate solutions in one vectorized pass.
+
+    A candidate is valid when H.e equals the target syndrome s and, if w is given,
+    its Hamming weight is at most w. With s = None the target is the zero syndrome
+    (low-weight codeword problem).
+
+    Args:
+        H (GF2Matrix): Parity-check matrix H = [I | P] of shape (m, n).
+        candidates (GF2Matrix, list of str or array-like): Batch of candidate vectors of length n.
+        s (str, array-like or None): Target syndrome, None for the zero syndrome.
+        w (int or None): Maximum Hamming weight, None for no bound.
+
+    Returns:
+        CheckResult: Syndromes, weights and verdicts of the candidates.
+    """
+    candidates = as_candidate_matrix(candidates, H.ncols)
+    target = syndrome_bits(s, H.nrows)
+
+    syndromes = compute_syndromes(H, candidates)
+    weights = candidates.row_weights()
+
+    valid = np.all(syndromes == target, axis=1)
+    if w is not None:
+        valid &= weights <= w
+
+    return CheckResult(syndromes, weights, valid)
+
+
+def syndrome_to_string(syndrome):
+    """Format a syndrome given as a 0/1 array as a binary string."""
+    return (np.asarray(syndrome, dtype=np.uint8) + ord("0")).tobytes().decode("ascii")
+
+
+Verification = namedtuple("Verification", ["valid", "weight", "syndrome", "reason"])
+Verification.__doc__ = """
+Outcome of the verification of a single candidate.
+
+Attributes:
+    valid (bool): True if the candidate is a solution of the instance.
+    weight (int or None): Hamming weight of the candidate.
+    syndrome (str or None): Computed syndrome H.e as a binary string.
+    reason (str or None): Why the candidate was rejected ('no solution', 'length', 'weight'
+        or 'syndrome'), None if it is valid.
+"""
+
+
+def systematic_syndromes(P, candidates):
+    """
+    Compute H.e for H = [I | P] without materialising the identity block.
+
+    Args:
+        P (GF2Matrix): Redundancy part of H, of shape (m, n - m), as returned by parse_input_file.
+        candidates (GF2Matrix): Packed candidates of shape (batch, n).
+
+    Returns:
+        np.ndarray: uint8 array of shape (batch, m).
+    """
+    m = P.nrows
+    bits = candidates.to_bits()
+    return bits[:, :m] ^ compute_syndromes(P, GF2Matrix.from_bits(bits[:, m:]))
+
+
+def verify_systematic(P, solution, s=None, w=None):
+    """
+    Verify one candidate solution in process against an already-parsed instance.
+
+    Args:
+        P (GF2Matrix): Redundancy part of H = [I | P], as returned by parse_input_file.
+        solution (str): Candidate solution as a binary string of length n.
+        s (str or None): Target syndrome, None for the zero syndrome.
+        w (int or None): Maximum Hamming weight, None for no bound.
+
+    Returns:
+        Verification: Verdict, weight, computed syndrome and failure reason.
+    """
+    if not solution:
+        return Verification(False, None, None, "no solution")
+
+    n = P.nrows + P.ncols
+    if len(solution) != n or not set(solution) <= {"0", "1"}:
+        return Verification(False, None, None, "length")
+
+    candidate = GF2Matrix.from_strings([solution])
+    weight = int(candidate.row_weights()[0])
+    syndrome = systematic_syndromes(P, candidate)[0]
+    syndrome_str = syndrome_to_string(syndrome)
+
+    if w is not None and weight > w:
+        return Verification(False, weight, syndrome_str, "weight")
+    if not np.array_equal(syndrome, syndrome_bits(s, P.nrows)):
+        return Verification(False, weight, syndrome_str, "syndrome")
+    return Verification(True, weight, syndrome_str, None)
@@ -0,0 +1,105 @@
+"""
+Transparent gzip/xz/zstd compression of the generated files, chosen by extension.
+
+'.gz' and '.xz' use the standard library, '.zst' the optional zstandard package. Any other
+path is a plain file. Readers accept concatenated members/streams/frames, which is how the
+streaming DIMACS writer prepends its header to an already compressed body.
+"""
+
+import io
+import gzip
+import lzma
+
+try:
+    import zstandard
+except ImportError:  # Only needed for .zst files
+    zstandard = None
+
+COMPRESSIONS = ("gz", "xz", "zst")
+
+
+def compression_of(path):
+    """Compression of a path from its extension, None for a plain file."""
+    extension = str(path).rsplit(".", 1)[-1]
+    return extension if "." in str(path) and extension in COMPRESSIONS else None
+
+
+def with_compression(path, compression):
+    """Path of the file compressed with compression (None leaves the path unchanged)."""
+    if compression is None:
+        return path
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}', expected one of {', '.join(COMPRESSIONS)}.")
+    return f"{path}.{compression}"
+
+
+def strip_compression(path):
+    """Path without its compression extension."""
+    compression = compression_of(path)
+    return path[:-len(compression) - 1] if compression is not None else path
+
+
+def _zstandard():
+    if zstandard is None:
+        raise ImportError("The zstandard package is required for .zst files (pip install zstandard).")
+    return zstandard
+
+
+def open_binary(path, mode="rb"):
+    """
+    Open a file for binary reading ('rb') or writing ('wb'), compressed according to its extension.
+
+    Args:
+        path (str): Path to the file.
+        mode (str): 'rb' or 'wb'.
+
+    Returns:
+        file object: Binary stream.
+    """
+    compression = compression_of(path)
+    if compression == "gz":
+        # Level 6 is zlib's default, noticeably faster than gzip's 9 for a similar ratio
+        return gzip.open(path, mode, compresslevel=6)
+    if compression == "xz":
+        return lzma.open(path, mode)
+    if compression == "zst":
+        zstd = _zstandard()
+        if mode == "rb":
+            return zstd.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+        return zstd.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+    return open(path, mode)
+
+
+def open_text(path, mode="r", encoding="ascii", newline=None):
+    """
+    Open a file for text reading ('r') or writing ('w'), compressed according to its extension.
+
+    Args:
+        path (str): Path to the file.
+        mode (str): 'r' or 'w'.
+        encoding (str): Text encoding.
+        newline (str or None): As for open().
+
+    Returns:
+        file object: Text stream.
+    """
+    if compression_of(path) is None:
+        return open(path, mode, encoding=encoding, newline=newline)
+    return io.TextIOWrapper(open_binary(path, mode + "b"), encoding=encoding, newline=newline)
+
+
+def compress_bytes(data, compression):
+    """Compress data as a complete member/stream/frame of the given compression."""
+    if compression == "gz":
+        return gzip.compress(data, compresslevel=6)
+    if compression == "xz":
+        return lzma.compress(data)
+    if compression == "zst":
+        return _zstandard().ZstdCompressor().compress(data)
+    raise ValueError(f"Unknown compression '{compression}', expected one of {', '.join(COMPRESSIONS)}.")
+
+
+def read_bytes(path):
+    """Whole (decompressed) content of a file."""
+    with open_binary(path) as f:
+        return f.read()
@@ -0,0 +1,268 @@
+"""
+Model construction, search parameters and solve loop shared by the CP-SAT runners of both packages.
+"""
+
+import time
+
+import numpy as np
+from google.protobuf import text_format
+from ortools.sat import sat_parameters_pb2
+from ortools.sat.python import cp_model
+
+# Time limit of the runners when none is given (3 hours)
+DEFAULT_TIME_LIMIT = 10800
+
+# Columns describing the model in the result CSVs
+BUILD_FIELDS = ["Build time (s)", "Variables", "Constraints"]
+
+# CP-SAT presolve for each --presolve level: off, a single pass, the default (several passes)
+PRESOLVE_LEVELS = {
+    0: {"cp_model_presolve": False},
+    1: {"cp_model_presolve": True, "max_presolve_iterations": 1},
+    2: {"cp_model_presolve": True},
+}
+
+
+def parity_rows(H_transpose, n):
+    """
+    Variables of every parity-check equation of [I | H^T], computed in one pass.
+
+    Args:
+        H_transpose (GF2Matrix): The transposed parity-check matrix, one row per equation.
+        n (int): Total number of variables.
+
+    Returns:
+        columns (list of np.ndarray): 0-based indices of the e_j variables of each equation
+            (V_i - 1: the identity variable i, then the support of row i shifted by the number of equations).
+        sizes (np.ndarray): Number of variables of each equation.
+    """
+    m = H_transpose.nrows
+    columns = [np.concatenate(([i], support + m)) for i, support in enumerate(H_transpose.row_supports())]
+    sizes = H_transpose.row_weights() + 1
+    return columns, sizes
+
+
+def new_literals(model, prefix, values, named=True):
+    """
+    Boolean variables x_v, one per value v.
+
+    Args:
+        model (cp_model.CpModel): The model.
+        prefix (str): Name prefix, the variables are named '<prefix>_<v>'.
+        values (iterable of int): The values v.
+        named (bool): Whether to name the variables (anonymous variables keep the model smaller).
+
+    Returns:
+        dict: v -> variable.
+    """
+    if named:
+        return {v: model.new_bool_var(f"{prefix}_{v}") for v in values}
+    return {v: model.new_bool_var("") for v in values}
+
+
+def add_rows_CP1(model, e_vars, columns, K, named=True):
+    """
+    CNF1-style equations: sum(e_j for j in V_i) + sum(v * not x_{i,v}) == sum(K_i), exactly one x_{i,v}.
+
+    Args:
+        model (cp_model.CpModel): The model.
+        e_vars (list): The variables e_1..e_n.
+        columns (list of np.ndarray): 0-based variable indices of each equation (see parity_rows).
+        K (list of range): Allowed sum values of each equation.
+        named (bool): Whether to name the auxiliary variables.
+    """
+    for i, (cols, K_i) in enumerate(zip(columns, K)):
+        x_vars = new_literals(model, f"x_{i}", K_i, named)
+        model.add_exactly_one(x_vars.values())
+
+        terms = [e_vars[j] for j in cols.tolist()]
+        coeffs = [1] * len(terms)
+        for v, x in x_vars.items():
+            if v != 0:
+                terms.append(x.Not())
+                coeffs.append(v)
+        model.add(cp_model.LinearExpr.weighted_sum(terms, coeffs) == sum(K_i))
+
+
+def add_rows_CP2(model, e_vars, columns, K, named=True):
+    """
+    CNF2-style equations: sum(e_j for j in V_i) + sum(2 * not x_{i,v}) == max(K_i), with x_{i,v} => x_{i,v-2}.
+
+    Only the x_{i,v} with v >= 2 appear in the equations, the others are not created.
+
+    Args:
+        model (cp_model.CpModel): The model.
+        e_vars (list): The variables e_1..e_n.
+        columns (list of np.ndarray): 0-based variable indices of each equation (see parity_rows).
+        K (list of range): Allowed sum values of each equation.
+        named (bool): Whether to name the auxiliary variables.
+    """
+    for i, (cols, K_i) in enumerate(zip(columns, K)):
+        x_vars = new_literals(model, f"x_{i}", [v for v in K_i if v not in (0, 1)], named)
+
+        terms = [e_vars[j] for j in cols.tolist()]
+        coeffs = [1] * len(terms)
+        for x in x_vars.values():
+            terms.append(x.Not())
+            coeffs.append(2)
+        model.add(cp_model.LinearExpr.weighted_sum(terms, coeffs) == max(K_i))
+
+        # Unary constraint: x_{i,v} = 1 if sum(e_j for j in V_{E_i}) <= v
+        for v, x in x_vars.items():
+            if v not in (2, 3) and (v - 2) in x_vars:
+                model.add_implication(x, x_vars[v - 2])
+
+
+def add_rows_XOR(model, e_vars, columns, K, named=True):
+    """
+    Native XOR equations: the e_j with j in V_i sum to the parity of K_i, without auxiliary variables.
+
+    Args:
+        model (cp_model.CpModel): The model.
+        e_vars (list): The variables e_1..e_n.
+        columns (list of np.ndarray): 0-based variable indices of each equation (see parity_rows).
+        K (list of range): Allowed sum values of each equation, they all have the parity of range.start.
+        named (bool): Unused, there are no auxiliary variables to name.
+    """
+    for cols, K_i in zip(columns, K):
+        literals = [e_vars[j] for j in cols.tolist()]
+        # add_bool_xor enforces an odd sum, an even one is obtained by negating a literal
+        if K_i.start % 2 == 0:
+            literals[0] = literals[0].Not()
+        model.add_bool_xor(literals)
+
+
+def build_info(model, seconds):
+    """
+    Row of BUILD_FIELDS describing a model.
+
+    Args:
+        model (cp_model.CpModel): The model.
+        seconds (float): Time spent building it.
+
+    Returns:
+        list: Build time, number of variables and number of constraints of the model proto.
+    """
+    proto = model.Proto()
+    return [f"{seconds:.5f}", len(proto.variables), len(proto.constraints)]
+
+
+def add_parameter_arguments(parser):
+    """
+    Add the CP-SAT search options to a runner's argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser.
+    """
+    group = parser.add_argument_group("CP-SAT parameters")
+    group.add_argument('-t', '--timeout', type=float,
+                       help=f"Time limit per instance in seconds. Default: {DEFAULT_TIME_LIMIT}")
+    group.add_argument('-w', '--workers', type=int, help="Number of search workers (0: CP-SAT's default, all cores)")
+    group.add_argument('--seed', type=int, help="Random seed of the search")
+    group.add_argument('--presolve', type=int, choices=sorted(PRESOLVE_LEVELS),
+                       help="Presolve level: 0 off, 1 single pass, 2 full (CP-SAT's default)")
+    group.add_argument('--linearization', type=int, choices=[0, 1, 2], help="Linearization level (CP-SAT's default: 1)")
+    group.add_argument('--log', action='store_true', help="Log the search progress")
+    group.add_argument('--params-file', help="File of SatParameters in protobuf text format (e.g. 'num_workers: 16')")
+    group.add_argument('-p', '--param', action='append', default=[], metavar="NAME=VALUE",
+                       help="SatParameters override, may be repeated (e.g. -p symmetry_level=4)")
+
+
+def parameters_from_args(args):
+    """
+    Build the SatParameters of a runner from its command line.
+
+    Later sources override earlier ones: the default time limit, then the parameter file,
+    then the dedicated options, then the -p overrides.
+
+    Args:
+        args (argparse.Namespace): Parsed options of add_parameter_arguments.
+
+    Returns:
+        SatParameters: The parameters.
+
+    Raises:
+        ValueError: If the file or an override is not a valid SatParameters field.
+    """
+    parameters = sat_parameters_pb2.SatParameters(max_time_in_seconds=DEFAULT_TIME_LIMIT)
+    try:
+        if args.params_file:
+            with open(args.params_file) as f:
+                text_format.Merge(f.read(), parameters)
+
+        if args.timeout is not None:
+            parameters.max_time_in_seconds = args.timeout
+        if args.workers is not None:
+            parameters.num_workers = args.workers
+        if args.seed is not None:
+            parameters.random_seed = args.seed
+        if args.presolve is not None:
+            for name, value in PRESOLVE_LEVELS[args.presolve].items():
+                setattr(parameters, name, value)
+        if args.linearization is not None:
+            parameters.linearization_level = args.linearization
+        if args.log:
+            parameters.log_search_progress = True
+
+        for override in args.param:
+            name, sep, value = override.partition("=")
+            if not sep:
+                raise ValueError(f"Expected NAME=VALUE, found '{override}'.")
+            text_format.Merge(f"{name.strip()}: {value.strip()}", parameters)
+    except text_format.ParseError as e:
+        raise ValueError(f"Invalid CP-SAT parameter: {e}")
+    return parameters
+
+
+def format_parameters(parameters):
+    """One-line text form of SatParameters, as recorded in the result CSVs."""
+    return text_format.MessageToString(parameters, as_one_line=True)
+
+
+def apply_parameters(solver, parameters):
+    """Merge SatParameters into a CpSolver's parameters (a protobuf message or, in recent OR-Tools, a native wrapper)."""
+    if hasattr(solver.parameters, "merge_text_format"):
+        solver.parameters.merge_text_format(text_format.MessageToString(parameters))
+    else:
+        solver.parameters.MergeFrom(parameters)
+
+
+def solve_model(model, e_vars, parameters=None, timeout=DEFAULT_TIME_LIMIT, optimal=False):
+    """
+    Solve a CP-SAT model and read the e_j variables back.
+
+    Args:
+        model (cp_model.CpModel): The model.
+        e_vars (list): The variables e_1..e_n.
+        parameters (SatParameters or None): Search parameters, they override timeout.
+        timeout (float): Time limit in seconds when parameters do not set one.
+        optimal (bool): Whether to also return if the solution is proven optimal ('sat' covers
+            both a proven optimum and the best solution found at the time limit).
+
+    Returns:
+        status_str (str): 'sat', 'unsat', or 'timeout'.
+        res_time (str): Resolution time in seconds.
+        solution (str or None): Binary solution string for e_j variables if satisfiable.
+        proven (bool): Only with optimal, whether CP-SAT proved the solution optimal.
+    """
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = timeout
+    if parameters is not None:
+        apply_parameters(solver, parameters)
+
+    start = time.time()
+    status = solver.Solve(model)
+    res_time = time.time() - start
+    res_time = f"{res_time:.5f}"
+
+    # Extract solution if feasible/optimal
+    solution = None
+    if status in (cp_model.FEASIBLE, cp_model.OPTIMAL):
+        solution = ''.join(map(str, (solver.Value(e_j) for e_j in e_vars)))
+        status_str = 'sat'
+    else:
+        status_str = 'unsat' if status == cp_model.INFEASIBLE else 'timeout'
+
+    if optimal:
+        return status_str, res_time, solution, status == cp_model.OPTIMAL
+    return status_str, res_time, solution
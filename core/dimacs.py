@@ -0,0 +1,144 @@
+import io
+import os
+import shutil
+import tempfile
+
+from core.compress import compression_of, compress_bytes, open_text
+
+# Bytes reserved at the start of a streamed CNF file for the (back-patched) header
+HEADER_BYTES = 64
+
+# Size of the write buffer of the streaming writers
+BUFFER_BYTES = 1 << 20
+
+
+def format_clause(clause, prefix=""):
+    """Format a clause as a DIMACS line terminated by ' 0'."""
+    return prefix + " ".join(map(str, clause)) + " 0\n"
+
+
+class DimacsWriter:
+    """
+    Streaming DIMACS CNF writer with the append/extend interface of pysat's CNF.
+
+    Clauses are written to disk as they are added, so memory does not grow with the formula.
+    The header 'p cnf <nv> <nclauses>' is only known at the end: HEADER_BYTES are reserved at
+    the start of the file and filled on close with a padding comment line followed by the header.
+    A compressed file (see core.compress) cannot be patched in place: its clauses are compressed
+    into a temporary file next to it, and on close the header is written as a first compressed
+    member followed by the compressed clauses.
+
+    Attributes:
+        nv (int): Largest variable seen so far.
+        nclauses (int): Number of clauses written so far.
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.nv = 0
+        self.nclauses = 0
+        self._compression = compression_of(file_name)
+        if self._compression is None:
+            self._file = open(file_name, "wb")
+            self._file.write(b" " * HEADER_BYTES)
+            self._out = io.TextIOWrapper(io.BufferedWriter(self._file, BUFFER_BYTES), encoding="ascii", newline="\n")
+        else:
+            fd, self._body_name = tempfile.mkstemp(dir=os.path.dirname(file_name) or ".", suffix=f".{self._compression}")
+            os.close(fd)
+            self._out = open_text(self._body_name, "w", newline="\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, clause):
+        """Write one clause."""
+        if clause:
+            self.nv = max(self.nv, max(map(abs, clause)))
+        self._out.write(format_clause(clause))
+        self.nclauses += 1
+
+    def extend(self, clauses):
+        """Write a list of clauses."""
+        for clause in clauses:
+            self.append(clause)
+
+    def close(self):
+        """Flush the clauses and back-patch the header."""
+        if self._out.closed:
+            return
+        header = f"p cnf {self.nv} {self.nclauses}\n".encode("ascii")
+        if self._compression is not None:
+            self._out.close()
+            try:
+                with open(self.file_name, "wb") as f, open(self._body_name, "rb") as body:
+                    f.write(compress_bytes(header, self._compression))
+                    shutil.copyfileobj(body, f, BUFFER_BYTES)
+            finally:
+                os.remove(self._body_name)
+            return
+        self._out.flush()
+        padding = HEADER_BYTES - len(header)
+        if padding < 2:
+            raise ValueError("The CNF header does not fit in the reserved bytes.")
+        raw = self._out.detach()
+        raw.seek(0)
+        raw.write(b"c" + b" " * (padding - 2) + b"\n" + header)
+        raw.close()
+
+
+class WcnfWriter:
+    """
+    Streaming WCNF writer (MSE 2022 format, as written by pysat's WCNF.to_file) with the
+    append/extend interface of pysat's WCNF.
+
+    Hard clauses are written as 'h <lits> 0' and soft clauses as '<weight> <lits> 0', in the
+    order in which they are added. The format has no header, so nothing is patched on close,
+    and the file is compressed on the fly if its extension asks for it (see core.compress).
+
+    Attributes:
+        nv (int): Largest variable seen so far.
+        nhard (int): Number of hard clauses written so far.
+        nsoft (int): Number of soft clauses written so far.
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        self.nv = 0
+        self.nhard = 0
+        self.nsoft = 0
+        if compression_of(file_name) is None:
+            self._out = open(file_name, "w", encoding="ascii", newline="\n", buffering=BUFFER_BYTES)
+        else:
+            self._out = open_text(file_name, "w", newline="\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, clause, weight=None):
+        """Write one clause, hard if weight is None and soft otherwise."""
+        if clause:
+            self.nv = max(self.nv, max(map(abs, clause)))
+        if weight is None:
+            self._out.write(format_clause(clause, "h "))
+            self.nhard += 1
+        else:
+            self._out.write(format_clause(clause, f"{weight} "))
+            self.nsoft += 1
+
+    def extend(self, clauses, weights=None):
+        """Write a list of clauses, hard unless weights are given."""
+        if weights is None:
+            for clause in clauses:
+                self.append(clause)
+        else:
+            for clause, weight in zip(clauses, weights):
+                self.append(clause, weight=weight)
+
+    def close(self):
+        self._out.close()
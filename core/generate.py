@@ -0,0 +1,210 @@
+import random
+import functools
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.gf2 import nb_words, unpack_bits
+
+# Approximate size of the buffer written at once by write_bit_rows
+WRITE_BLOCK_BYTES = 1 << 24
+
+
+def parse_range(spec):
+    """
+    Parse an integer range given on the command line.
+
+    Accepted forms: "50" (single value), "10,20,50" (list) and "start:stop[:step]"
+    (inclusive of stop, step defaults to 1). Forms can be mixed: "10:50:10,100".
+
+    Args:
+        spec (str): Range specification.
+
+    Returns:
+        list of int: The values, in the given order.
+    """
+    values = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if ':' in part:
+            bounds = [int(x) for x in part.split(':')]
+            if len(bounds) not in (2, 3) or (len(bounds) == 3 and bounds[2] <= 0):
+                raise ValueError(f"Invalid range '{part}', expected start:stop[:step] with a positive step.")
+            start, stop = bounds[0], bounds[1]
+            step = bounds[2] if len(bounds) == 3 else 1
+            values.extend(range(start, stop + 1, step))
+        else:
+            values.append(int(part))
+    return values
+
+
+def instance_rng(n, seed):
+    """
+    Independent NumPy bit generator of the instance (n, seed).
+
+    The stream is derived from a SeedSequence with entropy 'seed' and spawn key (n,), so
+    it only depends on (n, seed) and not on the order or the process in which instances
+    are generated.
+
+    Args:
+        n (int): Size of the instance.
+        seed (int): Random seed of the instance.
+
+    Returns:
+        np.random.PCG64: The bit generator.
+    """
+    return np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(n,)))
+
+
+class NumpyBitStream:
+    """
+    Rows of random bits drawn from the NumPy stream of an instance.
+
+    Every row of ncols bits consumes nb_words(ncols) raw 64-bit outputs of the generator,
+    so the rows do not depend on how they are grouped into blocks.
+    """
+
+    def __init__(self, n, seed):
+        self.bit_generator = instance_rng(n, seed)
+
+    def rows(self, nrows, ncols):
+        """
+        Draw the next nrows rows of ncols bits.
+
+        Returns:
+            np.ndarray: uint8 array of shape (nrows, ncols).
+        """
+        words = self.bit_generator.random_raw(nrows * nb_words(ncols)).reshape(nrows, nb_words(ncols))
+        return unpack_bits(words, ncols)
+
+
+class LegacyBitStream:
+    """
+    Rows of random bits identical to random.seed(seed) followed by calls to random.randint(0, 1).
+
+    random.randint(0, 1) takes the 2 high bits of a 32-bit Mersenne Twister output and
+    rejects them when they are >= 2, so the same bits can be obtained in bulk by running
+    NumPy's MT19937 from the state of random.Random(seed) and filtering its raw outputs.
+    """
+
+    def __init__(self, n, seed, emulated=None):
+        self.emulated = _legacy_emulation_ok() if emulated is None else emulated
+        if self.emulated:
+            # Same Mersenne Twister state as random.seed(seed)
+            state = random.Random(seed).getstate()[1]
+            self.bit_generator = np.random.MT19937()
+            self.bit_generator.state = {
+                "bit_generator": "MT19937",
+                "state": {"key": np.array(state[:624], dtype=np.uint32), "pos": state[624]},
+            }
+        else:
+            self.rng = random.Random(seed)
+        self.pending = np.empty(0, dtype=np.uint8)
+
+    def take(self, count):
+        """
+        Draw the next 'count' bits.
+
+        Returns:
+            np.ndarray: uint8 array of 'count' values in {0, 1}.
+        """
+        if not self.emulated:
+            return np.fromiter((self.rng.randint(0, 1) for _ in range(count)), dtype=np.uint8, count=count)
+
+        chunks = [self.pending]
+        available = self.pending.size
+        while available < count:
+            # About half of the outputs are accepted
+            top = (self.bit_generator.random_raw(2 * (count - available) + 64) >> np.uint64(30)).astype(np.uint8)
+            accepted = top[top < 2]
+            chunks.append(accepted)
+            available += accepted.size
+        bits = np.concatenate(chunks)
+        self.pending = bits[count:]
+        return bits[:count]
+
+    def rows(self, nrows, ncols):
+        """
+        Draw the next nrows rows of ncols bits.
+
+        Returns:
+            np.ndarray: uint8 array of shape (nrows, ncols).
+        """
+        return self.take(nrows * ncols).reshape(nrows, ncols)
+
+
+@functools.lru_cache(maxsize=None)
+def _legacy_emulation_ok():
+    """Check once that the bulk emulation of random.randint(0, 1) matches this Python version."""
+    rng = random.Random(12345)
+    expected = [rng.randint(0, 1) for _ in range(256)]
+    return LegacyBitStream(0, 12345, emulated=True).take(256).tolist() == expected
+
+
+def bit_stream(n, seed, legacy=True):
+    """
+    Random bit stream of the instance (n, seed).
+
+    Args:
+        n (int): Size of the instance.
+        seed (int): Random seed of the instance.
+        legacy (bool): If True, reproduce exactly the bits of random.seed(seed) followed by
+            calls to random.randint(0, 1). Otherwise use the NumPy stream of instance_rng.
+
+    Returns:
+        LegacyBitStream or NumpyBitStream: Object whose rows(nrows, ncols) method draws bits.
+    """
+    return LegacyBitStream(n, seed) if legacy else NumpyBitStream(n, seed)
+
+
+def write_bit_rows(file, stream, nrows, ncols, block_bytes=WRITE_BLOCK_BYTES):
+    """
+    Stream nrows random rows of ncols '0'/'1' characters to a binary file, block by block.
+
+    Memory is bounded by about block_bytes whatever the size of the matrix.
+
+    Args:
+        file (file object): File opened in binary mode.
+        stream (LegacyBitStream or NumpyBitStream): Source of random bits.
+        nrows (int): Number of rows to write.
+        ncols (int): Number of bits per row.
+        block_bytes (int): Approximate size of the buffer written at once.
+    """
+    block = max(1, block_bytes // (ncols + 1))
+    for start in range(0, nrows, block):
+        count = min(block, nrows - start)
+        buf = np.empty((count, ncols + 1), dtype=np.uint8)
+        buf[:, :ncols] = stream.rows(count, ncols)
+        buf[:, :ncols] += ord("0")
+        buf[:, ncols] = ord("\n")
+        file.write(buf.tobytes())
+
+
+def _run_job(job):
+    task, n, seed, legacy = job
+    return n, seed, task(n, seed, legacy=legacy)
+
+
+def generate_grid(task, ns, seeds, workers=None, legacy=False):
+    """
+    Generate every instance of a (n, seed) grid over a process pool.
+
+    Args:
+        task (function): Picklable function task(n, seed, legacy=...) generating one instance
+            and returning its path.
+        ns (list of int): Instance sizes.
+        seeds (list of int): Random seeds.
+        workers (int or None): Number of worker processes (default: os.cpu_count()).
+        legacy (bool): Passed to task, selects the random.seed compatible bit stream.
+
+    Returns:
+        list of tuple: (n, seed, path) of the generated instances.
+    """
+    jobs = [(task, n, seed, legacy) for seed, n in itertools.product(seeds, ns)]
+    # Largest instances first, so that they do not end up alone at the tail of the pool
+    jobs.sort(key=lambda job: -job[1])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_run_job, jobs))
@@ -0,0 +1,248 @@
+import numpy as np
+
+WORD_BITS = 64
+
+
+if hasattr(np, "bitwise_count"):
+    def popcount(words):
+        """
+        Count the bits set in each element of a uint64 array.
+
+        Args:
+            words (np.ndarray): Array of uint64 words.
+
+        Returns:
+            np.ndarray: Array of the same shape with the number of bits set in each word.
+        """
+        return np.bitwise_count(words)
+else:
+    # Byte lookup table for NumPy versions without np.bitwise_count
+    _POPCOUNT_TABLE = np.array([bin(b).count("1") for b in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """
+        Count the bits set in each element of a uint64 array.
+
+        Args:
+            words (np.ndarray): Array of uint64 words.
+
+        Returns:
+            np.ndarray: Array of the same shape with the number of bits set in each word.
+        """
+        words = np.ascontiguousarray(words, dtype=np.uint64)
+        counts = _POPCOUNT_TABLE[words.view(np.uint8)]
+        return counts.reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def nb_words(ncols):
+    """Number of uint64 words needed to store a row of ncols bits."""
+    return (ncols + WORD_BITS - 1) // WORD_BITS
+
+
+def pack_bits(bits):
+    """
+    Pack a 2-D array of 0/1 values into rows of uint64 words.
+
+    Bit j of a row is stored in word j // 64 at position j % 64 (little-endian bit order),
+    unused bits of the last word are zero.
+
+    Args:
+        bits (np.ndarray): 2-D array of 0/1 values, one matrix row per array row.
+
+    Returns:
+        words (np.ndarray): uint64 array of shape (nrows, nb_words(ncols)).
+    """
+    # A contiguous copy first is much faster than packing a strided (e.g. transposed) view
+    bits = np.ascontiguousarray(bits, dtype=np.uint8)
+    nrows, ncols = bits.shape
+    packed = np.packbits(bits, axis=1, bitorder="little")
+    buf = np.zeros((nrows, nb_words(ncols) * 8), dtype=np.uint8)
+    buf[:, :packed.shape[1]] = packed
+    return buf.view("<u8").astype(np.uint64)
+
+
+def unpack_bits(words, ncols):
+    """
+    Unpack rows of uint64 words into a 2-D array of 0/1 values.
+
+    Args:
+        words (np.ndarray): uint64 array of shape (nrows, nb_words(ncols)).
+        ncols (int): Number of meaningful bits per row.
+
+    Returns:
+        bits (np.ndarray): uint8 array of shape (nrows, ncols).
+    """
+    words = np.ascontiguousarray(words, dtype="<u8")
+    as_bytes = words.view(np.uint8).reshape(words.shape[0], words.shape[1] * 8)
+    return np.unpackbits(as_bytes, axis=1, bitorder="little")[:, :ncols]
+
+
+class GF2Matrix:
+    """
+    Dense matrix over GF(2) whose rows are stored as packed uint64 words.
+
+    Attributes:
+        words (np.ndarray): uint64 array of shape (nrows, nb_words(ncols)).
+        ncols (int): Number of columns of the matrix.
+    """
+
+    def __init__(self, words, ncols):
+        self.words = np.ascontiguousarray(words, dtype=np.uint64)
+        self.ncols = ncols
+        if self.words.ndim != 2 or self.words.shape[1] != nb_words(ncols):
+            raise ValueError(f"Expected {nb_words(ncols)} words per row for {ncols} columns, got shape {self.words.shape}.")
+
+    @classmethod
+    def zeros(cls, nrows, ncols):
+        """Build the all-zero nrows x ncols matrix."""
+        return cls(np.zeros((nrows, nb_words(ncols)), dtype=np.uint64), ncols)
+
+    @classmethod
+    def identity(cls, size):
+        """Build the size x size identity matrix."""
+        return cls.from_bits(np.eye(size, dtype=np.uint8))
+
+    @classmethod
+    def from_bits(cls, bits):
+        """
+        Build a matrix from a 2-D array of 0/1 values.
+
+        Args:
+            bits (array-like): 2-D array of 0/1 values.
+        """
+        bits = np.asarray(bits, dtype=np.uint8)
+        return cls(pack_bits(bits), bits.shape[1])
+
+    @classmethod
+    def from_strings(cls, rows):
+        """
+        Build a matrix from rows given as strings of '0' and '1'.
+
+        Args:
+            rows (list of str): Matrix rows, all of the same length.
+        """
+        rows = [row.strip() for row in rows]
+        ncols = len(rows[0]) if rows else 0
+        if any(len(row) != ncols for row in rows):
+            raise ValueError("All rows must have the same length.")
+        raw = np.frombuffer("".join(rows).encode("ascii"), dtype=np.uint8)
+        bits = raw.reshape(len(rows), ncols) - ord("0")
+        if bits.size and bits.max() > 1:
+            raise ValueError("Rows must only contain '0' and '1' characters.")
+        return cls.from_bits(bits)
+
+    @property
+    def nrows(self):
+        return self.words.shape[0]
+
+    @property
+    def shape(self):
+        return self.nrows, self.ncols
+
+    def __len__(self):
+        return self.nrows
+
+    def __eq__(self, other):
+        if not isinstance(other, GF2Matrix):
+            return NotImplemented
+        return self.ncols == other.ncols and np.array_equal(self.words, other.words)
+
+    def __getitem__(self, index):
+        """Return the bit at position (i, j)."""
+        i, j = index
+        return int((self.words[i, j // WORD_BITS] >> np.uint64(j % WORD_BITS)) & np.uint64(1))
+
+    def __repr__(self):
+        return f"GF2Matrix(nrows={self.nrows}, ncols={self.ncols})"
+
+    def copy(self):
+        return GF2Matrix(self.words.copy(), self.ncols)
+
+    def to_bits(self):
+        """Return the matrix as a uint8 array of 0/1 values."""
+        return unpack_bits(self.words, self.ncols)
+
+    def to_strings(self):
+        """Return the matrix rows as strings of '0' and '1'."""
+        chars = self.to_bits() + ord("0")
+        return [row.tobytes().decode("ascii") for row in chars]
+
+    def row_support(self, i):
+        """
+        Column indices of the non-zero entries of row i.
+
+        Args:
+            i (int): Row index.
+
+        Returns:
+            np.ndarray: Sorted column indices (int64).
+        """
+        return np.flatnonzero(unpack_bits(self.words[i:i + 1], self.ncols)[0])
+
+    def row_supports(self):
+        """
+        Column indices of the non-zero entries of every row, computed in one pass.
+
+        Returns:
+            list of np.ndarray: One array of sorted column indices per row.
+        """
+        if self.nrows == 0:
+            return []
+        rows, cols = np.nonzero(self.to_bits())
+        bounds = np.searchsorted(rows, np.arange(1, self.nrows))
+        return np.split(cols, bounds)
+
+    def col_support(self, j):
+        """
+        Row indices of the non-zero entries of column j.
+
+        Args:
+            j (int): Column index.
+
+        Returns:
+            np.ndarray: Sorted row indices (int64).
+        """
+        column = (self.words[:, j // WORD_BITS] >> np.uint64(j % WORD_BITS)) & np.uint64(1)
+        return np.flatnonzero(column)
+
+    def transpose(self):
+        """Return the transposed matrix."""
+        return GF2Matrix.from_bits(self.to_bits().T)
+
+    @property
+    def T(self):
+        return self.transpose()
+
+    def hstack(self, other):
+        """
+        Concatenate two matrices with the same number of rows side by side.
+
+        Args:
+            other (GF2Matrix): Matrix placed to the right of self.
+        """
+        if self.nrows != other.nrows:
+            raise ValueError("Both matrices must have the same number of rows.")
+        return GF2Matrix.from_bits(np.hstack([self.to_bits(), other.to_bits()]))
+
+    def xor_rows(self, dst, src):
+        """
+        In-place row operation: row[dst] ^= row[src].
+
+        Args:
+            dst (int): Index of the row that is modified.
+            src (int): Index of the row added to it.
+        """
+        self.words[dst] ^= self.words[src]
+
+    def row_weights(self):
+        """
+        Hamming weight of every row.
+
+        Returns:
+            np.ndarray: int64 array of length nrows.
+        """
+        return popcount(self.words).sum(axis=1, dtype=np.int64)
+
+    def popcount(self):
+        """Total number of non-zero entries of the matrix."""
+        return int(self.row_weights().sum())
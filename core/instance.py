@@ -0,0 +1,210 @@
+import os
+import mmap
+from collections import namedtuple
+
+import numpy as np
+
+from core.gf2 import GF2Matrix, pack_bits
+from core.compress import compression_of, read_bytes
+
+Instance = namedtuple("Instance", ["kind", "n", "seed", "w", "H_transpose", "s_transpose"])
+Instance.__doc__ = """
+A syndrome decoding (SD) or low-weight codeword (LW) instance.
+
+Attributes:
+    kind (str): 'SD' or 'LW'.
+    n (int): Total number of variables.
+    seed (int): Random seed used to generate the instance.
+    w (int or None): Maximum Hamming weight (None for LW).
+    H_transpose (GF2Matrix): The matrix P of H = [I | P], one row per equation, as returned by parse_input_file.
+    s_transpose (str or None): The syndrome vector (None for LW).
+"""
+
+H_COMMENT = "# H^transpose (each line corresponds to column of H, the identity part is omitted)"
+
+
+def _header_lines(buf, count, offset=0):
+    """
+    Split the next lines of a buffer.
+
+    Args:
+        buf (mmap or bytes): File content.
+        count (int): Number of lines to read.
+        offset (int): Offset of the first line.
+
+    Returns:
+        lines (list of bytes): The lines, without their end of line.
+        offset (int): Offset of the first byte after them.
+    """
+    lines = []
+    for _ in range(count):
+        end = buf.find(b"\n", offset)
+        if end < 0:
+            raise ValueError("Unexpected end of file in the instance header.")
+        lines.append(bytes(buf[offset:end]).rstrip(b"\r"))
+        offset = end + 1
+    return lines, offset
+
+
+def _expect(line, expected, file_name, what):
+    if line.strip() != expected:
+        raise ValueError(f"{file_name}: expected '{expected.decode()}' before {what}, found '{line.decode(errors='replace')}'.")
+
+
+def _fixed_stride_bits(buf, offset, nrows, ncols):
+    """
+    Decode a block of lines of exactly ncols characters followed by '\n'.
+
+    The views on buf are local to this function, so that the mapping can be closed as soon
+    as it returns (even when the caller then raises).
+
+    Returns:
+        bits (np.ndarray or None): Boolean array of shape (nrows, ncols), None if the lines
+            do not have a fixed stride.
+        digits_only (bool): False if the block contains characters other than '0' and '1'.
+    """
+    block = np.frombuffer(buf, dtype=np.uint8, count=nrows * (ncols + 1), offset=offset).reshape(nrows, ncols + 1)
+    if not np.all(block[:, ncols] == ord("\n")):
+        return None, True
+    chars = block[:, :ncols]
+    if np.any((chars - np.uint8(ord("0"))) > 1):
+        return None, False
+    return chars == ord("1"), True
+
+
+def _read_bit_block(buf, offset, nrows, ncols, file_name):
+    """
+    Convert nrows text lines of ncols '0'/'1' characters into a 0/1 array without copying the file.
+
+    Fast path for lines of exactly ncols characters followed by '\n'; other layouts
+    (CRLF, trailing spaces) go through a line-by-line parse.
+
+    Returns:
+        bits (np.ndarray): Boolean array of shape (nrows, ncols).
+        offset (int): Offset of the first byte after the block.
+    """
+    stride = ncols + 1
+    end = offset + nrows * stride
+    if end <= len(buf):
+        bits, digits_only = _fixed_stride_bits(buf, offset, nrows, ncols)
+        if not digits_only:
+            raise ValueError(f"{file_name}: the matrix must only contain '0' and '1' characters.")
+        if bits is not None:
+            return bits, end
+
+    rows = []
+    for _ in range(nrows):
+        line_end = buf.find(b"\n", offset)
+        if line_end < 0:
+            line_end = len(buf)
+        rows.append(bytes(buf[offset:line_end]).strip().decode("ascii"))
+        offset = line_end + 1
+    if any(len(row) != ncols for row in rows):
+        raise ValueError(f"{file_name}: expected {nrows} lines of {ncols} bits.")
+    return GF2Matrix.from_strings(rows).to_bits().astype(bool), offset
+
+
+def _parse_text_instance(buf, file_name):
+    """Parse the content of an instance file (mmap or bytes)."""
+    lines, offset = _header_lines(buf, 5)
+    _expect(lines[0], b"# n", file_name, "n")
+    _expect(lines[2], b"# seed", file_name, "the seed")
+    n = int(lines[1])
+    seed = int(lines[3])
+    m = n // 2
+    if lines[4].strip() == b"# m":
+        # Reduced instances (see core.reduce) give their number of equations
+        more, offset = _header_lines(buf, 2, offset)
+        m = int(more[0])
+        lines[4] = more[1]
+        if not 0 <= m <= n:
+            raise ValueError(f"{file_name}: the number of equations must be between 0 and n.")
+
+    kind = "SD" if lines[4].strip() == b"# w" else "LW"
+    w = None
+    if kind == "SD":
+        more, offset = _header_lines(buf, 2, offset)
+        w = int(more[0])
+        lines.append(more[1])
+    if not lines[-1].startswith(b"# H^transpose"):
+        raise ValueError(f"{file_name}: missing '# H^transpose' header line.")
+
+    # The file stores the n - m columns of P, one per line
+    bits, offset = _read_bit_block(buf, offset, n - m, m, file_name)
+    H_transpose = GF2Matrix(pack_bits(bits.T), n - m)
+
+    s_transpose = None
+    if kind == "SD":
+        tail = bytes(buf[offset:]).split(b"\n")
+        if len(tail) < 2:
+            raise ValueError(f"{file_name}: missing syndrome.")
+        _expect(tail[0], b"# s^transpose", file_name, "the syndrome")
+        s_transpose = tail[1].strip().decode("ascii")
+        if len(s_transpose) != m or set(s_transpose) - {"0", "1"}:
+            raise ValueError(f"{file_name}: the syndrome must be a binary string of length {m}.")
+
+    return Instance(kind, n, seed, w, H_transpose, s_transpose)
+
+
+def read_text_instance(file_name):
+    """
+    Read an instance in the text format written by syndrome_generate.py or lowweight_generate.py.
+
+    The file is memory-mapped and the matrix block is converted to packed bits with vectorized
+    byte operations, without building one Python object per line or per bit. The header
+    ('# n', '# seed', optional '# m' and '# w', and the H^transpose comment) is validated,
+    the number of equations is n // 2 unless a '# m' section gives it, SD files are
+    recognized by their '# w' section. A compressed file (see core.compress) is decompressed
+    in memory instead.
+
+    Args:
+        file_name (str): Path to the instance file.
+
+    Returns:
+        Instance: The parsed instance.
+    """
+    if compression_of(file_name) is not None:
+        buf = read_bytes(file_name)
+        if not buf:
+            raise ValueError(f"{file_name}: empty instance file.")
+        return _parse_text_instance(buf, file_name)
+
+    with open(file_name, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{file_name}: empty instance file.")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return _parse_text_instance(buf, file_name)
+
+
+def format_text_instance(instance):
+    """
+    Render an instance in the text format of the generators.
+
+    Args:
+        instance (Instance): The instance.
+
+    Returns:
+        bytes: Content of the instance file.
+    """
+    text = f"# n\n{instance.n}\n# seed\n{instance.seed}\n"
+    if instance.H_transpose.nrows != instance.n // 2:
+        text += f"# m\n{instance.H_transpose.nrows}\n"
+    if instance.kind == "SD":
+        text += f"# w\n{instance.w}\n"
+    text += H_COMMENT + "\n"
+    text += "".join(row + "\n" for row in instance.H_transpose.transpose().to_strings())
+    if instance.kind == "SD":
+        text += "# s^transpose\n" + instance.s_transpose + "\n"
+    return text.encode("ascii")
+
+
+def write_text_instance(instance, file_name):
+    """
+    Write an instance in the text format of the generators.
+
+    Args:
+        instance (Instance): The instance.
+        file_name (str): Path to the output file.
+    """
+    with open(file_name, 'wb') as f:
+        f.write(format_text_instance(instance))
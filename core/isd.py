@@ -0,0 +1,284 @@
+"""
+Information set decoding (Prange, Lee-Brickell) of SD/LW instances on packed columns, over a process pool.
+"""
+
+import os
+import time
+import itertools
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from core.gf2 import WORD_BITS, GF2Matrix, pack_bits, popcount
+from core.linalg import echelon
+
+# Algorithms of the ISD runners
+ALGORITHMS = ("prange", "lee-brickell")
+
+# Iterations run by a worker between two reports to the pool (each batch starts from a fresh information set)
+DEFAULT_BATCH = 256
+
+# Column swaps between two information sets of each algorithm: a single one when trying a set is
+# almost free (Prange), more when the subsets dominate and consecutive sets should differ more
+DEFAULT_SWAPS = {"prange": 1, "lee-brickell": 16}
+
+ISDResult = namedtuple("ISDResult", ["status", "solution", "weight", "iterations", "seconds"])
+ISDResult.__doc__ = """
+Outcome of an ISD search.
+
+Attributes:
+    status (str): 'sat' (a vector was found) or 'timeout' (none before the limits, ISD cannot prove
+        that there is none).
+    solution (str or None): Binary string of the best vector found.
+    weight (int or None): Its Hamming weight.
+    iterations (int): Number of information sets tried.
+    seconds (float): Time spent searching.
+"""
+
+# Parity-check matrix, syndrome, subset sizes and swaps of the searches run in this process
+_state = {}
+
+
+def _init_state(H, s, sizes, swaps, stop_event):
+    _state.update(H=H, s=s, sizes=sizes, swaps=swaps, stop_event=stop_event)
+
+
+def _information_set(rng):
+    """
+    A random information set, by elimination of [H | s] in a random column order.
+
+    Returns:
+        columns (np.ndarray): Columns of the reduced matrix packed over its independent rows, one
+            row of words per column (the pivot columns are unit vectors).
+        target (np.ndarray): The reduced syndrome s', packed the same way.
+        pivots (np.ndarray): Pivot column of each row.
+        others (np.ndarray): The columns outside the information set.
+    """
+    H, s = _state["H"], _state["s"]
+    form = echelon(H, s, rng.permutation(H.ncols))
+    rank = len(form.pivots)
+    columns = pack_bits(form.matrix.to_bits()[:rank].T)
+    target = pack_bits(form.rhs[None, :rank])[0]
+    pivots = np.array(form.pivots, dtype=np.int64)
+    return columns, target, pivots, np.setdiff1d(np.arange(H.ncols), pivots)
+
+
+def _swap(rng, columns, target, pivots, others):
+    """
+    Move to a neighbouring information set: a random column c enters it, the pivot of one of its rows r leaves.
+
+    The pivot on (r, c) adds row r to the other rows of column c. On packed columns, this is one
+    XOR of column c (without bit r) into every column with bit r set, and into s' if it has it.
+    """
+    candidates = others[columns[others].any(axis=1)]
+    if len(candidates) == 0:
+        return
+    c = int(rng.choice(candidates))
+    r = int(rng.choice(np.flatnonzero(np.unpackbits(columns[c].view(np.uint8), bitorder="little"))))
+    word, bit = divmod(r, WORD_BITS)
+    bit = np.uint64(bit)
+
+    mask = columns[c].copy()
+    mask[word] ^= np.uint64(1) << bit
+    hits = ((columns[:, word] >> bit) & np.uint64(1)).astype(bool)
+    columns[hits] ^= mask
+    if (target[word] >> bit) & np.uint64(1):
+        target ^= mask
+    others[others == c] = pivots[r]
+    pivots[r] = c
+
+
+def _evaluate(columns, target, pivots, others, bound, stop):
+    """
+    Try the subsets of the columns outside the information set.
+
+    With J the pivot columns and K the others, the equations read e_J = s' + R e_K. For every
+    subset T of K of an allowed size, the vector with e_T = 1 and e_J = s' + sum(R_t for t in T)
+    is a solution of weight |T| + wt(e_J): the sums are XORs of packed columns and their weights
+    a vectorized popcount.
+
+    Returns:
+        The lightest vector found of weight <= bound as (weight, bits), or None. The subsets left
+        are skipped once one of weight <= stop is found.
+    """
+    outside = columns[others]
+    best = None
+    for size in _state["sizes"]:
+        for subset, weights in _subset_weights(outside, target, size):
+            i = int(np.argmin(weights))
+            if weights[i] <= bound and (best is None or weights[i] < best[0]):
+                chosen = subset[:-1] + [subset[-1] + i] if size else []
+                best = (int(weights[i]), _vector(len(columns), pivots, others, outside, target, chosen))
+                if best[0] <= stop:
+                    return best
+    return best
+
+
+def _subset_weights(columns, target, size):
+    """
+    Weights of the vectors e for every subset T of the columns of a given size, vectorized over the last column of T.
+
+    Yields:
+        (subset, weights): The first columns of the subsets (increasing indices) followed by the
+            first possible last column, and the weight |T| + wt(target + sum of T) for each last
+            column from it on.
+    """
+    if size == 0:
+        yield [], popcount(target).sum(dtype=np.int64)[None]
+        return
+    for prefix in itertools.combinations(range(len(columns)), size - 1):
+        start = prefix[-1] + 1 if prefix else 0
+        if start == len(columns):
+            continue
+        partial = target.copy()
+        for j in prefix:
+            partial ^= columns[j]
+        yield list(prefix) + [start], popcount(columns[start:] ^ partial).sum(axis=1, dtype=np.int64) + size
+
+
+def _vector(n, pivots, others, columns, target, subset):
+    """The vector e of an ISD iteration for a subset T of the non-pivot columns (indices into others)."""
+    e_J = target.copy()
+    for j in subset:
+        e_J ^= columns[j]
+    e = np.zeros(n, dtype=np.uint8)
+    e[pivots] = np.unpackbits(e_J.view(np.uint8), bitorder="little")[:len(pivots)]
+    e[others[subset]] = 1
+    return e
+
+
+def _run(seed, iterations, deadline, bound, stop):
+    """
+    Run ISD iterations in a worker until a vector of weight <= stop is found, the deadline,
+    the stop event or the number of iterations.
+
+    The first information set comes from a full elimination in a random column order, each
+    next one from a few column swaps (Canteaut-Chabaud), which cost one vectorized XOR each
+    instead of an elimination (a fresh elimination when the state has no swaps).
+
+    Returns:
+        done (int): Iterations run.
+        best (tuple or None): The lightest (weight, bits) found of weight <= bound.
+    """
+    rng = np.random.default_rng(seed)
+    stop_event, swaps = _state["stop_event"], _state["swaps"]
+    columns, target, pivots, others = _information_set(rng)
+    best = None
+    done = 0
+    while done < iterations and time.time() < deadline and not (stop_event is not None and stop_event.is_set()):
+        found = _evaluate(columns, target, pivots, others, bound, stop)
+        done += 1
+        if found is not None:
+            best, bound = found, found[0] - 1
+            if best[0] <= stop:
+                break
+        if swaps:
+            for _ in range(swaps):
+                _swap(rng, columns, target, pivots, others)
+        else:
+            columns, target, pivots, others = _information_set(rng)
+    return done, best
+
+
+def isd(H_transpose, s_transpose=None, w=None, algorithm="prange", p=2, timeout=None, max_iterations=None,
+        workers=1, seed=0, batch=DEFAULT_BATCH, swaps=None, log=print):
+    """
+    Search a vector e of low weight with [I | P] e = s by information set decoding.
+
+    SD (s given): stops at the first solution of weight <= w. LW (s None): minimizes the weight of
+    a non-zero codeword until the limits, or until one of weight <= w is found. Prange tries the
+    information set alone (one column outside it for LW, which needs a non-zero codeword),
+    Lee-Brickell every subset of up to p columns outside it.
+
+    The iterations are spread over a process pool in batches, each batch with its own random
+    stream derived from seed. Without a time limit nor an iteration budget, an LW search needs w.
+
+    Args:
+        H_transpose (GF2Matrix): The matrix P, one row per equation.
+        s_transpose (str or None): The syndrome (None for LW).
+        w (int or None): SD: maximum weight. LW: weight at which the search stops (None: limits only).
+        algorithm (str): 'prange' or 'lee-brickell'.
+        p (int): Largest subset size of Lee-Brickell.
+        timeout (float or None): Time limit in seconds.
+        max_iterations (int or None): Budget of information sets.
+        workers (int or None): Processes (None: all cores), 1 searches in this process.
+        seed (int): Seed of the random column permutations.
+        batch (int): Iterations of a worker between two reports.
+        swaps (int or None): Column swaps between two information sets, 0 for a fresh elimination
+            every time (default: DEFAULT_SWAPS of the algorithm).
+        log (function): Progress messages.
+
+    Returns:
+        ISDResult: The best vector found.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown ISD algorithm '{algorithm}', expected one of {ALGORITHMS}.")
+    lw = s_transpose is None
+    if lw and w is None and timeout is None and max_iterations is None:
+        raise ValueError("A low-weight codeword search needs a time limit, an iteration budget or a target weight.")
+
+    m = H_transpose.nrows
+    H = GF2Matrix.identity(m).hstack(H_transpose)
+    s = np.zeros(m, dtype=np.uint8) if lw else np.frombuffer(s_transpose.encode("ascii"), dtype=np.uint8) - np.uint8(ord("0"))
+    largest = p if algorithm == "lee-brickell" else (1 if lw else 0)
+    sizes = list(range(1 if lw else 0, largest + 1))
+    if swaps is None:
+        swaps = DEFAULT_SWAPS[algorithm]
+
+    bound = H.ncols if lw else w
+    stop = 0 if w is None else w
+    start = time.time()
+    deadline = float("inf") if timeout is None else start + timeout
+
+    best = None
+    iterations = 0
+    submitted = 0
+
+    def next_task():
+        nonlocal submitted
+        count = batch if max_iterations is None else min(batch, max_iterations - submitted)
+        submitted += count
+        return (np.random.SeedSequence([seed, submitted]), count, deadline, bound, stop)
+
+    def finished():
+        return (best is not None and best[0] <= stop) or time.time() >= deadline
+
+    def exhausted():
+        return max_iterations is not None and submitted >= max_iterations
+
+    def record(done, found):
+        nonlocal best, bound, iterations
+        iterations += done
+        if found is not None and (best is None or found[0] < best[0]):
+            best = found
+            bound = best[0] - 1
+            log(f"weight {best[0]} after {iterations} iterations ({time.time() - start:.3f}s)")
+
+    if workers == 1:
+        _init_state(H, s, sizes, swaps, None)
+        while not finished() and not exhausted():
+            record(*_run(*next_task()))
+        _state.clear()
+    else:
+        workers = workers or os.cpu_count()
+        stop_event = multiprocessing.Event()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_state, initargs=(H, s, sizes, swaps, stop_event)) as executor:
+            pending = set()
+            while True:
+                while len(pending) < workers and not finished() and not exhausted():
+                    pending.add(executor.submit(_run, *next_task()))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(*future.result())
+                if finished():
+                    # Cut the running batches short, the loop still collects their results
+                    stop_event.set()
+
+    seconds = time.time() - start
+    if best is None:
+        return ISDResult('timeout', None, None, iterations, seconds)
+    return ISDResult('sat', "".join(map(str, best[1].tolist())), best[0], iterations, seconds)
@@ -0,0 +1,100 @@
+"""
+Gaussian elimination over GF(2) on packed rows: echelon form, rank, kernel dimension, redundant equations.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from core.gf2 import WORD_BITS, GF2Matrix
+
+Echelon = namedtuple("Echelon", ["matrix", "rhs", "pivots", "rows"])
+Echelon.__doc__ = """
+Reduced row echelon form of a linear system over GF(2).
+
+Attributes:
+    matrix (GF2Matrix): The reduced matrix, its first len(pivots) rows are non-zero.
+    rhs (np.ndarray or None): uint8 right-hand side transformed with the rows, None if none was given.
+    pivots (list of int): Pivot column of each non-zero row, in the order the columns were tried.
+    rows (np.ndarray): Original index of the row each result row was pivoted from. rows[:rank] are
+        linearly independent equations that span the system, rows[rank:] are redundant (combinations
+        of them).
+"""
+
+
+def echelon(matrix, rhs=None, columns=None):
+    """
+    Reduced row echelon form of a matrix (and of a right-hand side) by Gauss-Jordan elimination.
+
+    Each pivot row is added to every other row with a bit in the pivot column as one vectorized
+    XOR over the packed words. In the natural column order, the XOR starts at the word of the
+    pivot (the pivot row is zero before it).
+
+    Args:
+        matrix (GF2Matrix): The matrix, it is not modified.
+        rhs (str or array-like or None): Right-hand side, one bit per row.
+        columns (array-like or None): Order in which the columns are tried as pivots, e.g. a
+            random permutation to pivot on a random information set (default: 0..ncols-1).
+
+    Returns:
+        Echelon: The reduced system, its pivots and the origin of its rows.
+    """
+    words = matrix.words.copy()
+    nrows = matrix.nrows
+    b = None if rhs is None else _rhs_bits(rhs, nrows)
+    rows = np.arange(nrows)
+    pivots = []
+
+    row = 0
+    for col in (range(matrix.ncols) if columns is None else columns):
+        if row == nrows:
+            break
+        word, shift = divmod(int(col), WORD_BITS)
+        start = word if columns is None else 0
+        shift = np.uint64(shift)
+        candidates = np.flatnonzero((words[row:, word] >> shift) & np.uint64(1))
+        if len(candidates) == 0:
+            continue
+
+        pivot = row + int(candidates[0])
+        if pivot != row:
+            words[[row, pivot]] = words[[pivot, row]]
+            rows[[row, pivot]] = rows[[pivot, row]]
+            if b is not None:
+                b[[row, pivot]] = b[[pivot, row]]
+
+        hits = ((words[:, word] >> shift) & np.uint64(1)).astype(bool)
+        hits[row] = False
+        if hits.any():
+            words[hits, start:] ^= words[row, start:]
+            if b is not None:
+                b[hits] ^= b[row]
+        pivots.append(int(col))
+        row += 1
+
+    return Echelon(GF2Matrix(words, matrix.ncols), b, pivots, rows)
+
+
+def _rhs_bits(rhs, nrows):
+    if isinstance(rhs, str):
+        b = np.frombuffer(rhs.encode("ascii"), dtype=np.uint8) - np.uint8(ord("0"))
+    else:
+        b = np.asarray(rhs, dtype=np.uint8)
+    if b.shape != (nrows,):
+        raise ValueError(f"The right-hand side must have {nrows} bits.")
+    return b.copy()
+
+
+def rank(matrix):
+    """Rank of a matrix over GF(2)."""
+    return len(echelon(matrix).pivots)
+
+
+def kernel_dimension(matrix):
+    """Dimension of the kernel {x : matrix.x = 0} over GF(2) (number of columns minus the rank)."""
+    return matrix.ncols - rank(matrix)
+
+
+def is_consistent(form):
+    """Whether the system of an Echelon form has a solution (no redundant row with a right-hand side of 1)."""
+    return form.rhs is None or not form.rhs[len(form.pivots):].any()
@@ -0,0 +1,139 @@
+"""
+Per seed tree manifest of the generated models, for incremental rebuilds.
+
+Challenges/seed_<s>/manifest.json maps every output (ANF, CNF, XNF, WCNF, WXNF), by its path
+relative to the seed folder, to the hash of its inputs and parameters, and to the size and
+modification time of the file that was written. An output is up to date when its hash is
+unchanged and the file on disk is still the one recorded.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import contextlib
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, concurrent updates are then unprotected
+    fcntl = None
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_key(*input_digests, **params):
+    """
+    Hash of the inputs and parameters of an output.
+
+    Args:
+        *input_digests (str): Digests of the input files, from file_digest.
+        **params: JSON-serializable parameters the output depends on (format, encodings, w...).
+
+    Returns:
+        str: SHA-256 hex digest.
+    """
+    payload = json.dumps({"inputs": list(input_digests), "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _stamp(path):
+    """Size and modification time of a file, None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+@contextlib.contextmanager
+def _locked(lock_path):
+    """Exclusive lock serializing the updates of a manifest between processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class Manifest:
+    """
+    Manifest of the outputs generated in one Challenges/seed_<s> folder.
+
+    Entries are read once on creation. Several processes can record outputs in the same
+    manifest: every update merges into the file under a lock and replaces it atomically.
+
+    Attributes:
+        root (str): Seed folder.
+        path (str): Path of the manifest file.
+        force (bool): Only trust the outputs recorded through this object, so that every
+            output is rebuilt once (shared ones, such as the ANF file, are not rebuilt twice).
+        entries (dict): Relative output path -> {"key": str, "stamp": [size, mtime_ns]}.
+    """
+
+    def __init__(self, root, force=False):
+        self.root = root
+        self.path = os.path.join(root, MANIFEST_NAME)
+        self.force = force
+        self.entries = self._read()
+        self._recorded = set()
+
+    def _read(self):
+        """Entries of the manifest file, empty if it is missing, unreadable or from another version."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("outputs", {})
+
+    def _relative(self, output_file):
+        return os.path.relpath(output_file, self.root).replace(os.sep, "/")
+
+    def is_fresh(self, output_file, key):
+        """
+        Whether output_file was generated from the inputs and parameters hashed in key and
+        has not been modified or removed since.
+        """
+        name = self._relative(output_file)
+        if self.force and name not in self._recorded:
+            return False
+        entry = self.entries.get(name)
+        return entry is not None and entry["key"] == key and entry["stamp"] == _stamp(output_file)
+
+    def record(self, output_file, key):
+        """Record output_file, just written, as generated from key."""
+        name = self._relative(output_file)
+        self._update({name: {"key": key, "stamp": _stamp(output_file)}})
+        self._recorded.add(name)
+
+    def _update(self, changes):
+        """Merge changes into the manifest file, atomically."""
+        os.makedirs(self.root, exist_ok=True)
+        with _locked(self.path + ".lock"):
+            entries = self._read()
+            entries.update(changes)
+            with tempfile.NamedTemporaryFile("w", dir=self.root, suffix=".tmp", delete=False) as f:
+                try:
+                    json.dump({"version": MANIFEST_VERSION, "outputs": entries}, f, indent=1, sort_keys=True)
+                except BaseException:
+                    f.close()
+                    os.remove(f.name)
+                    raise
+            os.replace(f.name, self.path)
+        self.entries.update(entries)
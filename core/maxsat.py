@@ -0,0 +1,172 @@
+"""
+In-process MaxSAT solving of WeightedClauseArena formulas: pysat's RC2 and a linear SAT-UNSAT search.
+"""
+
+import time
+import threading
+from collections import namedtuple
+
+from pysat.card import ITotalizer
+from pysat.examples.rc2 import RC2, RC2Stratified
+from pysat.solvers import Solver
+
+from core.sat import solve_assuming, supports_interrupt
+
+# Algorithms of the MaxSAT runners: core-guided RC2, linear search from the upper bound
+ALGORITHMS = ("rc2", "lsu")
+
+MaxSATResult = namedtuple("MaxSATResult", ["status", "model", "cost", "proven", "seconds", "bounds"])
+MaxSATResult.__doc__ = """
+Outcome of a time-limited MaxSAT solve.
+
+Attributes:
+    status (str): 'sat' (a model was found), 'unsat' (the hard clauses are unsatisfiable) or 'timeout'.
+    model (list of int or None): The best pysat model found.
+    cost (int or None): Weight of the soft clauses falsified by the model.
+    proven (bool): Whether the cost is proven optimal (or the hard clauses unsatisfiable).
+    seconds (float): Time spent solving.
+    bounds (list of tuple): (seconds, bound) each time a bound improved: lower bounds for RC2,
+        upper bounds (costs of the models found) for the linear search.
+"""
+
+
+class _BoundLog:
+    """RC2 mixin reporting the lower bound (cost of the cores found so far) after every core."""
+
+    def process_core(self):
+        super().process_core()
+        self.on_bound(self.cost)
+
+
+class _RC2(_BoundLog, RC2):
+    pass
+
+
+class _RC2Stratified(_BoundLog, RC2Stratified):
+    pass
+
+
+def _check_interrupt(solver_name, timeout):
+    if timeout is not None and not supports_interrupt(solver_name):
+        raise ValueError(f"The {solver_name} solver cannot be interrupted, a time limit needs another solver.")
+
+
+def solve_rc2(wcnf, solver_name="glucose3", stratified=False, exhaust=False, minz=False, adapt=False, timeout=None, log=print):
+    """
+    Solve a formula with pysat's core-guided RC2, without writing it to a file.
+
+    Args:
+        wcnf (WeightedClauseArena): The formula.
+        solver_name (str): SAT oracle (see core.sat.solver_names), it must support interruption if timeout is given.
+        stratified (bool): Stratify the soft clauses by weight (RC2Stratified).
+        exhaust (bool): Core exhaustion.
+        minz (bool): Core minimization.
+        adapt (bool): Detect and adapt intrinsic AtMost1 constraints.
+        timeout (float or None): Time limit in seconds (None: no limit).
+        log (function): Progress messages.
+
+    Returns:
+        MaxSATResult: The optimal model, or the status and the lower bounds reached at the deadline.
+    """
+    _check_interrupt(solver_name, timeout)
+    rc2_class = _RC2Stratified if stratified else _RC2
+    bounds = []
+    start = time.time()
+
+    def on_bound(cost):
+        bounds.append((time.time() - start, cost))
+        log(f"lower bound {cost} after {bounds[-1][0]:.3f}s")
+
+    with rc2_class(wcnf.to_pysat(), solver=solver_name, adapt=adapt, exhaust=exhaust, minz=minz) as rc2:
+        rc2.on_bound = on_bound
+        if timeout is None:
+            model = rc2.compute()
+        else:
+            timer = threading.Timer(timeout, rc2.interrupt)
+            timer.start()
+            try:
+                model = rc2.compute(expect_interrupt=True)
+            finally:
+                timer.cancel()
+        seconds = time.time() - start
+
+        if model is not None:
+            return MaxSATResult('sat', model, rc2.cost, True, seconds, bounds)
+        if getattr(rc2, "interrupted", False):
+            return MaxSATResult('timeout', None, None, False, seconds, bounds)
+        return MaxSATResult('unsat', None, None, True, seconds, bounds)
+
+
+def solve_lsu(wcnf, solver_name="glucose3", timeout=None, log=print):
+    """
+    Solve a formula with unit soft weights by linear SAT-UNSAT search, without writing it to a file.
+
+    Each soft clause gets a literal that is true when it is falsified (its negation for a unit
+    clause, a relaxation variable otherwise). After every model of cost c, a totalizer over these
+    literals is tightened to 'at most c - 1' in the same solver session, until it is refuted.
+    The best model so far is kept at the deadline.
+
+    Args:
+        wcnf (WeightedClauseArena): The formula, all soft weights must be 1.
+        solver_name (str): pysat solver (see core.sat.solver_names), it must support interruption if timeout is given.
+        timeout (float or None): Time limit in seconds (None: no limit).
+        log (function): Progress messages.
+
+    Returns:
+        MaxSATResult: The best model found, its cost and the upper bounds.
+
+    Raises:
+        ValueError: If a soft clause has a weight other than 1.
+    """
+    _check_interrupt(solver_name, timeout)
+    if (wcnf.wght != 1).any():
+        raise ValueError("The linear search needs unit soft weights.")
+
+    bounds = []
+    start = time.time()
+
+    def remaining():
+        return None if timeout is None else max(0.0, timeout - (time.time() - start))
+
+    with Solver(name=solver_name) as solver:
+        wcnf.hard.add_to_solver(solver)
+
+        # Literals true when a soft clause is falsified
+        top_id = wcnf.nv
+        violated = []
+        for clause in wcnf.soft.iter_clauses():
+            if len(clause) == 1:
+                violated.append(-clause[0])
+            else:
+                top_id += 1
+                solver.add_clause(clause + [top_id])
+                violated.append(top_id)
+
+        status, _ = solve_assuming(solver, [], remaining())
+        if status != 'sat':
+            return MaxSATResult(status, None, None, status == 'unsat', time.time() - start, bounds)
+
+        model = solver.get_model()
+        values = set(model)
+        cost = sum(1 for lit in violated if lit in values)
+        bounds.append((time.time() - start, cost))
+        log(f"upper bound {cost} after {bounds[-1][0]:.3f}s")
+
+        # rhs[k] is true when more than k soft clauses are falsified
+        counter = ITotalizer(lits=violated, ubound=cost, top_id=top_id)
+        solver.append_formula(counter.cnf.clauses)
+
+        proven = True
+        while cost > 0:
+            solver.add_clause([-counter.rhs[cost - 1]])
+            status, _ = solve_assuming(solver, [], remaining())
+            if status != 'sat':
+                proven = status == 'unsat'
+                break
+            model = solver.get_model()
+            values = set(model)
+            cost = sum(1 for lit in violated if lit in values)
+            bounds.append((time.time() - start, cost))
+            log(f"upper bound {cost} after {bounds[-1][0]:.3f}s")
+
+    return MaxSATResult('sat', model, cost, proven, time.time() - start, bounds)
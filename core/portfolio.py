@@ -0,0 +1,95 @@
+"""
+Race several solving configurations of one instance on separate cores.
+"""
+
+import time
+import traceback
+import multiprocessing
+from multiprocessing.connection import wait
+from collections import namedtuple
+
+RaceResult = namedtuple("RaceResult", ["winner", "outcome", "seconds", "finished"])
+RaceResult.__doc__ = """
+Outcome of a portfolio race.
+
+Attributes:
+    winner (str or None): Name of the first entrant whose outcome was accepted, None if none was.
+    outcome: Outcome of the winner (None without winner).
+    seconds (float): Wall-clock time until the winner answered (or until the race ended).
+    finished (dict): Name -> outcome (or error traceback) of every entrant that finished.
+"""
+
+
+def _run_entrant(task, args, conn):
+    """Run task(*args) in a child process and send ('ok', outcome) or ('error', traceback) back."""
+    try:
+        message = ("ok", task(*args))
+    except Exception:
+        message = ("error", traceback.format_exc())
+    conn.send(message)
+    conn.close()
+
+
+def race(entrants, accept, timeout=None, log=print, grace=0):
+    """
+    Launch every entrant in its own process and keep the first accepted outcome.
+
+    The other entrants are terminated as soon as an outcome is accepted, when all of them
+    have finished, or at the deadline (plus the grace period). Entrants run in regular (non-daemon) processes, so
+    they can use process pools themselves.
+
+    Args:
+        entrants (dict): Name -> (task, args), task(*args) returning a picklable outcome.
+        accept (function): accept(name, outcome) -> bool, whether an outcome ends the race
+            (e.g. a verified solution).
+        timeout (float or None): Deadline of the race in seconds (None: no limit).
+        log (function): Progress messages.
+        grace (float): Seconds after the deadline during which the outcomes are still collected,
+            for entrants that stop by themselves at the deadline with their best answer.
+
+    Returns:
+        RaceResult: The winner, its outcome, the elapsed time and the finished entrants.
+    """
+    context = multiprocessing.get_context()
+    running = {}
+    start = time.time()
+    try:
+        for name, (task, args) in entrants.items():
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_run_entrant, args=(task, args, sender), name=name)
+            process.start()
+            sender.close()
+            running[receiver] = (name, process)
+
+        finished = {}
+        while running:
+            remaining = None if timeout is None else timeout + grace - (time.time() - start)
+            if remaining is not None and remaining <= 0:
+                log(f"Deadline reached, stopping {len(running)} entrants.")
+                break
+            for receiver in wait(list(running), remaining):
+                name, process = running.pop(receiver)
+                try:
+                    kind, outcome = receiver.recv()
+                except EOFError:
+                    kind, outcome = "error", f"Process exited with code {process.exitcode}."
+                receiver.close()
+                process.join()
+                finished[name] = outcome
+                if kind == "error":
+                    log(f"{name} failed:\n{outcome}")
+                elif accept(name, outcome):
+                    seconds = time.time() - start
+                    log(f"{name} won after {seconds:.2f}s.")
+                    return RaceResult(name, outcome, seconds, finished)
+                else:
+                    log(f"{name} finished without an accepted answer.")
+        return RaceResult(None, None, time.time() - start, finished)
+    finally:
+        # Losers are stopped and reaped before returning
+        for receiver, (_, process) in running.items():
+            if process.is_alive():
+                process.terminate()
+        for receiver, (_, process) in running.items():
+            process.join()
+            receiver.close()
@@ -0,0 +1,319 @@
+"""
+Preprocessing of SD/LW instances before encoding: forced variables, removable columns and the mapping that lifts solutions back.
+"""
+
+import os
+import sys
+import csv
+import json
+import argparse
+from collections import namedtuple
+
+import numpy as np
+
+from core.gf2 import GF2Matrix
+from core.linalg import rank
+from core.instance import Instance, read_text_instance, write_text_instance
+from core.batch import expand_inputs
+
+# Version of the mapping files written next to the reduced instances
+MAPPING_VERSION = 1
+
+Reduction = namedtuple("Reduction", ["instance", "variables", "ones", "infeasible", "solution", "stats"])
+Reduction.__doc__ = """
+Outcome of the preprocessing of an instance.
+
+Attributes:
+    instance (Instance or None): The reduced instance, None when the preprocessing settled it.
+    variables (np.ndarray): 0-based index in the original instance of each variable of the reduced one.
+    ones (np.ndarray): 0-based indices of the removed variables that are 1 in the lifted solutions.
+    infeasible (bool): Whether the instance has no solution (SD: the forced variables exceed w).
+    solution (str or None): A solution of the original instance found by the preprocessing
+        (SD: solved without search, LW: a codeword of weight 1 or 2, which is optimal).
+    stats (dict): Sizes, ranks and kernel dimensions before and after, and what was removed.
+"""
+
+
+def _parity_check(P):
+    """H = [I | P] of a matrix P (GF2Matrix)."""
+    return GF2Matrix.identity(P.nrows).hstack(P)
+
+
+def _first_columns(bits):
+    """Indices of the first occurrence of each distinct column of a 0/1 array, in increasing order."""
+    if bits.shape[1] == 0:
+        return np.zeros(0, dtype=np.int64)
+    packed = GF2Matrix.from_bits(bits.T).words
+    _, first = np.unique(packed, axis=0, return_index=True)
+    return np.sort(first)
+
+
+def _lift_bits(bits, n, variables, ones):
+    full = np.zeros(n, dtype=np.uint8)
+    full[ones] = 1
+    full[variables] = bits
+    return "".join(map(str, full.tolist()))
+
+
+def lift(solution, n, variables, ones):
+    """
+    Lift a solution of a reduced instance to the original instance.
+
+    Args:
+        solution (str): Binary string of the reduced variables.
+        n (int): Number of variables of the original instance.
+        variables (array-like): Original index of each reduced variable (Reduction.variables).
+        ones (array-like): Original indices of the removed variables set to 1 (Reduction.ones).
+
+    Returns:
+        str: Binary string of the original variables.
+    """
+    if len(solution) != len(variables):
+        raise ValueError(f"Expected a solution of {len(variables)} bits, found {len(solution)}.")
+    bits = np.frombuffer(solution.encode("ascii"), dtype=np.uint8) - np.uint8(ord("0"))
+    return _lift_bits(bits, n, np.asarray(variables, dtype=np.int64), np.asarray(ones, dtype=np.int64))
+
+
+def _reduce_SD(P, s, w):
+    """
+    Remove the equations and columns of an SD instance that the weight bound does not need.
+
+    Repeated until nothing changes:
+    - an equation whose row of P is zero forces its identity variable to s_i, the equation
+      and the variable are removed and w decreases when s_i = 1;
+    - a column of P of weight 0, of weight 1 (a copy of an identity column) or equal to an
+      earlier column can be set to 0 in a solution of weight <= w (moving its 1 to the copy,
+      or clearing both copies, keeps the syndrome and does not increase the weight).
+
+    Returns:
+        rows (np.ndarray): Kept equations.
+        cols (np.ndarray): Kept columns of P.
+        ones (list of int): Equations whose identity variable is forced to 1.
+        w (int): Remaining weight bound.
+    """
+    rows = np.arange(P.shape[0])
+    cols = np.arange(P.shape[1])
+    ones = []
+    while True:
+        sub = P[np.ix_(rows, cols)]
+        zero_rows = ~sub.any(axis=1)
+        if zero_rows.any():
+            forced = rows[zero_rows & (s[rows] == 1)]
+            ones.extend(forced.tolist())
+            w -= len(forced)
+            rows = rows[~zero_rows]
+            continue
+
+        heavy = np.flatnonzero(sub.sum(axis=0) >= 2)
+        kept = heavy[_first_columns(sub[:, heavy])]
+        if len(kept) == len(cols):
+            return rows, cols, ones, w
+        cols = cols[kept]
+
+
+def reduce_instance(instance):
+    """
+    Shrink an instance before encoding it.
+
+    SD: see _reduce_SD. The instance is settled without search when the bound becomes negative
+    (infeasible) or when the remaining syndrome has weight <= w (e = s on the identity part).
+    LW: a zero row of P forces its identity variable to 0 and is removed. A zero column of P is
+    a codeword of weight 1, a column of weight 1 or two equal columns a codeword of weight 2,
+    they are returned as the (optimal) solution.
+
+    The reduced instance keeps the systematic form [I | P'] (its equations are independent),
+    with the kept equations first and the kept columns of P after them.
+
+    Args:
+        instance (Instance): The instance.
+
+    Returns:
+        Reduction: The reduced instance and the mapping to lift its solutions.
+    """
+    P = instance.H_transpose.to_bits().astype(bool)
+    m, k = P.shape
+    n = instance.n
+
+    solution = None
+    infeasible = False
+    if instance.kind == "SD":
+        s = np.frombuffer(instance.s_transpose.encode("ascii"), dtype=np.uint8) - np.uint8(ord("0"))
+        rows, cols, ones, w = _reduce_SD(P, s, instance.w)
+        ones = np.array(ones, dtype=np.int64)
+        variables = np.concatenate((rows, cols + m))
+        if w < 0:
+            infeasible = True
+        elif s[rows].sum() <= w:
+            solution = _lift_bits(np.concatenate((s[rows], np.zeros(len(cols), dtype=np.uint8))), n, variables, ones)
+        elif w == 0:
+            infeasible = True
+    else:
+        rows = np.flatnonzero(P.any(axis=1))
+        cols = np.arange(k)
+        ones = np.zeros(0, dtype=np.int64)
+        variables = np.concatenate((rows, cols + m))
+        w = None
+
+        weights = P.sum(axis=0)
+        first = _first_columns(P)
+        codeword = None
+        if (weights == 0).any():
+            codeword = [m + int(np.argmax(weights == 0))]
+        elif (weights == 1).any():
+            j = int(np.argmax(weights == 1))
+            codeword = [int(np.flatnonzero(P[:, j])[0]), m + j]
+        elif len(first) < k:
+            j = int(np.flatnonzero(np.isin(np.arange(k), first, invert=True))[0])
+            twin = int(np.flatnonzero((P == P[:, [j]]).all(axis=0))[0])
+            codeword = [m + twin, m + j]
+        if codeword is not None:
+            bits = np.zeros(n, dtype=np.uint8)
+            bits[codeword] = 1
+            solution = "".join(map(str, bits.tolist()))
+
+    reduced = None
+    if solution is None and not infeasible:
+        P_reduced = GF2Matrix.from_bits(P[np.ix_(rows, cols)].astype(np.uint8)) if len(rows) else GF2Matrix.zeros(0, len(cols))
+        s_reduced = None if instance.kind == "LW" else "".join(map(str, s[rows].tolist()))
+        reduced = Instance(instance.kind, len(variables), instance.seed, w, P_reduced, s_reduced)
+
+    stats = {"n": n, "m": m, "rank": rank(_parity_check(instance.H_transpose))}
+    stats["kernel dimension"] = n - stats["rank"]
+    stats.update({"equations removed": m - len(rows), "columns removed": k - len(cols), "forced ones": len(ones)})
+    if reduced is not None:
+        stats["reduced n"] = reduced.n
+        stats["reduced rank"] = rank(_parity_check(reduced.H_transpose))
+        stats["reduced kernel dimension"] = reduced.n - stats["reduced rank"]
+    return Reduction(reduced, variables, ones, infeasible, solution, stats)
+
+
+def write_mapping(reduction, n, file_name):
+    """
+    Write the mapping of a reduction as JSON.
+
+    Args:
+        reduction (Reduction): The reduction.
+        n (int): Number of variables of the original instance.
+        file_name (str): Path to the mapping file.
+    """
+    mapping = {
+        "version": MAPPING_VERSION,
+        "n": n,
+        "variables": reduction.variables.tolist(),
+        "ones": reduction.ones.tolist(),
+    }
+    with open(file_name, "w") as f:
+        json.dump(mapping, f)
+
+
+def read_mapping(file_name):
+    """
+    Read a mapping written by write_mapping.
+
+    Returns:
+        n (int): Number of variables of the original instance.
+        variables (list of int): Original index of each reduced variable.
+        ones (list of int): Original indices of the removed variables set to 1.
+    """
+    with open(file_name) as f:
+        mapping = json.load(f)
+    if mapping.get("version") != MAPPING_VERSION:
+        raise ValueError(f"{file_name}: unsupported mapping version {mapping.get('version')}.")
+    return mapping["n"], mapping["variables"], mapping["ones"]
+
+
+def mapping_path(instance_path):
+    """Path of the mapping file of a reduced instance file."""
+    return instance_path + ".map.json"
+
+
+def reduce_files(input_files, output_dir):
+    """
+    Reduce instance files and write the reduced instances and their mappings to a directory.
+
+    The instances settled by the preprocessing are reported and not written.
+
+    Args:
+        input_files (list of str): Instance files.
+        output_dir (str): Directory receiving '<name>' and '<name>.map.json'.
+
+    Returns:
+        int: Number of reduced instances written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    count = 0
+    for file_name in input_files:
+        instance = read_text_instance(file_name)
+        reduction = reduce_instance(instance)
+        name = os.path.basename(file_name)
+        stats = ", ".join(f"{key}={value}" for key, value in reduction.stats.items())
+        if reduction.infeasible:
+            print(f"{name}: infeasible ({stats})")
+        elif reduction.solution is not None:
+            print(f"{name}: solved by the preprocessing ({stats})\n{reduction.solution}")
+        else:
+            path = os.path.join(output_dir, name)
+            write_text_instance(reduction.instance, path)
+            write_mapping(reduction, instance.n, mapping_path(path))
+            print(f"{name}: {stats}")
+            count += 1
+    return count
+
+
+def lift_results(reduced_dir, results_csv, output_csv):
+    """
+    Rewrite the Solution column of a result CSV of reduced instances with the lifted solutions.
+
+    Args:
+        reduced_dir (str): Directory of the reduced instances and their mappings.
+        results_csv (str): Result CSV of a runner (File and Solution columns).
+        output_csv (str): Path to the lifted CSV, to check against the original instances.
+
+    Returns:
+        int: Number of solutions lifted.
+    """
+    with open(results_csv, newline="") as f:
+        rows = list(csv.reader(f))
+    header = rows[0]
+    file_col, sol_col = header.index("File"), header.index("Solution")
+
+    count = 0
+    for row in rows[1:]:
+        solution = row[sol_col]
+        if not solution or set(solution) - {"0", "1"}:
+            continue
+        n, variables, ones = read_mapping(mapping_path(os.path.join(reduced_dir, row[file_col])))
+        row[sol_col] = lift(solution, n, variables, ones)
+        count += 1
+
+    with open(output_csv, "w", newline="") as f:
+        csv.writer(f).writerows(rows)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m core.reduce", description="Preprocessing of SD/LW instances before encoding.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    reduce = subparsers.add_parser("reduce", help="Write reduced instances and their mappings")
+    reduce.add_argument("inputs", nargs="+", help="Instance files, directories or glob patterns")
+    reduce.add_argument("-o", "--output_dir", required=True, help="Directory receiving the reduced instances")
+
+    lifting = subparsers.add_parser("lift", help="Lift the solutions of a result CSV to the original instances")
+    lifting.add_argument("reduced_dir", help="Directory of the reduced instances and their mappings")
+    lifting.add_argument("results", help="Result CSV of a runner on the reduced instances")
+    lifting.add_argument("-o", "--output", help="Lifted CSV. Default: <results>_lifted.csv")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "reduce":
+        count = reduce_files(expand_inputs(args.inputs), args.output_dir)
+        print(f"{count} reduced instances written to {args.output_dir}")
+    else:
+        output = args.output or f"{os.path.splitext(args.results)[0]}_lifted.csv"
+        count = lift_results(args.reduced_dir, args.results, output)
+        print(f"{count} solutions lifted to {output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+import os
+import re
+import sys
+import csv
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.checker import check_candidates
+from core.compress import open_text, strip_compression
+
+csv.field_size_limit(sys.maxsize)
+
+# Columns written by the solver runners (see SD_CPSAT.main)
+RESULT_FIELDS = ["File", "Result", "Time (s)", "Solution"]
+
+# Columns of the per-row report written by bulk_verify
+REPORT_FIELDS = ["CSV", "File", "Status", "Weight", "Reason"]
+
+_INTEGER = re.compile(r"-?\d+")
+
+
+def find_result_csvs(path):
+    """
+    List the results CSV files designated by a path.
+
+    Args:
+        path (str): A CSV file, or a directory searched recursively for *.csv files
+            (possibly compressed, e.g. *.csv.gz).
+
+    Returns:
+        list of str: Sorted CSV paths.
+    """
+    if os.path.isfile(path):
+        return [path]
+    csv_paths = []
+    for root, _, files in os.walk(path):
+        csv_paths.extend(os.path.join(root, f) for f in files if strip_compression(f).endswith(".csv"))
+    return sorted(csv_paths)
+
+
+def find_instances(instance_dir):
+    """
+    Map instance file names to their path, using the same filter as the CP-SAT runners
+    (regular files without an extension). Compressed instances are named without their
+    compression extension.
+
+    Args:
+        instance_dir (str): Directory containing the instance files.
+
+    Returns:
+        dict: File name -> path.
+    """
+    return {
+        strip_compression(entry): os.path.join(instance_dir, entry)
+        for entry in os.listdir(instance_dir)
+        if os.path.isfile(os.path.join(instance_dir, entry)) and '.' not in strip_compression(entry)
+    }
+
+
+def load_results(csv_paths):
+    """
+    Read every results CSV once and index its rows by the 'File' column.
+
+    Args:
+        csv_paths (list of str): Results CSV files.
+
+    Returns:
+        dict: File name -> list of (csv_path, solution_str), in file order.
+    """
+    index = {}
+    for csv_path in csv_paths:
+        with open_text(csv_path, encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f, delimiter=',')
+            if reader.fieldnames is None or 'File' not in reader.fieldnames or 'Solution' not in reader.fieldnames:
+                continue
+            for row in reader:
+                index.setdefault(row['File'], []).append((csv_path, row['Solution'] or ""))
+    return index
+
+
+def parse_solution(solution_str, n):
+    """
+    Convert the 'Solution' field of a results CSV into a 0/1 vector.
+
+    Supports the two formats of the checkers: a raw binary string (trailing padding is
+    truncated to n bits) and SAT literals ("-1 2 -3 4 0"), where the sign of the first n
+    literals before the terminating 0 gives the bits.
+
+    Args:
+        solution_str (str): Content of the 'Solution' column.
+        n (int): Length of the solution vector.
+
+    Returns:
+        np.ndarray or None: uint8 array of 0/1 values (possibly of the wrong length),
+            None if the field holds no solution at all.
+    """
+    solution_str = solution_str.strip()
+    compact = solution_str.replace(" ", "")
+
+    # Case 1: The solution is already a binary string
+    if compact and not set(compact) - {"0", "1"} and (len(compact) >= n or " " not in solution_str):
+        return np.frombuffer(compact[:n].encode("ascii"), dtype=np.uint8) - ord("0")
+
+    # Case 2: The solution is in SAT literal format (-1 2 -3...)
+    tokens = _INTEGER.findall(solution_str)
+    if not tokens:
+        return None
+    lits = np.array(tokens, dtype=np.int64)
+    zeros = np.flatnonzero(lits == 0)
+    if zeros.size:
+        lits = lits[:zeros[0]]
+    return (lits[:n] > 0).astype(np.uint8)
+
+
+def verify_instance(job):
+    """
+    Verify every result row of one instance in a single batched pass.
+
+    Args:
+        job (tuple): (loader, instance_path, entries) where loader(instance_path) returns
+            (n, H, s, w) and entries is a list of (csv_path, solution_str).
+
+    Returns:
+        list of dict: One report row per entry (see REPORT_FIELDS).
+    """
+    loader, instance_path, entries = job
+    file = os.path.basename(instance_path)
+    n, H, s, w = loader(instance_path)
+
+    report = []
+    batch = []  # (report index, bits) of the rows holding a candidate of length n
+    for csv_path, solution_str in entries:
+        bits = parse_solution(solution_str, n)
+        row = {"CSV": csv_path, "File": file, "Status": "missing", "Weight": "", "Reason": "no solution"}
+        if bits is not None:
+            if bits.size == n:
+                batch.append((len(report), bits))
+            else:
+                row.update(Status="invalid", Reason="length")
+        report.append(row)
+
+    if batch:
+        result = check_candidates(H, np.vstack([bits for _, bits in batch]), s, w)
+        for (idx, _), valid, weight, syndrome in zip(batch, result.valid, result.weights, result.syndromes):
+            reason = ""
+            if not valid:
+                reason = "weight" if w is not None and weight > w else "syndrome"
+            report[idx].update(Status="valid" if valid else "invalid", Weight=int(weight), Reason=reason)
+
+    return report
+
+
+def bulk_verify(instance_dir, results_path, loader, workers=None):
+    """
+    Verify all the solutions of one or several results CSVs against the instances of a directory.
+
+    Each CSV is read once, rows are grouped by instance, and instances are verified in parallel
+    over a process pool. Instances of the directory without a row in a CSV, and rows whose
+    instance file does not exist, are reported as missing.
+
+    Args:
+        instance_dir (str): Directory containing the instance files.
+        results_path (str): A results CSV, or a directory of them.
+        loader (function): Picklable function mapping an instance path to (n, H, s, w),
+            with H = [I | P] as a GF2Matrix, s the syndrome (None for zero) and w the weight bound (or None).
+        workers (int or None): Number of worker processes (default: os.cpu_count()).
+
+    Returns:
+        list of dict: One report row per (CSV, instance) pair (see REPORT_FIELDS).
+    """
+    csv_paths = find_result_csvs(results_path)
+    instances = find_instances(instance_dir)
+    index = load_results(csv_paths)
+
+    jobs = [(loader, instances[file], entries) for file, entries in sorted(index.items()) if file in instances]
+
+    report = []
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for rows in executor.map(verify_instance, jobs):
+                report.extend(rows)
+
+    # Rows referring to an instance that is not in the directory
+    for file, entries in sorted(index.items()):
+        if file not in instances:
+            for csv_path, _ in entries:
+                report.append({"CSV": csv_path, "File": file, "Status": "missing", "Weight": "", "Reason": "no instance"})
+
+    # Instances of the directory without any row in a CSV
+    seen = {csv_path: set() for csv_path in csv_paths}
+    for file, entries in index.items():
+        for csv_path, _ in entries:
+            seen[csv_path].add(file)
+    for csv_path in csv_paths:
+        for file in sorted(set(instances) - seen[csv_path]):
+            report.append({"CSV": csv_path, "File": file, "Status": "missing", "Weight": "", "Reason": "no row"})
+
+    report.sort(key=lambda row: (row["CSV"], row["File"]))
+    return report
+
+
+def print_summary(report):
+    """
+    Print a table with the number of valid, invalid and missing rows of each CSV.
+
+    Args:
+        report (list of dict): Report rows returned by bulk_verify.
+    """
+    counts = {}
+    for row in report:
+        counts.setdefault(row["CSV"], Counter())[row["Status"]] += 1
+
+    width = max([len("CSV")] + [len(path) for path in counts])
+    print(f"{'CSV':<{width}}  {'valid':>7}  {'invalid':>7}  {'missing':>7}")
+    total = Counter()
+    for path, counter in sorted(counts.items()):
+        total.update(counter)
+        print(f"{path:<{width}}  {counter['valid']:>7}  {counter['invalid']:>7}  {counter['missing']:>7}")
+    print(f"{'Total':<{width}}  {total['valid']:>7}  {total['invalid']:>7}  {total['missing']:>7}")
+
+
+def write_report(report, output_file):
+    """
+    Write the per-row report of bulk_verify to a CSV file.
+
+    Args:
+        report (list of dict): Report rows returned by bulk_verify.
+        output_file (str): Path to the output CSV file.
+    """
+    with open(output_file, mode='w', newline='') as csvfile:
+        csv_writer = csv.DictWriter(csvfile, fieldnames=REPORT_FIELDS)
+        csv_writer.writeheader()
+        csv_writer.writerows(report)
@@ -0,0 +1,227 @@
+"""
+In-process SAT solving of ClauseArena formulas with pysat backends, under a time limit.
+"""
+
+import time
+import threading
+import multiprocessing
+from collections import namedtuple
+
+from pysat.card import ITotalizer
+from pysat.solvers import Solver, SolverNames
+
+# Solver statistics reported by pysat's accum_stats, in the order of the result CSV columns
+STAT_FIELDS = ["conflicts", "decisions", "propagations", "restarts"]
+
+SolveResult = namedtuple("SolveResult", ["status", "model", "seconds", "stats"])
+SolveResult.__doc__ = """
+Outcome of a time-limited solve.
+
+Attributes:
+    status (str): 'sat', 'unsat' or 'timeout'.
+    model (list of int or None): The pysat model (one literal per variable) if satisfiable.
+    seconds (float): Time spent in the solver.
+    stats (dict): Solver statistics (STAT_FIELDS), empty if the solver was killed.
+"""
+
+# Orders in which sweep_weight probes the weights
+SWEEPS = ("descending", "binary")
+
+SweepStep = namedtuple("SweepStep", ["w", "status", "seconds"])
+SweepStep.__doc__ = """
+One solver call of a weight sweep.
+
+Attributes:
+    w (int): Weight bound assumed.
+    status (str): 'sat', 'unsat' or 'timeout'.
+    seconds (float): Time spent in the solver.
+"""
+
+SweepResult = namedtuple("SweepResult", ["w", "model", "proven", "steps", "stats"])
+SweepResult.__doc__ = """
+Outcome of a weight sweep.
+
+Attributes:
+    w (int or None): Smallest weight bound found satisfiable (None if none was).
+    model (list of int or None): A pysat model within that bound.
+    proven (bool): Whether w is known to be the minimum (w - 1 was refuted, or w is 0), or
+        that no weight up to the largest bound is satisfiable when w is None.
+    steps (list of SweepStep): The solver calls, in order.
+    stats (dict): Solver statistics accumulated over the sweep (STAT_FIELDS).
+"""
+
+
+def solver_names():
+    """Names accepted by pysat's Solver (e.g. 'cadical153', 'glucose4', 'maplechrono')."""
+    return sorted(name for name in vars(SolverNames) if not name.startswith('_'))
+
+
+def supports_interrupt(solver_name):
+    """Whether the pysat solver can be interrupted (CaDiCaL and Lingeling cannot)."""
+    with Solver(name=solver_name) as probe:
+        try:
+            probe.interrupt()
+        except NotImplementedError:
+            return False
+    return True
+
+
+def _status(answer):
+    return 'sat' if answer else ('unsat' if answer is False else 'timeout')
+
+
+def _solve(cnf, solver_name, timeout=None):
+    """Solve in this process, a timer interrupts the solver at the deadline (if any)."""
+    with Solver(name=solver_name) as solver:
+        cnf.add_to_solver(solver)
+        start = time.time()
+        if timeout is None:
+            answer = solver.solve()
+        else:
+            timer = threading.Timer(timeout, solver.interrupt)
+            timer.start()
+            try:
+                answer = solver.solve_limited(expect_interrupt=True)
+            finally:
+                timer.cancel()
+        seconds = time.time() - start
+        return SolveResult(_status(answer), solver.get_model() if answer else None, seconds, solver.accum_stats())
+
+
+def _solve_child(cnf, solver_name, conn):
+    """Solve in a child process and send the outcome back (the parent kills it at the deadline)."""
+    conn.send(tuple(_solve(cnf, solver_name)))
+    conn.close()
+
+
+def _solve_killable(cnf, solver_name, timeout):
+    """Solve in a child process, terminated at the deadline."""
+    context = multiprocessing.get_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_solve_child, args=(cnf, solver_name, sender), daemon=True)
+    start = time.time()
+    process.start()
+    sender.close()
+    try:
+        if receiver.poll(timeout):
+            return SolveResult(*receiver.recv())
+        return SolveResult('timeout', None, time.time() - start, {})
+    except EOFError:
+        raise RuntimeError(f"The {solver_name} solver process exited with code {process.exitcode}.")
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        receiver.close()
+
+
+def solve_cnf(cnf, solver_name="cadical153", timeout=None):
+    """
+    Solve a formula with a pysat solver, without writing it to a file.
+
+    Solvers that support interruption run in this process. The others (CaDiCaL, Lingeling)
+    run in a child process when a time limit is given, so that they can be stopped.
+
+    Args:
+        cnf (ClauseArena): The formula.
+        solver_name (str): pysat solver name (see solver_names).
+        timeout (float or None): Time limit in seconds (None: no limit).
+
+    Returns:
+        SolveResult: Status, model, solving time and statistics.
+    """
+    if timeout is None or supports_interrupt(solver_name):
+        return _solve(cnf, solver_name, timeout)
+    return _solve_killable(cnf, solver_name, timeout)
+
+
+def model_to_bits(model, n):
+    """Binary string of the values of variables 1..n in a pysat model."""
+    return ''.join('1' if lit > 0 else '0' for lit in model[:n])
+
+
+def solve_assuming(solver, assumptions, timeout=None):
+    """
+    Solve under assumptions, a timer interrupts the solver at the deadline (if any).
+
+    Args:
+        solver (pysat.solvers.Solver): The solver, it must support interruption if timeout is given.
+        assumptions (list of int): Literals assumed true.
+        timeout (float or None): Time limit in seconds (None: no limit).
+
+    Returns:
+        status (str): 'sat', 'unsat' or 'timeout'.
+        seconds (float): Time spent in the solver.
+    """
+    start = time.time()
+    if timeout is None:
+        answer = solver.solve(assumptions=assumptions)
+    else:
+        timer = threading.Timer(timeout, solver.interrupt)
+        timer.start()
+        try:
+            answer = solver.solve_limited(assumptions=assumptions, expect_interrupt=True)
+        finally:
+            timer.cancel()
+        solver.clear_interrupt()
+    return _status(answer), time.time() - start
+
+
+def sweep_weight(cnf, n, w_max, solver_name="cadical153", strategy="descending", timeout=None, log=print):
+    """
+    Find the smallest w <= w_max such that the formula has a model with at most w of e_1..e_n true,
+    in one solver session.
+
+    The formula is loaded once, together with a totalizer counting e_1..e_n up to w_max. Each
+    step assumes that the counter output 'more than w' is false, so the learnt clauses are kept
+    from one bound to the next. 'descending' restarts below the weight of every model found until
+    a bound is refuted, 'binary' bisects between the refuted bounds and the lightest model.
+
+    Args:
+        cnf (ClauseArena): The formula, without bound on the weight (variables e_j numbered 1..n).
+        n (int): Number of variables e_j.
+        w_max (int): Largest weight bound.
+        solver_name (str): pysat solver name, it must support interruption if timeout is given.
+        strategy (str): One of SWEEPS.
+        timeout (float or None): Time limit of each step in seconds (None: no limit).
+        log (function): Progress messages.
+
+    Returns:
+        SweepResult: The smallest satisfiable bound found, a model, and the steps.
+    """
+    if strategy not in SWEEPS:
+        raise ValueError(f"Unknown sweep '{strategy}', expected one of {', '.join(SWEEPS)}.")
+    if timeout is not None and not supports_interrupt(solver_name):
+        raise ValueError(f"The {solver_name} solver cannot be interrupted, a time limit per step needs another solver.")
+
+    # rhs[k] is true when more than k of e_1..e_n are true
+    counter = ITotalizer(lits=list(range(1, n + 1)), ubound=min(w_max, n - 1), top_id=max(cnf.nv, n))
+    with Solver(name=solver_name) as solver:
+        cnf.add_to_solver(solver)
+        solver.append_formula(counter.cnf.clauses)
+
+        steps = []
+        best, model = None, None
+
+        # Bounds below low are refuted, a model of weight high + 1 is known once best is set
+        low, high = 0, w_max
+        proven = True
+        while low <= high:
+            w = high if strategy == "descending" or best is None else (low + high) // 2
+            assumptions = [-counter.rhs[w]] if w < len(counter.rhs) else []
+            status, seconds = solve_assuming(solver, assumptions, timeout)
+            steps.append(SweepStep(w, status, seconds))
+            log(f"w={w}: {status} in {seconds:.3f}s")
+            if status == 'timeout':
+                proven = False
+                break
+            if status == 'sat':
+                # The next bounds start below the weight of the model found
+                model = solver.get_model()
+                best = sum(1 for lit in model[:n] if lit > 0)
+                high = best - 1
+            else:
+                low = w + 1
+
+        stats = solver.accum_stats()
+    return SweepResult(best, model, proven, steps, stats)
@@ -0,0 +1,139 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pysat.pb import PBEnc
+
+from core.arena import ClauseArena, add_clauses, relabel
+
+
+class PBTemplates:
+    """
+    Memoized PBEnc.equals for constraints whose variables are given in increasing order.
+
+    The encoding of sum(weights[k] * lits[k]) == bound only depends on the weights, the
+    signs of the literals, the bound and the encoding, as long as the relative order of
+    the variables is kept. Each distinct shape is encoded once with the variables 1..L and
+    auxiliary variables from L + 1 (the template), other constraints of the same shape get
+    the template with its variables renamed in one vectorized pass.
+
+    Attributes:
+        encoding (int): Pseudo-Boolean constraint encoding to use.
+        hits (int): Number of constraints served from a template.
+        misses (int): Number of calls to PBEnc.equals.
+    """
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self._templates = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._templates)
+
+    def equals(self, lits, weights, bound, top_id):
+        """
+        Same clauses and nv as PBEnc.equals(lits=lits, weights=weights, bound=bound, top_id=top_id, encoding=self.encoding).
+
+        Args:
+            lits (list of int): Literals of the constraint.
+            weights (list of int): Their weights.
+            bound (int): Right-hand side of the equality.
+            top_id (int): Highest variable index already used.
+
+        Returns:
+            arena (ClauseArena): The clauses of the encoding.
+            nv (int): The nv of the pysat encoding.
+        """
+        lits = np.asarray(lits, dtype=np.int32)
+        variables = np.abs(lits)
+        if len(lits) and (np.any(np.diff(variables) <= 0) or variables[-1] > top_id):
+            # Not a monotone renaming of 1..L, encode directly
+            self.misses += 1
+            res = PBEnc.equals(lits=lits.tolist(), weights=list(weights), bound=bound, top_id=top_id, encoding=self.encoding)
+            arena = ClauseArena(capacity=max(1, len(res.clauses)))
+            arena.extend(res.clauses)
+            return arena, res.nv
+
+        size = len(lits)
+        signs = lits < 0
+        key = (size, signs.tobytes(), tuple(weights), bound)
+        entry = self._templates.get(key)
+        if entry is None:
+            self.misses += 1
+            canonical = np.arange(1, size + 1, dtype=np.int32)
+            canonical[signs] *= -1
+            res = PBEnc.equals(lits=canonical.tolist(), weights=list(weights), bound=bound, top_id=size, encoding=self.encoding)
+            template = ClauseArena(capacity=max(1, len(res.clauses)))
+            template.extend(res.clauses)
+            entry = self._templates[key] = template, res.nv
+        else:
+            self.hits += 1
+        template, nv = entry
+
+        # Variable k of the template is the k-th variable of the constraint, auxiliaries are shifted after top_id
+        mapping = np.concatenate(([0], variables)).astype(np.int32)
+        t = template.lits
+        t_vars = np.abs(t)
+        renamed = np.where(t_vars <= size, mapping[np.minimum(t_vars, size)], t_vars + np.int32(top_id - size))
+        arena = ClauseArena(capacity=max(1, len(template)))
+        arena.append_arrays(np.where(t < 0, -renamed, renamed), np.diff(template.offsets))
+        return arena, nv + top_id - size
+
+
+def _encode_block(job):
+    """Encode a block of rows in order with auxiliaries from top_id + 1 (run in a worker process)."""
+    rows, top_id, encoding = job
+    templates = PBTemplates(encoding)
+    arena = ClauseArena()
+    block_top = top_id
+    for lits, weights, bound in rows:
+        encoded, block_top = templates.equals(lits, weights, bound, block_top)
+        arena.append_arena(encoded)
+    return arena.lits.copy(), np.diff(arena.offsets), block_top - top_id
+
+
+def encode_pb_rows(dest, rows, top_id, encoding, workers=1, block_rows=None):
+    """
+    Encode PBEnc.equals constraints row after row, optionally over a process pool.
+
+    Sequentially, each row is added to dest as soon as it is encoded (so a streaming
+    writer only holds one row). With several workers, blocks of consecutive rows are encoded
+    in parallel, each with auxiliary variables starting at top_id + 1, and the auxiliaries of
+    a block are then shifted by the number used by the blocks before it. This is the
+    numbering of the sequential build, so the formula does not depend on the number of
+    workers or on the block size.
+
+    Args:
+        dest (ClauseArena, WeightedClauseArena, CNF, DimacsWriter...): Destination of the clauses.
+        rows (list of tuple): (lits, weights, bound) of every row, in order.
+        top_id (int): Highest variable index already used, every variable of rows is at most top_id.
+        encoding (int): Pseudo-Boolean constraint encoding to use.
+        workers (int or None): Number of worker processes (1: in-process, None: os.cpu_count()).
+        block_rows (int or None): Rows per block (default: about 4 blocks per worker).
+
+    Returns:
+        top_id (int): Highest variable index used after the last row.
+    """
+    if workers == 1 or len(rows) <= 1:
+        templates = PBTemplates(encoding)
+        for lits, weights, bound in rows:
+            encoded, top_id = templates.equals(lits, weights, bound, top_id)
+            add_clauses(dest, encoded)
+        return top_id
+
+    workers = workers or os.cpu_count()
+    if block_rows is None:
+        block_rows = max(1, -(-len(rows) // (4 * workers)))
+    jobs = [(rows[start:start + block_rows], top_id, encoding) for start in range(0, len(rows), block_rows)]
+
+    shift = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Blocks come back in row order, each is relabeled after the auxiliaries of the previous ones
+        for lits, lengths, used in executor.map(_encode_block, jobs):
+            block = ClauseArena(capacity=max(1, len(lengths)))
+            block.append_arrays(relabel(lits, top_id, shift), lengths)
+            add_clauses(dest, block)
+            shift += used
+    return top_id + shift
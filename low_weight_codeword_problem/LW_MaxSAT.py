@@ -0,0 +1,140 @@
+import argparse
+import csv
+import time
+from LW_WCNF import build_WCNF1, build_WCNF2
+from utils import *
+from core.maxsat import ALGORITHMS, solve_rc2, solve_lsu
+from core.sat import solver_names, supports_interrupt, model_to_bits
+from core.results import RESULT_FIELDS
+
+# Columns of the result CSV: the ones checked by check_LWCP_solution.py, then the cost and its bounds
+MAXSAT_FIELDS = RESULT_FIELDS + ["Cost", "Optimal", "Encoding time (s)", "Bounds"]
+
+def format_bounds(bounds):
+    """Bounds of a MaxSAT solve as 'seconds:bound' separated by spaces."""
+    return " ".join(f"{seconds:.5f}:{bound}" for seconds, bound in bounds)
+
+def build_and_solve_MaxSAT(n, H_transpose, method, cc, pb, algorithm, solver_name, timeout=None, workers=1, **options):
+    """
+    Build a WCNF model of the low-weight codeword problem and solve it in process (no .wcnf file).
+
+    Args:
+        n (int): Total number of variables.
+        H_transpose (GF2Matrix): The transposed parity-check matrix.
+        method (str): 'CNF1' or 'CNF2' (WCNF1 or WCNF2 model).
+        cc (int): Cardinality encoding (WCNF1 only).
+        pb (int): Pseudo-Boolean encoding.
+        algorithm (str): 'rc2' (core-guided) or 'lsu' (linear SAT-UNSAT search).
+        solver_name (str): pysat SAT oracle.
+        timeout (float or None): Time limit in seconds.
+        workers (int or None): Processes encoding the rows.
+        **options: RC2 options (stratified, exhaust, minz, adapt).
+
+    Returns:
+        result (MaxSATResult): Status, best model, cost and bounds.
+        encode_time (str): Time spent building the formula, in seconds.
+    """
+    start = time.time()
+    if method == 'CNF1':
+        wcnf = build_WCNF1(n, H_transpose, cc, pb, workers=workers)
+    else:
+        wcnf = build_WCNF2(n, H_transpose, pb, workers=workers)
+    encode_time = f"{time.time() - start:.5f}"
+
+    if algorithm == 'rc2':
+        result = solve_rc2(wcnf, solver_name, timeout=timeout, **options)
+    else:
+        result = solve_lsu(wcnf, solver_name, timeout=timeout)
+    return result, encode_time
+
+def process_file(file_path, method, cc, pb, algorithm, solver_name, timeout=None, workers=1, **options):
+    """
+    Process a single input file and find a minimum-weight codeword.
+
+    The codeword is verified in process, and reported optimal when the solver proved its cost
+    and the cost is the weight of the codeword.
+
+    Returns:
+        list: One row of the result CSV (see MAXSAT_FIELDS).
+    """
+    n, seed, H_transpose = parse_input_file(file_path)
+
+    result, encode_time = build_and_solve_MaxSAT(n, H_transpose, method, cc, pb, algorithm, solver_name, timeout, workers, **options)
+    file = os.path.basename(file_path)
+    res_time = f"{result.seconds:.5f}"
+
+    optimal = False
+    if result.status == 'sat':
+        sol = model_to_bits(result.model, n)
+        verification = verify_sol(H_transpose, sol)
+        if verification.valid:
+            optimal = result.proven and verification.weight == result.cost
+        else:
+            sol = "Invalid solution"
+    else:
+        sol = "No solution"
+    cost = "" if result.cost is None else result.cost
+    return [file, result.status, res_time, sol, cost, optimal, encode_time, format_bounds(result.bounds)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process MaxSAT solver (RC2 or linear search) for the WCNF models of the low-weight codeword problem.")
+    parser.add_argument('-m', '--method', choices=['CNF1', 'CNF2'], required=True, help="WCNF model to solve (CNF1 or CNF2)")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('-f', '--file', help='Path to an input file')
+    group.add_argument('-d', '--dir', help='Path to a directory to process')
+    parser.add_argument('--cc', type=int, default=3, help="Cardinality encoding (CNF1). Default: 3")
+    parser.add_argument('--pb', type=int, required=True, help="Pseudo-Boolean encoding.")
+    parser.add_argument('-a', '--algorithm', choices=ALGORITHMS, default='rc2',
+                        help="rc2 (core-guided, lower bounds) or lsu (linear SAT-UNSAT search, upper bounds). Default: rc2")
+    parser.add_argument('-s', '--solver', choices=solver_names(), default='glucose3', help="pysat SAT oracle. Default: glucose3")
+    parser.add_argument('--stratified', action='store_true', help="RC2: stratify the soft clauses by weight")
+    parser.add_argument('--exhaust', action='store_true', help="RC2: core exhaustion")
+    parser.add_argument('--minz', action='store_true', help="RC2: core minimization")
+    parser.add_argument('--adapt', action='store_true', help="RC2: detect and adapt intrinsic AtMost1 constraints")
+    parser.add_argument('-t', '--timeout', type=float, help="Time limit per instance in seconds (needs a solver that can be interrupted)")
+    parser.add_argument('-j', '--workers', type=int, default=1, help="Processes encoding the rows in parallel (0: all cores). Default: 1")
+    args = parser.parse_args()
+
+    if args.timeout is not None and not supports_interrupt(args.solver):
+        parser.error(f"the {args.solver} solver cannot be interrupted, use another solver with --timeout (e.g. -s glucose3)")
+    if args.algorithm == 'lsu' and (args.stratified or args.exhaust or args.minz or args.adapt):
+        parser.error("--stratified, --exhaust, --minz and --adapt are RC2 options")
+
+    options = {}
+    if args.algorithm == 'rc2':
+        options = dict(stratified=args.stratified, exhaust=args.exhaust, minz=args.minz, adapt=args.adapt)
+    solve_args = (args.method, args.cc, args.pb, args.algorithm, args.solver, args.timeout, args.workers or None)
+    prefix = f"{args.algorithm.upper()}_{args.solver}_W{args.method}_PB_{args.pb}_encoding_{args.cc}"
+
+    if args.file:
+        row = process_file(args.file, *solve_args, **options)
+        directory = os.path.dirname(args.file)
+        csv_filepath = os.path.join(directory, f"{prefix}_{os.path.splitext(row[0])[0]}.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(MAXSAT_FIELDS)
+            csv_writer.writerow(row)
+    else:
+        csv_filepath = os.path.join(args.dir, f"{prefix}.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(MAXSAT_FIELDS)
+            csvfile.flush()
+
+            entries = [
+                entry for entry in os.listdir(args.dir)
+                if os.path.isfile(os.path.join(args.dir, entry)) and '.' not in os.path.basename(entry)
+            ]
+            entries.sort(key=extract_n)
+
+            for entry in entries:
+                path = os.path.join(args.dir, entry)
+                print(f"\n--- Processing {path} ---")
+                csv_writer.writerow(process_file(path, *solve_args, **options))
+                csvfile.flush()
+
+    print(f"Results written to {csv_filepath}")
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,19 @@
 from pysat.card import CardEnc
-from pysat.pb import PBEnc
-from pysat.formula import WCNF
 from utils import *
+from core.arena import WeightedClauseArena
+from core.templates import encode_pb_rows
 
-def build_WCNF1(n, H_transpose, cc_encoding, pb_encoding):
+def build_WCNF1(n, H_transpose, cc_encoding, pb_encoding, cnf=None, workers=1, var_sets=None):
     
-    m = n // 2  # Number of equations
-    cnf = WCNF()
+    m = H_transpose.nrows  # Number of equations
+    if cnf is None:  # A WcnfWriter streams the clauses to disk instead
+        cnf = WeightedClauseArena()
     
     # Variables e_j numbered from 1 to n
     e_vars = list(range(1, n+1))
     
-    # Construction of the V_i sets line by line
-    V = []
-    for i, row in enumerate(H_transpose):
-        V_i = [i + 1]  # Adding identity
-        for j, val in enumerate(row):
-            if val == '1':
-                V_i.append(j + int(n / 2) + 1) 
-        V.append(V_i)
-    
-    # For each equation E_i, define the set K_{E_i}
-    K = []
-    for i, V_i in enumerate(V):
-        max_val = len(V_i)
-        K_i = [j for j in range(max_val + 1) if j % 2 == 0]
-        K.append(K_i)
+    # Construction of the V_i and K_{E_i} sets (unless they are shared by the caller)
+    V, K = var_sets if var_sets is not None else build_var_sets(H_transpose, n)
     
     # Introduce the variables x_{i,v}
     top_id = n  
@@ -42,7 +30,8 @@ def build_WCNF1(n, H_transpose, cc_encoding, pb_encoding):
             top_id = res.nv
         
     
-    # Encoding of the pseudo-Boolean constraint
+    # Encoding of the pseudo-Boolean constraint, rows of the same shape share one pblib encoding
+    rows = []  # (lits, weights, rhs) of every equation, encoded after the loop
     for i, V_i in enumerate(V):
         
         e_vars_i = V_i  # variables e_j of equation E_i
@@ -64,10 +53,11 @@ def build_WCNF1(n, H_transpose, cc_encoding, pb_encoding):
         lits = e_vars_i + x_lits
         weights = e_weights + x_weights
         
-        # Pseudo-Boolean encoding with PBEnc.equals
-        res_eq = PBEnc.equals(lits=lits, weights=weights, bound=rhs, top_id=top_id, encoding=pb_encoding)
-        cnf.extend(res_eq.clauses)
-        top_id = res_eq.nv 
+        rows.append((lits, weights, rhs))
+
+    # Encode the PB equality constraints, in parallel blocks of rows with several workers
+    # (pblib is only called for new row shapes, the formula does not depend on workers)
+    top_id = encode_pb_rows(cnf, rows, top_id, pb_encoding, workers)
 
     # At least one variable must be true
     cnf.append([i for i in range(1, n + 1)])
@@ -79,30 +69,17 @@ def build_WCNF1(n, H_transpose, cc_encoding, pb_encoding):
     return cnf
 
 
-def build_WCNF2(n, H_transpose, pb_encoding):
+def build_WCNF2(n, H_transpose, pb_encoding, cnf=None, workers=1, var_sets=None):
 
-    m = n // 2  # Number of equations
-    cnf = WCNF()
+    m = H_transpose.nrows  # Number of equations
+    if cnf is None:  # A WcnfWriter streams the clauses to disk instead
+        cnf = WeightedClauseArena()
     
     # Variables e_j numbered from 1 to n
     e_vars = list(range(1, n+1))
     
-    # Construction of the V_i sets line by line
-    V = []
-    for i, row in enumerate(H_transpose):
-        V_i = [i + 1]  # Adding identity
-        for j, val in enumerate(row):
-            if val == '1':
-                V_i.append(j + int(n / 2) + 1) 
-        V.append(V_i)
-
-    
-    # For each equation E_i, define the set K_{E_i}
-    K = []
-    for i, V_i in enumerate(V):
-        max_val = len(V_i)
-        K_i = [j for j in range(max_val + 1) if j % 2 == 0]
-        K.append(K_i)
+    # Construction of the V_i and K_{E_i} sets (unless they are shared by the caller)
+    V, K = var_sets if var_sets is not None else build_var_sets(H_transpose, n)
     
     # Introduce the variables x_{i,v} for all v \in K_{E_i}
     top_id = n 
@@ -112,7 +89,8 @@ def build_WCNF2(n, H_transpose, pb_encoding):
             top_id += 1  
             x_vars_dict[(i, v)] = top_id  
 
-    # Encoding of the pseudo-Boolean constraint
+    # Encoding of the pseudo-Boolean constraint, rows of the same shape share one pblib encoding
+    rows = []  # (lits, weights, rhs) of every equation, encoded after the loop
     for i, V_i in enumerate(V):
         # Each e_j has a weight of 1
         e_vars_i = V_i
@@ -134,10 +112,11 @@ def build_WCNF2(n, H_transpose, pb_encoding):
         lits = e_vars_i + x_lits
         weights = e_weights + x_weights
         
-        # Encoding with PBEnc.equals
-        res_eq = PBEnc.equals(lits=lits, weights=weights, bound=rhs, top_id=top_id, encoding=pb_encoding)
-        cnf.extend(res_eq.clauses)
-        top_id = res_eq.nv
+        rows.append((lits, weights, rhs))
+
+    # Encode the PB equality constraints, in parallel blocks of rows with several workers
+    # (pblib is only called for new row shapes, the formula does not depend on workers)
+    top_id = encode_pb_rows(cnf, rows, top_id, pb_encoding, workers)
 
     for i in range(m):
         for v in K[i]:
@@ -3,189 +3,117 @@ import csv
 import time
 from ortools.sat.python import cp_model
 from utils import *
-
-def build_and_solve_CP1(n, H_transpose):
+from core.cpsat import (BUILD_FIELDS, DEFAULT_TIME_LIMIT, add_parameter_arguments, add_rows_CP1, add_rows_CP2,
+                        add_rows_XOR, build_info, format_parameters, parameters_from_args, parity_rows, solve_model)
+from core.results import RESULT_FIELDS
+
+# Columns of the result CSV: the ones checked by check_LWCP_solution.py, the model size, then the CP-SAT parameters
+CPSAT_FIELDS = RESULT_FIELDS + BUILD_FIELDS + ["Parameters"]
+
+def build_CP(n, H_transpose, add_rows, named=True):
+    """
+    Build the CP-SAT model of the low-weight codeword problem: every equation has an even sum,
+    the weight of the (non-zero) codeword is minimized.
+
+    Args:
+        n (int): Total number of variables.
+        H_transpose (GF2Matrix): The transposed parity-check matrix.
+        add_rows (function): Encoding of the equations (core.cpsat.add_rows_CP1, add_rows_CP2 or add_rows_XOR).
+        named (bool): Whether to name the variables.
+
+    Returns:
+        model (cp_model.CpModel): The model.
+        e_vars (list): The variables e_1..e_n.
+    """
     model = cp_model.CpModel()
-    
-    # Variables e_j 
-    e_vars = [model.NewBoolVar(f"e_{j}") for j in range(1, n+1)]
-    
-    # Construction of sets V_i
-    V = []
-    for i, row in enumerate(H_transpose):
-        V_i = [i + 1]
-        for j, val in enumerate(row):
-            if val == '1':
-                V_i.append(j + n//2 + 1)
-        V.append(V_i)
-    
-    # For each equation E_i
-    for i, V_i in enumerate(V):
-        # calculation of K_i
-        max_val = len(V_i)
-        K_i = [v for v in range(max_val+1) if v % 2 == 0]
-        
-        
-        x_vars = {}     # x_{i,v}
-        xbar_vars = {}  # \bar x_{i,v}
-        if len(K_i) > 0:
-            for v in K_i:
-                x = model.NewBoolVar(f"x_{i}_{v}")
-                xbar = model.NewBoolVar(f"xbar_{i}_{v}")
-                # x + xbar = 1  <=>  xbar = 1 − x
-                model.Add(x + xbar == 1)
-                x_vars[v] = x
-                xbar_vars[v] = xbar
-            # exactly one of the x_{i,v} equals 1
-            model.Add(sum(x_vars.values()) == 1)
-        
-        # sum e_j + sum v* xbar_{i,v} == sum(K_i)
-        rhs = sum(K_i)
-        terms = []
-        # sum of e_j
-        for idx in V_i:
-            terms.append(e_vars[idx-1])
-        # sum of v * xbar_{i,v}
-        for v, xbar in xbar_vars.items():
-            if v != 0 :
-                terms.append(xbar * v)
-        
-        model.Add(sum(terms) == rhs)
-
-    model.Minimize(sum(e_vars))
-    model.Add(sum(e_vars) > 0)
 
-    # Resolution
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = 10800
+    # Variables e_j
+    e_vars = [model.new_bool_var(f"e_{j}" if named else "") for j in range(1, n+1)]
 
-    start = time.time()
-    status = solver.Solve(model)
-    res_time = time.time() - start
-    res_time = f"{res_time:.5f}"
-
-    solution = None
-    if status in (cp_model.FEASIBLE, cp_model.OPTIMAL):
-        solution = [solver.Value(e_j) for e_j in e_vars]
-        solution = ''.join(map(str, solution))
-        status_str = 'sat'
-    else:
-        status_str = 'unsat' if status == cp_model.INFEASIBLE else 'timeout'
+    # Sets V_i and K_i (even values up to |V_i|)
+    columns, sizes = parity_rows(H_transpose, n)
+    K = [range(0, size + 1, 2) for size in sizes.tolist()]
+    add_rows(model, e_vars, columns, K, named)
 
-    return status_str, res_time, solution
+    weight = cp_model.LinearExpr.sum(e_vars)
+    model.minimize(weight)
+    model.add(weight > 0)
+    return model, e_vars
+
+def build_and_solve(n, H_transpose, add_rows, timeout, parameters, named):
+    """Build the model, then solve it: the outcome of solve_model and the BUILD_FIELDS of the model."""
+    start = time.time()
+    model, e_vars = build_CP(n, H_transpose, add_rows, named)
+    info = build_info(model, time.time() - start)
 
-def build_and_solve_CP2(n, H_transpose):
-    model = cp_model.CpModel()
-    
-    e_vars = [model.NewBoolVar(f"e_{j}") for j in range(1, n+1)]
-    
-    # Construction of V_i
-    V = []
-    for i, row in enumerate(H_transpose):
-        V_i = [i+1] + [j + n//2 + 1 for j, val in enumerate(row) if val == '1']
-        V.append(V_i)
-    
-    # For each equation i
-    for i, V_i in enumerate(V):
-        # Calculation of K_i
-        max_val = len(V_i)
-        K_i = [v for v in range(max_val+1) if v % 2 == 0]
-        
-        x_vars = {}     # x_{i,v}
-        xbar_vars = {}  # \bar x_{i,v}
-        if len(K_i) > 0:
-            for v in K_i:
-                x = model.NewBoolVar(f"x_{i}_{v}")
-                xbar = model.NewBoolVar(f"xbar_{i}_{v}")
-                # x + xbar = 1  <=>  xbar = 1 − x
-                model.Add(x + xbar == 1)
-                x_vars[v] = x
-                xbar_vars[v] = xbar
-        
-        # sum e_j + sum 2* xbar_{i,v} == max(K_i)
-        rhs = max(K_i)
-        terms = []
-        # sum of e_j
-        for idx in V_i:
-            terms.append(e_vars[idx-1])
-        # sum of v * xbar_{i,v}
-        for v, xbar in xbar_vars.items():
-            if v not in {0,1} :
-                terms.append(xbar * 2)
-        
-        model.Add(sum(terms) == rhs)
-        
-        for v in K_i:
-            if v not in {0,1,2,3} and (v-2) in x_vars:
-                # AddBoolOr([¬x_{i,v}, x_{i,v-2}])
-                model.AddBoolOr([xbar_vars[v], x_vars[v-2]])
-
-    model.Minimize(sum(e_vars))
-    model.Add(sum(e_vars) > 0)
-    
     # Resolution
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = 10800
+    return solve_model(model, e_vars, parameters, timeout) + (info,)
 
-    start = time.time()
-    status = solver.Solve(model)
-    res_time = time.time() - start
-    res_time = f"{res_time:.5f}"
-
-    solution = None
-    if status in (cp_model.FEASIBLE, cp_model.OPTIMAL):
-        solution = [solver.Value(e_j) for e_j in e_vars]
-        solution = ''.join(map(str, solution))
-        status_str = 'sat'
-    else:
-        status_str = 'unsat' if status == cp_model.INFEASIBLE else 'timeout'
+def build_and_solve_CP1(n, H_transpose, timeout=DEFAULT_TIME_LIMIT, parameters=None, named=True):
+    return build_and_solve(n, H_transpose, add_rows_CP1, timeout, parameters, named)
+
+def build_and_solve_CP2(n, H_transpose, timeout=DEFAULT_TIME_LIMIT, parameters=None, named=True):
+    return build_and_solve(n, H_transpose, add_rows_CP2, timeout, parameters, named)
 
-    return status_str, res_time, solution
+def build_and_solve_XOR(n, H_transpose, timeout=DEFAULT_TIME_LIMIT, parameters=None, named=True):
+    # Each equation is a native XOR constraint with even parity
+    return build_and_solve(n, H_transpose, add_rows_XOR, timeout, parameters, named)
 
+# Solving function of each --method
+SOLVE_FUNCTIONS = {'CNF1': build_and_solve_CP1, 'CNF2': build_and_solve_CP2, 'XOR': build_and_solve_XOR}
 
-def process_file(file_path, solve_function):
+
+def process_file(file_path, solve_function, parameters=None, named=True):
     n, seed, H_transpose = parse_input_file(file_path)
     
     # Solve the problem with CP-SAT
-    status, res_time, sol = solve_function(n, H_transpose)
+    status, res_time, sol, info = solve_function(n, H_transpose, parameters=parameters, named=named)
     file = os.path.basename(file_path)
 
     if status == 'sat' and sol is not None:
-        is_valid = verify_sol(file_path, sol)
-        if is_valid: 
-            return file, status, res_time, sol
+        verification = verify_sol(H_transpose, sol)
+        if verification.valid:
+            return file, status, res_time, sol, info
         else:
-            return file, status, res_time, "Invalid solution"
+            return file, status, res_time, "Invalid solution", info
     else:
-        return file, status, res_time, "No solution"
+        return file, status, res_time, "No solution", info
     
 
 def main():
     parser = argparse.ArgumentParser(description="CPSat solver for the low-weight codeword problem.")
-    parser.add_argument('-m', '--method', choices=['CNF1', 'CNF2'], required=True, help="Resolution method to use (CNF1 or CNF2)")
+    parser.add_argument('-m', '--method', choices=list(SOLVE_FUNCTIONS), required=True, help="Resolution method to use (CNF1, CNF2 or XOR)")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('-f', '--file', help='Path to an input file')
     group.add_argument('-d', '--dir', help='Path to a file to be processed')
+    parser.add_argument('--anonymous', action='store_true', help="Leave the model variables unnamed (smaller model, faster to build)")
+    add_parameter_arguments(parser)
     args = parser.parse_args()
 
+    try:
+        parameters = parameters_from_args(args)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    settings = format_parameters(parameters)
+
     # Select the solving function based on the chosen method
-    solve_function = build_and_solve_CP1 if args.method == 'CNF1' else build_and_solve_CP2
+    solve_function = SOLVE_FUNCTIONS[args.method]
 
     if args.file:
-        file, status, res_time, sol = process_file(args.file,solve_function)
+        file, status, res_time, sol, info = process_file(args.file, solve_function, parameters, not args.anonymous)
         directory = os.path.dirname(args.file)
         csv_filepath = os.path.join(directory, f"CPSAT_W{args.method}_{os.path.splitext(file)[0]}.csv")
         with open(csv_filepath, mode='w', newline='') as csvfile:
             csv_writer = csv.writer(csvfile)
-            csv_writer.writerow(["File", "Result", "Time (s)", "Solution"])
-            csv_writer.writerow([file, status, res_time, sol])
+            csv_writer.writerow(CPSAT_FIELDS)
+            csv_writer.writerow([file, status, res_time, sol] + info + [settings])
             csvfile.flush()
     else:
         csv_filepath = os.path.join(args.dir, f"CPSAT_W{args.method}.csv")
         os.makedirs(args.dir, exist_ok=True)  
         with open(csv_filepath, mode='w', newline='') as csvfile:
             csv_writer = csv.writer(csvfile)
-            csv_writer.writerow(["File", "Result", "Time (s)", "Solution"])
+            csv_writer.writerow(CPSAT_FIELDS)
             csvfile.flush()
 
             entries = [
@@ -197,8 +125,8 @@ def main():
             for entry in entries:
                 path = os.path.join(args.dir, entry)
                 print(f"\n--- Traitement de {path} ---")
-                file, status, res_time, sol = process_file(path,solve_function)
-                csv_writer.writerow([file, status, res_time, sol])
+                file, status, res_time, sol, info = process_file(path, solve_function, parameters, not args.anonymous)
+                csv_writer.writerow([file, status, res_time, sol] + info + [settings])
                 csvfile.flush()
 
     print(f"Résultats écrits dans {csv_filepath}")
@@ -1,4 +1,6 @@
 from utils import *
+from core.arena import WeightedClauseArena
+from core.compress import open_text
 
 def build_WXNF(n, anf_filename, xnf_filename):
     """"
@@ -11,7 +13,7 @@ def build_WXNF(n, anf_filename, xnf_filename):
     """
     
     # Read the ANF file and store all lines
-    with open(anf_filename, 'r') as anf_file:
+    with open_text(anf_filename) as anf_file:
         lines = anf_file.readlines()
 
     # Variables e_j numbered from 1 to n
@@ -20,16 +22,14 @@ def build_WXNF(n, anf_filename, xnf_filename):
 
     nb_vars = top_id  # Total number of variables including 'T'
 
-    cnf_clauses = []
+    # Soft clauses are written first with their weight, hard clauses with the top weight 10
+    cnf_clauses = WeightedClauseArena()
 
     # Soft clauses : 5 -e_j 0
-    for j in range(1, n+1):
-        var_id = e_vars[j-1]     
-        cnf_clauses.append(f"5 -{var_id} 0")
+    cnf_clauses.extend([[-var_id] for var_id in e_vars], weights=[5] * n)
 
     # Hard clause : 10 e_1 e_2 ... e_n 0
-    hard_clause = " ".join(str(e_vars[j]) for j in range(n))
-    cnf_clauses.append(f"10 {hard_clause} 0")
+    cnf_clauses.append(e_vars)
 
     # Skip ANF header, remove the initial 'x' and replace 'T' with top_id
     anf_content = []
@@ -47,27 +47,26 @@ def build_WXNF(n, anf_filename, xnf_filename):
         if len(vars_effectives) == 1:
             a = vars_effectives[0]
             # Generate the CNF clause for a single variable (equivalent to e_a = T)
-            cnf_clauses.append(f"10 -{a} 0")
+            cnf_clauses.append([-a])
         elif len(vars_effectives) == 2:
             a, b = vars_effectives
             # Generate CNF clauses for 2-variable XOR
-            cnf_clauses.append(f"10 {a} -{b} 0")
-            cnf_clauses.append(f"10 -{a} {b} 0")
+            cnf_clauses.append([a, -b])
+            cnf_clauses.append([-a, b])
         else:
             # Keep the line as is for GaussMaxHS
             anf_content.append(f"x 10 {clean_line}")
 
 
     # Total number of clauses = ANF lines (without header) + CNF clauses
-    nb_lines = len(anf_content) + len(cnf_clauses)
+    nb_lines = len(anf_content) + len(cnf_clauses.hard) + len(cnf_clauses.soft)
 
     # Write the final XNF file
-    with open(xnf_filename, 'w') as xnf_file:
+    with open_text(xnf_filename, 'w') as xnf_file:
         # Write XNF header: p cnf <num_vars> <num_clauses>  10
         xnf_file.write(f"p wcnf {nb_vars} {nb_lines + 1} 10\n")
 
-        for clause in cnf_clauses:
-            xnf_file.write(clause + "\n")
+        cnf_clauses.write_clauses(xnf_file, hard_prefix="10")
 
         # Explicitly write the clause for top_id
         xnf_file.write(f"10 {top_id} 0\n")
@@ -0,0 +1,147 @@
+import csv
+import time
+import argparse
+from ortools.sat import sat_parameters_pb2
+from LW_WCNF_CPSAT import build_CP
+from utils import *
+from core.cpsat import add_rows_CP1, add_rows_CP2, solve_model
+from core.batch import parse_list
+from core.portfolio import race
+from core.results import RESULT_FIELDS
+
+CONFIGS = ["CP1", "CP2"]
+
+# Seconds left to the entrants after the deadline to send the codeword they stopped with
+GRACE = 5
+
+# Columns of the result CSV: the ones of LW_WCNF_CPSAT.main, then the configuration that found
+# the codeword and whether it is proven optimal
+PORTFOLIO_FIELDS = RESULT_FIELDS + ["Configuration", "Optimal"]
+
+def solve_CP(method, n, H_transpose, deadline, workers=1):
+    """
+    CP-SAT entrant with an explicit number of search workers.
+
+    The time limit of the solver is what remains until the race deadline once the model is
+    built, so that it stops there with its best codeword instead of being terminated.
+
+    Returns:
+        tuple: (status, solution, proven optimal).
+    """
+    add_rows = add_rows_CP1 if method == "CP1" else add_rows_CP2
+    model, e_vars = build_CP(n, H_transpose, add_rows, named=False)
+    parameters = sat_parameters_pb2.SatParameters(num_workers=workers, max_time_in_seconds=max(deadline - time.time(), 0))
+    status, _, solution, proven = solve_model(model, e_vars, parameters, optimal=True)
+    return status, solution, proven
+
+def parse_config(spec, n, H_transpose, deadline):
+    """
+    Turn a configuration into a race entrant.
+
+    A CP-SAT entrant runs a single search worker unless its configuration asks for more, so that
+    the entrants share the cores instead of each starting one worker per core (CP-SAT's default).
+
+    Args:
+        spec (str): 'CP1[:<workers>]' or 'CP2[:<workers>]' (1 search worker by default, 0 for
+            CP-SAT's default of all cores).
+        n, H_transpose: The instance.
+        deadline (float): Epoch time at which the race ends.
+
+    Returns:
+        tuple: (task, args) for core.portfolio.race.
+    """
+    parts = spec.split(":")
+    try:
+        if parts[0] in CONFIGS and len(parts) in (1, 2):
+            workers = int(parts[1]) if len(parts) == 2 else 1
+            if workers >= 0:
+                return solve_CP, (parts[0], n, H_transpose, deadline, workers)
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid configuration '{spec}', expected CP<1|2>[:<workers>].")
+
+def process_file(file_path, configs, timeout=10800):
+    """
+    Race the configurations on one instance and keep the first verified codeword proven optimal.
+
+    When no configuration proves one before the deadline, the lightest verified codeword that
+    the configurations stopped with is kept, reported as not optimal.
+
+    Returns:
+        list: One row of the result CSV (see PORTFOLIO_FIELDS).
+    """
+    n, _, H_transpose = parse_input_file(file_path)
+    file = os.path.basename(file_path)
+    entrants = {spec: parse_config(spec, n, H_transpose, time.time() + timeout) for spec in configs}
+
+    def weight(outcome):
+        """Weight of a verified codeword of an outcome, None if it has none."""
+        if not isinstance(outcome, tuple) or outcome[0] != 'sat' or outcome[1] is None:
+            return None
+        verification = verify_sol(H_transpose, outcome[1])
+        return verification.weight if verification.valid else None
+
+    def accept(name, outcome):
+        return outcome[2] and weight(outcome) is not None
+
+    result = race(entrants, accept, timeout, grace=GRACE)
+    res_time = f"{result.seconds:.5f}"
+    if result.winner is not None:
+        return [file, 'sat', res_time, result.outcome[1], result.winner, True]
+
+    found = {name: weight(outcome) for name, outcome in result.finished.items()}
+    found = {name: w for name, w in found.items() if w is not None}
+    if not found:
+        return [file, 'timeout', res_time, "No solution", "", False]
+    best = min(found, key=found.get)
+    return [file, 'sat', res_time, result.finished[best][1], best, False]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio of CP-SAT models racing on each low-weight codeword instance.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('-f', '--file', help='Path to an input file')
+    group.add_argument('-d', '--dir', help='Path to a directory to process')
+    parser.add_argument('-c', '--configs', type=parse_list, default=CONFIGS,
+                        help=f"Comma-separated configurations CP<1|2>[:<workers>]. Default: {','.join(CONFIGS)}")
+    parser.add_argument('-t', '--timeout', type=float, default=10800, help="Time limit per instance in seconds. Default: 10800")
+    args = parser.parse_args()
+
+    for spec in args.configs:
+        try:
+            parse_config(spec, None, None, None)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.file:
+        row = process_file(args.file, args.configs, args.timeout)
+        directory = os.path.dirname(args.file)
+        csv_filepath = os.path.join(directory, f"PORTFOLIO_{os.path.splitext(row[0])[0]}.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(PORTFOLIO_FIELDS)
+            csv_writer.writerow(row)
+    else:
+        csv_filepath = os.path.join(args.dir, "PORTFOLIO.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(PORTFOLIO_FIELDS)
+            csvfile.flush()
+
+            entries = [
+                entry for entry in os.listdir(args.dir)
+                if os.path.isfile(os.path.join(args.dir, entry)) and '.' not in os.path.basename(entry)
+            ]
+            entries.sort(key=extract_n)
+
+            for entry in entries:
+                path = os.path.join(args.dir, entry)
+                print(f"\n--- Processing {path} ---")
+                csv_writer.writerow(process_file(path, args.configs, args.timeout))
+                csvfile.flush()
+
+    print(f"Results written to {csv_filepath}")
+
+
+if __name__ == "__main__":
+    main()
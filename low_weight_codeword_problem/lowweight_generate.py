@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 
 import sys
-import random
 import os
+import argparse
+
+# Make the shared 'core' package importable when the script is run from this directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.generate import bit_stream, write_bit_rows, generate_grid, parse_range
 
 def eprint(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
@@ -14,10 +19,22 @@ def usage():
     eprint("This script generates an instance of the low weight codeword problem.")
     eprint("This matrix H is given in systematic form. The identity part is omitted.")
     eprint("The instance is stored in 'Challenges/LW/{seed}/LW_n_seed'.")
+    eprint("To generate a whole grid of instances in parallel, use:")
+    eprint("\b --grid <n_range> <seed_range> [-j workers] [--legacy]")
+    eprint("where ranges are given as 'start:stop[:step]' (inclusive) or 'a,b,c'.")
 
     
-def main(n, seed):
-    random.seed(seed)
+def main(n, seed, legacy=True):
+    """
+    Generate the instance (n, seed) and return its path.
+
+    Rows are streamed to the file as they are drawn, so memory stays bounded for large n.
+    With legacy=True the instance is identical to the one produced by random.seed(seed);
+    otherwise bits come from the NumPy stream of (n, seed) (see core.generate.instance_rng).
+    """
+    m = n // 2
+    stream = bit_stream(n, seed, legacy=legacy)
+
     text = ""
     text += "# n\n"
     text += str(n)
@@ -26,22 +43,33 @@ def main(n, seed):
     text += str(seed)
     text += "\n"
     text += "# H^transpose (each line corresponds to column of H, the identity part is omitted)\n"
-    for i in range(n-n//2):
-        line = ""
-        for j in range(n//2):
-            line += str(random.randint(0,1))
-        line += "\n"
-        text += line
 
     prefix = f"{os.getcwd()}/Challenges/seed_{seed}/LW/"
     os.makedirs(prefix, exist_ok=True)
     filename = prefix + "LW_" + str(n) + "_" + str(seed)
-    file  = open(filename, "w")
-    file.write(text)
-    file.close()
+    with open(filename, "wb") as file:
+        file.write(text.encode("ascii"))
+        write_bit_rows(file, stream, n - m, m)
+    return filename
+
+def grid_main(argv):
+    parser = argparse.ArgumentParser(prog=f"{os.path.basename(sys.argv[0])} --grid",
+                                     description="Generate a grid of low weight codeword instances in parallel.")
+    parser.add_argument("n_range", type=parse_range, help="Sizes, e.g. '100:1000:100' or '10,20,30'")
+    parser.add_argument("seed_range", type=parse_range, help="Seeds, e.g. '0:49'")
+    parser.add_argument("-j", "--workers", type=int, help="Number of worker processes. Default: number of CPUs")
+    parser.add_argument("--legacy", action="store_true",
+                        help="Reproduce the instances of random.seed(seed) instead of the NumPy streams")
+    args = parser.parse_args(argv)
+
+    generated = generate_grid(main, args.n_range, args.seed_range, workers=args.workers, legacy=args.legacy)
+    print(f"{len(generated)} instances generated.")
 
 if __name__ == "__main__":
     # execute only if run as a script
+    if len(sys.argv) > 1 and sys.argv[1] == "--grid":
+        grid_main(sys.argv[2:])
+        exit(0)
     if len(sys.argv)!=3:
         usage()
         exit(1)
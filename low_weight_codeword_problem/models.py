@@ -1,9 +1,16 @@
 import os
 import argparse
 import sys
+import pysat
 from LW_WCNF import build_WCNF1, build_WCNF2
 from LW_WXNF import build_WXNF
-from utils import parse_input_file, write_wcnf_to_file, process_matrix_and_write_to_file
+from utils import parse_input_file, build_var_sets, write_wcnf_to_file, wcnf_output_path, process_matrix_and_write_to_file
+from core.dimacs import WcnfWriter
+from core.batch import parse_list, expand_inputs, run_batch
+from core.manifest import Manifest, file_digest, build_key
+from core.compress import COMPRESSIONS, with_compression
+
+FORMATS = ["WCNF1", "WCNF2", "WXNF"]
 
 def log(msg, level="INFO"):
     print(f"[{level}] {msg}")
@@ -13,18 +20,195 @@ def parse_args():
         description="Generate Low-Weight Codeword (LWC) instances in WCNF or WXNF format."
     )
     parser.add_argument("input_file", help="Path to the input challenge file")
-    parser.add_argument("-f", "--format", choices=["WCNF1", "WCNF2", "WXNF"], required=True,
+    parser.add_argument("-f", "--format", choices=FORMATS, required=True,
                         help="Output format: WCNF (MaxSAT) or WXNF (XOR-extended)")
-    parser.add_argument("--cc", type=int, default=3, 
+    parser.add_argument("--cc", type=int, default=3,
                         help="Cardinality encoding (for PySAT CardEnc). Default: 3")
-    parser.add_argument("--pb", type=int, default=5, 
+    parser.add_argument("--pb", type=int, default=5,
                         help="Pseudo-Boolean encoding (for PySAT PBEnc). Default: 5")
-    
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Processes encoding the WCNF rows in parallel (0: all cores). Default: 1")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write WCNF clauses to disk as they are encoded instead of building the formula in memory.")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild the model even if the manifest says it is up to date.")
+    parser.add_argument("--compress", choices=COMPRESSIONS,
+                        help="Compress the generated files (their name gets the matching extension).")
+
     return parser.parse_args()
 
+def seed_manifest(seed, force=False):
+    """Manifest of the models generated under Challenges/seed_<seed>."""
+    return Manifest(f"Challenges/seed_{seed}", force=force)
+
+def generate_wcnf(input_file, variant, n, seed, H_transpose, cc, pb, stream=False, workers=1, var_sets=None,
+                  manifest=None, digest=None, compression=None):
+    """
+    Build a WCNF model of a parsed instance and write it to its output file.
+
+    Args:
+        input_file (str): Path to the instance file (names the output).
+        variant (str): '1' or '2'.
+        n, seed, H_transpose: The instance, as returned by parse_input_file.
+        cc (int): Cardinality encoding (WCNF1 only).
+        pb (int): Pseudo-Boolean encoding.
+        stream (bool): Write the clauses as they are encoded.
+        workers (int or None): Processes encoding the rows.
+        var_sets (tuple or None): (V, K) from build_var_sets, shared between models of the same instance.
+        manifest (Manifest or None): Skip the model if it is up to date in this manifest, and record it otherwise.
+        digest (str): file_digest of the instance, required with a manifest.
+        compression (str or None): Compression of the output (see core.compress).
+
+    Returns:
+        output_file (str or None): Path of the WCNF file, None if it was up to date.
+    """
+    output_file = wcnf_output_path(input_file, pb, seed, variant, compression)
+    if manifest is not None:
+        # WCNF2 does not use a cardinality encoding
+        key = build_key(digest, format=f"WCNF{variant}", cc=cc if variant == "1" else None, pb=pb, pysat=pysat.__version__)
+        if manifest.is_fresh(output_file, key):
+            log(f"WCNF{variant} model is up to date: {output_file}, skipping generation.")
+            return None
+
+    log(f"Building WCNF Variant {variant}...")
+    if variant == "1":
+        build = lambda cnf=None: build_WCNF1(n, H_transpose, cc_encoding=cc, pb_encoding=pb, cnf=cnf, workers=workers, var_sets=var_sets)
+    else:
+        build = lambda cnf=None: build_WCNF2(n, H_transpose, pb_encoding=pb, cnf=cnf, workers=workers, var_sets=var_sets)
+
+    if stream:
+        # Clauses go to disk as each row is encoded (the format has no header to patch)
+        with WcnfWriter(output_file) as writer:
+            build(writer)
+        log(f"The CNF clauses have been streamed to {output_file}")
+    else:
+        write_wcnf_to_file(input_file, pb, build(), seed, variant=variant, compression=compression)
+    if manifest is not None:
+        manifest.record(output_file, key)
+    return output_file
+
+def generate_wxnf(input_file, n, seed, H_transpose, manifest=None, digest=None, compression=None):
+    """
+    Write the ANF file of a parsed instance, then build its WXNF model.
+
+    With a manifest (and the file_digest of the instance), the ANF file and the model are
+    only rebuilt when they are out of date. Without one, both are always written.
+    With a compression, both files are compressed (see core.compress).
+
+    Returns:
+        wcnf_filename (str or None): Path of the WXNF file, None if it was up to date.
+    """
+    # Prepare filenames and directories
+    input_basename = os.path.basename(input_file)
+    file_no_ext = os.path.splitext(input_basename)[0]
+
+    # Path for the intermediate ANF file
+    anf_filename = with_compression(f"Challenges/seed_{seed}/ANF/{file_no_ext}.anf", compression)
+    # Path for the final WXNF file
+    wcnf_filename = with_compression(f"Challenges/seed_{seed}/WXNF/{file_no_ext}.wcnf", compression)
+
+    # Create necessary directories
+    os.makedirs(os.path.dirname(anf_filename), exist_ok=True)
+    os.makedirs(os.path.dirname(wcnf_filename), exist_ok=True)
+
+    if manifest is not None:
+        anf_key = build_key(digest, format="ANF")
+        key = build_key(digest, format="WXNF")
+        if manifest.is_fresh(wcnf_filename, key) and manifest.is_fresh(anf_filename, anf_key):
+            log(f"WXNF model is up to date: {wcnf_filename}, skipping generation.")
+            return None
+
+    log(f"Generating WXNF for seed {seed}...")
+
+    # Process matrix to ANF, unless it is up to date
+    if manifest is None or not manifest.is_fresh(anf_filename, anf_key):
+        log(f"Writing ANF to: {anf_filename}")
+        process_matrix_and_write_to_file(n, H_transpose, anf_filename)
+        if manifest is not None:
+            manifest.record(anf_filename, anf_key)
+
+    #  Build WXNF from the ANF file
+    log(f"Building WXNF at: {wcnf_filename}")
+    build_WXNF(n, anf_filename, wcnf_filename)
+    if manifest is not None:
+        manifest.record(wcnf_filename, key)
+
+    log("WXNF generation complete.")
+    return wcnf_filename
+
+def generate_models(input_file, formats, ccs, pbs, force=False, compression=None):
+    """
+    Generate every requested model of one instance, parsing it only once.
+
+    The V/K sets are shared by all WCNF models. Models that are up to date in the manifest
+    of the seed folder are skipped.
+
+    Args:
+        input_file (str): Path to the instance file.
+        formats (list of str): Formats among FORMATS.
+        ccs (list of int): Cardinality encodings (WCNF1 only).
+        pbs (list of int): Pseudo-Boolean encodings (WCNF1 and WCNF2).
+        force (bool): Rebuild the models that are up to date.
+        compression (str or None): Compression of the generated files (see core.compress).
+
+    Returns:
+        list of str: Paths of the files written.
+    """
+    n, seed, H_transpose = parse_input_file(input_file)
+    manifest = seed_manifest(seed, force)
+    digest = file_digest(input_file)
+
+    outputs = []
+    var_sets = None
+    for fmt in formats:
+        if fmt == "WXNF":
+            outputs.append(generate_wxnf(input_file, n, seed, H_transpose, manifest=manifest, digest=digest, compression=compression))
+            continue
+        if var_sets is None:
+            var_sets = build_var_sets(H_transpose, n)
+        variant = fmt[-1]
+        for cc in (ccs if variant == "1" else ccs[:1]):
+            for pb in pbs:
+                outputs.append(generate_wcnf(input_file, variant, n, seed, H_transpose, cc, pb,
+                                             var_sets=var_sets, manifest=manifest, digest=digest, compression=compression))
+    return [output for output in outputs if output is not None]
+
+def batch_main(argv):
+    """Generates every format x encoding combination for many instances over a process pool."""
+    parser = argparse.ArgumentParser(prog=f"{os.path.basename(sys.argv[0])} --batch",
+                                     description="Generate WCNF/WXNF models for many instances and encodings in parallel.")
+    parser.add_argument("inputs", nargs="+", help="Instance files, directories or glob patterns (e.g. 'Challenges/seed_*/LW')")
+    parser.add_argument("-f", "--formats", type=lambda spec: parse_list(spec), required=True,
+                        help=f"Comma-separated formats among {','.join(FORMATS)}")
+    parser.add_argument("--cc", type=lambda spec: parse_list(spec, int), default=[3],
+                        help="Comma-separated cardinality encodings (WCNF1). Default: 3")
+    parser.add_argument("--pb", type=lambda spec: parse_list(spec, int), default=[5],
+                        help="Comma-separated pseudo-Boolean encodings. Default: 5")
+    parser.add_argument("-j", "--workers", type=int, help="Number of worker processes. Default: number of CPUs")
+    parser.add_argument("--force", action="store_true", help="Rebuild the models that are up to date in the manifests.")
+    parser.add_argument("--compress", choices=COMPRESSIONS, help="Compress the generated files (their name gets the matching extension).")
+    args = parser.parse_args(argv)
+
+    unknown = [fmt for fmt in args.formats if fmt not in FORMATS]
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(unknown)}")
+    if "WCNF1" in args.formats and len(args.cc) > 1:
+        # WCNF1 output paths only name the PB encoding, several --cc would overwrite each other
+        parser.error("WCNF1 accepts a single --cc value.")
+
+    input_files = expand_inputs(args.inputs)
+    log(f"{len(input_files)} instances, formats {','.join(args.formats)}, cc {args.cc}, pb {args.pb}")
+    results = run_batch(generate_models, input_files, (args.formats, args.cc, args.pb, args.force, args.compress), workers=args.workers)
+    if any(result.error is not None for result in results):
+        sys.exit(1)
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        batch_main(sys.argv[2:])
+        return
+
     args = parse_args()
-    
+
     if not os.path.exists(args.input_file):
         log(f"Input file not found: {args.input_file}", "ERROR")
         sys.exit(1)
@@ -33,44 +217,20 @@ def main():
     log(f"Parsing input file: {args.input_file}")
     n, seed, H_transpose = parse_input_file(args.input_file)
 
-    # Generation based on selected format
-    if args.format == "WCNF1":
-        log("Building WCNF Variant 1...")
-        cnf = build_WCNF1(n, H_transpose, cc_encoding=args.cc, pb_encoding=args.pb)
-        write_wcnf_to_file(args.input_file, args.pb, cnf, seed, variant="1")
+    # Up-to-date models are skipped unless --force is given
+    manifest = seed_manifest(seed, args.force)
+    digest = file_digest(args.input_file)
 
-    elif args.format == "WCNF2":
-        log("Building WCNF Variant 2...")
-        cnf = build_WCNF2(n, H_transpose, pb_encoding=args.pb)
-        write_wcnf_to_file(args.input_file, args.pb, cnf, seed, variant="2")
+    # Generation based on selected format
+    if args.format in ("WCNF1", "WCNF2"):
+        generate_wcnf(args.input_file, args.format[-1], n, seed, H_transpose, args.cc, args.pb,
+                      stream=args.stream, workers=args.workers or None, manifest=manifest, digest=digest,
+                      compression=args.compress)
 
     elif args.format == "WXNF":
-        log(f"Generating WXNF for seed {seed}...")
-        
-        # Prepare filenames and directories
-        input_basename = os.path.basename(args.input_file)
-        file_no_ext = os.path.splitext(input_basename)[0]
-        
-        # Path for the intermediate ANF file
-        anf_filename = f"Challenges/seed_{seed}/ANF/{file_no_ext}.anf"
-        # Path for the final WXNF file
-        wcnf_filename = f"Challenges/seed_{seed}/WXNF/{file_no_ext}.wcnf"
-        
-        # Create necessary directories
-        os.makedirs(os.path.dirname(anf_filename), exist_ok=True)
-        os.makedirs(os.path.dirname(wcnf_filename), exist_ok=True)
-        
-        # Process matrix to ANF
-        log(f"Writing ANF to: {anf_filename}")
-        process_matrix_and_write_to_file(n, H_transpose, anf_filename)
-        
-        #  Build WXNF from the ANF file
-        log(f"Building WXNF at: {wcnf_filename}")
-        build_WXNF(n, anf_filename, wcnf_filename)
-        
-        log("WXNF generation complete.")
+        generate_wxnf(args.input_file, n, seed, H_transpose, manifest=manifest, digest=digest, compression=args.compress)
 
     log("Generation process completed successfully.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
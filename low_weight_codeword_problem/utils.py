@@ -1,42 +1,78 @@
 import os
 import re
-import subprocess
+import sys
+
+# Make the shared 'core' package importable when scripts are run from this directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.instance import read_text_instance
+from core.checker import verify_systematic
+from core.compress import open_text, with_compression
 
 def parse_input_file(file_name):
     """Parse the input file"""
-    with open(file_name, 'r') as f:
-        lines = f.readlines()
+    # Memory-mapped parse, the matrix block is packed without per-line Python objects
+    instance = read_text_instance(file_name)
+    if instance.kind != "LW":
+        raise ValueError(f"{file_name} is not a low weight codeword instance.")
 
-    n = int(lines[1].strip())  # Get n
-    print(f"n = {n}\n")
+    print(f"n = {instance.n}\n")
+    print(f"seed = {instance.seed}\n")
 
-    seed = int(lines[3].strip())  # Retrieve the seed
-    print(f"seed = {seed}\n")
+    return instance.n, instance.seed, instance.H_transpose
 
-    H_transpose = [line.strip() for line in lines[5:5 + n//2]]  # H^T matrix
-    H_transpose = [''.join(row) for row in zip(*H_transpose)]
-    print("H^T :")
-    for row in H_transpose:
-        print(row)
-    
-    return n, seed, H_transpose
+def build_var_sets(H_transpose, n):
+    """
+    Construct the sets V (variables of each equation) and K (allowed even sums).
 
-def write_wcnf_to_file(input_file, encoding, cnf, seed, variant):
-    """Écrit les clauses CNF dans un fichier au format spécifié."""
+    Args:
+        H_transpose (GF2Matrix): Transposed parity-check matrix returned by parse_input_file.
+        n (int): Total number of variables.
+
+    Returns:
+        V (list of list of int): List of variable index sets for each equation.
+        K (list of list of int): Allowed sum values for each equation.
+    """
+
+    # Construction of the V_i sets line by line
+    V = []
+    for i, support in enumerate(H_transpose.row_supports()):
+        V_i = [i + 1]  # Adding identity
+        V_i.extend((support + H_transpose.nrows + 1).tolist())
+        V.append(V_i)
+
+    # For each equation E_i, define the set K_{E_i}
+    K = []
+    for i, V_i in enumerate(V):
+        max_val = len(V_i)
+        K_i = [j for j in range(max_val + 1) if j % 2 == 0]
+        K.append(K_i)
+
+    return V, K
+
+def wcnf_output_path(input_file, encoding, seed, variant, compression=None):
+    """Path of the WCNF file of an instance (with the extension of compression, see core.compress), the folders are created if needed."""
 
     # Extract the filename without the extension
     file_name = os.path.splitext(os.path.basename(input_file))[0]
 
     # Build the exit path
-    output_file = f"./Challenges/seed_{seed}/WCNF{variant}/encoding_{encoding}/{file_name}.wcnf"
+    output_file = with_compression(f"./Challenges/seed_{seed}/WCNF{variant}/encoding_{encoding}/{file_name}.wcnf", compression)
     
     # Create the folders if needed
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    return output_file
+
+def write_wcnf_to_file(input_file, encoding, cnf, seed, variant, compression=None):
+    """Écrit les clauses CNF dans un fichier au format spécifié."""
+
+    output_file = wcnf_output_path(input_file, encoding, seed, variant, compression)
     
     # Save the CNF to the file
     cnf.to_file(output_file)
     
     print(f"The CNF clauses have been registered in {output_file}")
+    return output_file
 
 
 def extract_n(filename):
@@ -44,22 +80,20 @@ def extract_n(filename):
     return int(match.group(1)) if match else float('inf') 
 
 
-def verify_sol(input_file, solution) :
-    if solution:
-        try:
-            result = subprocess.run(
-                ['python3', 'check_LWCP_solution.py', input_file, solution],
-                capture_output=True, text=True, check=True
-            )
-            output = result.stdout.strip()
-            if "The candidate solution is correct." in output:
-                return True
-            else:
-                return False
-        except subprocess.CalledProcessError as e:
-            print("Error during external verification:", e.stderr)
-    else:
+def verify_sol(H_transpose, solution):
+    """
+    Verifies in process that a candidate solution is a codeword of the already-parsed instance.
+
+    Args:
+        H_transpose (GF2Matrix): Transposed parity-check matrix returned by parse_input_file.
+        solution (str): A binary string representing the candidate solution.
+
+    Returns:
+        Verification: Verdict ('valid'), weight, computed syndrome and failure reason of the candidate.
+    """
+    if not solution:
         print("No solution found.")
+    return verify_systematic(H_transpose, solution)
 
 
 def process_matrix_and_write_to_file(n, H_transpose, anf_filename):
@@ -69,12 +103,11 @@ def process_matrix_and_write_to_file(n, H_transpose, anf_filename):
 
     Args:
         n (int): Total number of variables.
-        H_transpose (list of str): Transposed parity-check matrix.
-        s_transpose (str): Syndrome vector.
+        H_transpose (GF2Matrix): Transposed parity-check matrix.
         anf_filename (str): Path to the output file in ANF format.
     """
 
-    m = n//2  # Number of equations
+    m = H_transpose.nrows  # Number of equations
     lines_to_write = []
 
     # Add ANF header: format is "p anf <number of variables> <number of equations>"
@@ -82,12 +115,10 @@ def process_matrix_and_write_to_file(n, H_transpose, anf_filename):
     lines_to_write.append(header)
 
     # Construct each equation line in ANF format
-    for i in range(m):
+    for i, support in enumerate(H_transpose.row_supports()):
         line = [str(i + 1)] # Start with the variable index of the identity part
         # For each 1 in H_transpose[i][j], add the corresponding variable index
-        for j in range(m):
-            if H_transpose[i][j] == '1':
-                line.append(str(j + m + 1))
+        line.extend(map(str, (support + m + 1).tolist()))
         
         # Append 'T' to represent the constant term
         line.append('T')
@@ -98,7 +129,7 @@ def process_matrix_and_write_to_file(n, H_transpose, anf_filename):
         lines_to_write.append(f"x {' '.join(line)}")  
 
     # Write all lines to the output ANF file
-    with open(anf_filename, 'w') as file:
+    with open_text(anf_filename, 'w') as file:
         for line in lines_to_write:
             file.write(line + '\n')
 
@@ -1,32 +1,37 @@
 from pysat.card import CardEnc
-from pysat.pb import PBEnc
-from pysat.formula import CNF
 from utils import *
+from core.arena import ClauseArena, add_clauses
+from core.templates import encode_pb_rows
+from core.cache import hamming_weight_atmost
 
-def build_CNF1(n, w, H_transpose, s_transpose, cc_encoding, pb_encoding):
+def build_CNF1(n, w, H_transpose, s_transpose, cc_encoding, pb_encoding, cnf=None, workers=1, var_sets=None, atmost=True):
     """
     Build the CNF1 formula for the syndrome decoding problem.
 
     Args:
         n (int): Total number of variables.
         w (int): Maximum Hamming weight.
-        H_transpose (list of str): The transposed parity-check matrix.
+        H_transpose (GF2Matrix): The transposed parity-check matrix.
         s_transpose (str): The syndrome vector.
         cc_encoding (str): Cardinality constraint encoding to use.
         pb_encoding (str):  Pseudo-Boolean constraint encoding to use.
+        cnf (ClauseArena, CNF or DimacsWriter, optional): Destination of the clauses. With a
+            DimacsWriter the clauses of each row are written to disk as soon as they are encoded.
+        workers (int or None): Number of processes encoding the rows (1: sequential, None: all cores).
+        var_sets (tuple, optional): (V, K) from build_var_sets, to share them between models of the same instance.
+        atmost (bool): Whether to encode the bound on the Hamming weight of e (False: the parity
+            equations only, with K_{E_i} still bounded by w, e.g. to bound the weight with assumptions).
 
     Returns:
-        cnf (CNF): The CNF formula representing the problem.
+        cnf (ClauseArena): The CNF formula representing the problem (the destination if one was given).
     """
     
     m = len(s_transpose)  # Number of equations
-    cnf = CNF()
+    if cnf is None:
+        cnf = ClauseArena()
 
-    # Variables e_j numbered from 1 to n
-    e_vars = list(range(1, n+1))
-    
-    # Build sets V and K
-    V , K = build_var_sets(H_transpose, s_transpose, n, w)
+    # Build sets V and K (unless they are shared by the caller)
+    V , K = var_sets if var_sets is not None else build_var_sets(H_transpose, s_transpose, n, w)
     
     # Introduce auxiliary variables x_{i,v} 
     top_id = n  # Highest variable index so far
@@ -46,6 +51,8 @@ def build_CNF1(n, w, H_transpose, s_transpose, cc_encoding, pb_encoding):
         
     
     # Encode the pseudo-Boolean equality constraints for each equation E_i
+    # Rows of the same shape share one pblib encoding, relabeled to their variables
+    rows = []  # (lits, weights, rhs) of every equation, encoded after the loop
     for i, V_i in enumerate(V):
         e_vars_i = V_i  # Variables involved in equation E_i
         e_weights = [1] * len(e_vars_i) # All e_j have coefficient 1
@@ -65,43 +72,48 @@ def build_CNF1(n, w, H_transpose, s_transpose, cc_encoding, pb_encoding):
         lits = e_vars_i + x_lits
         weights = e_weights + x_weights
         
-        # Encode the PB equality constraint
-        res_eq = PBEnc.equals(lits=lits, weights=weights, bound=rhs, top_id=top_id, encoding=pb_encoding)
-        cnf.extend(res_eq.clauses)
-        top_id = res_eq.nv 
+        rows.append((lits, weights, rhs))
+
+    # Encode the PB equality constraints, in parallel blocks of rows with several workers
+    # (pblib is only called for new row shapes, the formula does not depend on workers)
+    top_id = encode_pb_rows(cnf, rows, top_id, pb_encoding, workers)
     
-    # Encode the constraint on the total Hamming weight of e
-    res_atmost = CardEnc.atmost(lits=e_vars, bound=w, top_id=top_id, encoding=cc_encoding)
-    cnf.extend(res_atmost.clauses)
+    # Encode the constraint on the total Hamming weight of e (cached on disk, it only depends on n, w and the encoding)
+    if atmost:
+        add_clauses(cnf, hamming_weight_atmost(n, w, top_id, cc_encoding)[0])
     
     return cnf
 
 
 
-def build_CNF2(n, w, H_transpose, s_transpose, cc_encoding, pb_encoding):
+def build_CNF2(n, w, H_transpose, s_transpose, cc_encoding, pb_encoding, cnf=None, workers=1, var_sets=None, atmost=True):
     """
     Build the CNF2 formula for the syndrome decoding problem.
 
     Args:
         n (int): Total number of variables.
         w (int): Maximum Hamming weight.
-        H_transpose (list of str): The transposed parity-check matrix.
+        H_transpose (GF2Matrix): The transposed parity-check matrix.
         s_transpose (str): The syndrome vector.
         cc_encoding (str): Cardinality constraint encoding to use.
         pb_encoding (str):  Pseudo-Boolean constraint encoding to use.
+        cnf (ClauseArena, CNF or DimacsWriter, optional): Destination of the clauses. With a
+            DimacsWriter the clauses of each row are written to disk as soon as they are encoded.
+        workers (int or None): Number of processes encoding the rows (1: sequential, None: all cores).
+        var_sets (tuple, optional): (V, K) from build_var_sets, to share them between models of the same instance.
+        atmost (bool): Whether to encode the bound on the Hamming weight of e (False: the parity
+            equations only, with K_{E_i} still bounded by w, e.g. to bound the weight with assumptions).
 
     Returns:
-        cnf (CNF): The CNF formula representing the problem.
+        cnf (ClauseArena): The CNF formula representing the problem (the destination if one was given).
     """
 
     m = len(s_transpose)  # Number of equations
-    cnf = CNF()
+    if cnf is None:
+        cnf = ClauseArena()
     
-    # Variables e_j numbered from 1 to n
-    e_vars = list(range(1, n+1))
-    
-    # Build sets V and K
-    V , K = build_var_sets(H_transpose, s_transpose, n, w)
+    # Build sets V and K (unless they are shared by the caller)
+    V , K = var_sets if var_sets is not None else build_var_sets(H_transpose, s_transpose, n, w)
     
     # Introduce auxiliary variables x_{i,v} 
     top_id = n  # Highest variable index so far
@@ -112,6 +124,8 @@ def build_CNF2(n, w, H_transpose, s_transpose, cc_encoding, pb_encoding):
             x_vars_dict[(i, v)] = top_id  
 
     
+    # Rows of the same shape share one pblib encoding, relabeled to their variables
+    rows = []  # (lits, weights, rhs) of every equation, encoded after the loop
     for i, V_i in enumerate(V):
         e_vars_i = V_i  # Variables involved in equation E_i
         e_weights = [1] * len(e_vars_i) # All e_j have coefficient 1
@@ -132,10 +146,11 @@ def build_CNF2(n, w, H_transpose, s_transpose, cc_encoding, pb_encoding):
         lits = e_vars_i + x_lits
         weights = e_weights + x_weights
         
-        # Encode the PB equality constraint
-        res_eq = PBEnc.equals(lits=lits, weights=weights, bound=rhs, top_id=top_id, encoding=pb_encoding)
-        cnf.extend(res_eq.clauses)
-        top_id = res_eq.nv
+        rows.append((lits, weights, rhs))
+
+    # Encode the PB equality constraints, in parallel blocks of rows with several workers
+    # (pblib is only called for new row shapes, the formula does not depend on workers)
+    top_id = encode_pb_rows(cnf, rows, top_id, pb_encoding, workers)
 
     # Unary constraint: x_{i,v} = 1 if sum(e_j for j in V_{E_i}) == v
     for i in range(m):
@@ -144,8 +159,8 @@ def build_CNF2(n, w, H_transpose, s_transpose, cc_encoding, pb_encoding):
                 if (i, v-2) in x_vars_dict:
                     cnf.append([-x_vars_dict[(i, v)], x_vars_dict[(i, v-2)]])
     
-    # Encode the constraint on the total Hamming weight of e
-    res_atmost = CardEnc.atmost(lits=e_vars, bound=w, top_id=top_id, encoding=cc_encoding)
-    cnf.extend(res_atmost.clauses)
+    # Encode the constraint on the total Hamming weight of e (cached on disk, it only depends on n, w and the encoding)
+    if atmost:
+        add_clauses(cnf, hamming_weight_atmost(n, w, top_id, cc_encoding)[0])
     
     return cnf
\ No newline at end of file
@@ -1,181 +1,137 @@
-import time
 import csv
+import time
 import argparse
+import numpy as np
 from ortools.sat.python import cp_model
 from utils import *
+from core.cpsat import (BUILD_FIELDS, DEFAULT_TIME_LIMIT, add_parameter_arguments, add_rows_CP1, add_rows_CP2,
+                        add_rows_XOR, build_info, format_parameters, parameters_from_args, parity_rows, solve_model)
+from core.results import RESULT_FIELDS
 
-def build_and_solve_CP1(n, w, H_transpose, s_transpose, timeout=10800):
+# Columns of the result CSV: the ones checked by check_SDP_solution.py, the model size, then the CP-SAT parameters
+CPSAT_FIELDS = RESULT_FIELDS + BUILD_FIELDS + ["Parameters"]
+
+def build_CP(n, w, H_transpose, s_transpose, add_rows, named=True):
     """
-    Model and solve the syndrome decoding problem using CP-SAT (CNF1-style encoding).
+    Build the CP-SAT model of the syndrome decoding problem.
 
     Args:
         n (int): Total number of variables.
         w (int): Maximum Hamming weight.
-        H_transpose (list of str): The transposed parity-check matrix.
+        H_transpose (GF2Matrix): The transposed parity-check matrix.
         s_transpose (str): The syndrome vector.
-    
+        add_rows (function): Encoding of the equations (core.cpsat.add_rows_CP1, add_rows_CP2 or add_rows_XOR).
+        named (bool): Whether to name the variables.
+
     Returns:
-        status_str (str): 'sat', 'unsat', or 'timeout'.
-        res_time (str): Resolution time in seconds.
-        solution (str or None): Binary solution string for e_j variables if satisfiable.
+        model (cp_model.CpModel): The model.
+        e_vars (list): The variables e_1..e_n.
     """
-
     model = cp_model.CpModel()
-    
+
     # Variables e_j numbered from 1 to n
-    e_vars = [model.NewBoolVar(f"e_{j}") for j in range(1, n+1)]
-    
-    # Build sets V and K
-    V , K = build_var_sets(H_transpose, s_transpose, n, w)
-    
-    # For each parity-check equation E_i:
-    for i, V_i in enumerate(V):
-        
-        # Define auxiliary variables x_{i,v} and xbar_{i,v}
-        x_vars = {}   
-        xbar_vars = {}
-        for v in K[i]:
-            x = model.NewBoolVar(f"x_{i}_{v}")
-            xbar = model.NewBoolVar(f"xbar_{i}_{v}")
-            
-            # Enforce: x + xbar = 1 
-            model.Add(x + xbar == 1)
-            x_vars[v] = x
-            xbar_vars[v] = xbar
-
-        # Exactly one x_{i,v} is set to 1
-        model.Add(sum(x_vars.values()) == 1)
-        
-
-        # Build sum constraint
-        rhs = sum(K[i]) # Right-hand side is the sum of all possible values v in K_{E_i}
-        terms = []
-        # Add e_j variables (weight 1)
-        for idx in V_i:
-            terms.append(e_vars[idx - 1])
-
-        # Add auxiliary terms: v * xbar_{i,v}
-        for v, xbar in xbar_vars.items():
-            if v != 0 :
-                terms.append(xbar * v)
-        
-        model.Add(sum(terms) == rhs)
+    e_vars = [model.new_bool_var(f"e_{j}" if named else "") for j in range(1, n+1)]
+
+    # Sets V and K: K_i holds the values up to min(|V_i|, w) with the parity of s_i
+    columns, sizes = parity_rows(H_transpose, n)
+    max_vals = np.minimum(sizes, w).tolist()
+    K = [range(int(s_i), max_val + 1, 2) for s_i, max_val in zip(s_transpose, max_vals)]
+    add_rows(model, e_vars, columns, K, named)
 
     # Add constraint on the total Hamming weight of e
-    model.Add(sum(e_vars) <= w)
+    model.add(cp_model.LinearExpr.sum(e_vars) <= w)
+    return model, e_vars
 
-    # Solve the model using CP-SAT
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = timeout # default : 3-hour timeout
 
+def build_and_solve(n, w, H_transpose, s_transpose, add_rows, timeout, parameters, named):
+    """Build the model, then solve it: the outcome of solve_model and the BUILD_FIELDS of the model."""
     start = time.time()
-    status = solver.Solve(model)
-    res_time = time.time() - start
-    res_time = f"{res_time:.5f}"
-
-    # Extract solution if feasible/optimal
-    solution = None
-    if status in (cp_model.FEASIBLE, cp_model.OPTIMAL):
-        solution = [solver.Value(e_j) for e_j in e_vars]
-        solution = ''.join(map(str, solution))
-        status_str = 'sat'
-    else:
-        status_str = 'unsat' if status == cp_model.INFEASIBLE else 'timeout'
+    model, e_vars = build_CP(n, w, H_transpose, s_transpose, add_rows, named)
+    info = build_info(model, time.time() - start)
 
-    return status_str, res_time, solution
+    # Solve the model using CP-SAT
+    return solve_model(model, e_vars, parameters, timeout) + (info,)
 
 
-def build_and_solve_CP2(n, w, H_transpose, s_transpose, timeout=10800):
+def build_and_solve_CP1(n, w, H_transpose, s_transpose, timeout=DEFAULT_TIME_LIMIT, parameters=None, named=True):
+    """
+    Model and solve the syndrome decoding problem using CP-SAT (CNF1-style encoding).
+
+    Args:
+        n (int): Total number of variables.
+        w (int): Maximum Hamming weight.
+        H_transpose (GF2Matrix): The transposed parity-check matrix.
+        s_transpose (str): The syndrome vector.
+        timeout (float): Time limit in seconds.
+        parameters (SatParameters or None): Search parameters (see core.cpsat), they override timeout.
+        named (bool): Whether to name the variables.
+
+    Returns:
+        status_str (str): 'sat', 'unsat', or 'timeout'.
+        res_time (str): Resolution time in seconds.
+        solution (str or None): Binary solution string for e_j variables if satisfiable.
+        info (list): Build time and size of the model (see core.cpsat.BUILD_FIELDS).
+    """
+    return build_and_solve(n, w, H_transpose, s_transpose, add_rows_CP1, timeout, parameters, named)
+
+
+def build_and_solve_CP2(n, w, H_transpose, s_transpose, timeout=DEFAULT_TIME_LIMIT, parameters=None, named=True):
     """
     Model and solve the syndrome decoding problem using CP-SAT (CNF2-style encoding).
 
     Args:
         n (int): Total number of variables.
         w (int): Maximum Hamming weight.
-        H_transpose (list of str): The transposed parity-check matrix.
+        H_transpose (GF2Matrix): The transposed parity-check matrix.
         s_transpose (str): The syndrome vector.
-    
+        timeout (float): Time limit in seconds.
+        parameters (SatParameters or None): Search parameters (see core.cpsat), they override timeout.
+        named (bool): Whether to name the variables.
+
     Returns:
         status_str (str): 'sat', 'unsat', or 'timeout'.
         res_time (str): Resolution time in seconds.
         solution (str or None): Binary solution string for e_j variables if satisfiable.
+        info (list): Build time and size of the model (see core.cpsat.BUILD_FIELDS).
     """
+    return build_and_solve(n, w, H_transpose, s_transpose, add_rows_CP2, timeout, parameters, named)
 
-    model = cp_model.CpModel()
-    
-    # Variables e_j numbered from 1 to n
-    e_vars = [model.NewBoolVar(f"e_{j}") for j in range(1, n+1)]
-    
-    # Build sets V and K
-    V , K = build_var_sets(H_transpose, s_transpose, n, w)
-    
-    # For each parity-check equation E_i:
-    for i, V_i in enumerate(V):
-        
-        # Define auxiliary variables x_{i,v} and xbar_{i,v}
-        x_vars = {}    
-        xbar_vars = {} 
-        for v in K[i]:
-            x = model.NewBoolVar(f"x_{i}_{v}")
-            xbar = model.NewBoolVar(f"xbar_{i}_{v}")
-            
-            # Enforce: x + xbar = 1 
-            model.Add(x + xbar == 1)
-            x_vars[v] = x
-            xbar_vars[v] = xbar
-        
-        # Build sum constraint
-        rhs = max(K[i])  # Right-hand side is the maximum value in K_{E_i}
-        terms = []
-        # Add e_j variables (weight 1)
-        for idx in V_i:
-            terms.append(e_vars[idx-1])
-
-        # Add auxiliary terms: 2 * xbar_{i,v}
-        for v, xbar in xbar_vars.items():
-            if v not in {0,1} :
-                terms.append(xbar * 2)
-        
-        # Enforce the constraint: sum(e_j) + sum(2 * xbar_{i,v}) == max(K[i])
-        model.Add(sum(terms) == rhs)
-        
-        # Unary constraint: x_{i,v} = 1 if sum(e_j for j in V_{E_i}) <= v
-        for v in K[i]:
-            if v not in {0,1,2,3} and (v-2) in x_vars:
-                model.AddBoolOr([xbar_vars[v], x_vars[v-2]])
 
-    # Add constraint on the total Hamming weight of e
-    model.Add(sum(e_vars) <= w)
-    
-    # Solve the model using CP-SAT
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = timeout # default : 3-hour timeout
+def build_and_solve_XOR(n, w, H_transpose, s_transpose, timeout=DEFAULT_TIME_LIMIT, parameters=None, named=True):
+    """
+    Model and solve the syndrome decoding problem using CP-SAT, each equation being a native XOR constraint.
 
-    start = time.time()
-    status = solver.Solve(model)
-    res_time = time.time() - start
-    res_time = f"{res_time:.5f}"
-
-    # Extract solution if feasible/optimal
-    solution = None
-    if status in (cp_model.FEASIBLE, cp_model.OPTIMAL):
-        solution = [solver.Value(e_j) for e_j in e_vars]
-        solution = ''.join(map(str, solution))
-        status_str = 'sat'
-    else:
-        status_str = 'unsat' if status == cp_model.INFEASIBLE else 'timeout'
+    Args:
+        n (int): Total number of variables.
+        w (int): Maximum Hamming weight.
+        H_transpose (GF2Matrix): The transposed parity-check matrix.
+        s_transpose (str): The syndrome vector.
+        timeout (float): Time limit in seconds.
+        parameters (SatParameters or None): Search parameters (see core.cpsat), they override timeout.
+        named (bool): Whether to name the variables.
+
+    Returns:
+        status_str (str): 'sat', 'unsat', or 'timeout'.
+        res_time (str): Resolution time in seconds.
+        solution (str or None): Binary solution string for e_j variables if satisfiable.
+        info (list): Build time and size of the model (see core.cpsat.BUILD_FIELDS).
+    """
+    return build_and_solve(n, w, H_transpose, s_transpose, add_rows_XOR, timeout, parameters, named)
 
-    return status_str, res_time, solution
 
+# Solving function of each --method
+SOLVE_FUNCTIONS = {'CNF1': build_and_solve_CP1, 'CNF2': build_and_solve_CP2, 'XOR': build_and_solve_XOR}
 
 
-def process_file(file_path, solve_function):
+def process_file(file_path, solve_function, parameters=None, named=True):
     """
     Process a single input file and solve the syndrome decoding problem.
 
     Args:
         file_path (str): Path to the input file containing problem parameters.
-        solve_function (function): Function to solve the problem (build_and_solve_CP1 or build_and_solve_CP2).
+        solve_function (function): Function to solve the problem (build_and_solve_CP1, build_and_solve_CP2 or build_and_solve_XOR).
+        parameters (SatParameters or None): CP-SAT search parameters.
+        named (bool): Whether to name the model variables.
     
     Returns:
         tuple: A tuple containing:
@@ -183,48 +139,57 @@ def process_file(file_path, solve_function):
             - status (str): 'sat', 'unsat', or 'timeout'.
             - res_time (str): Resolution time in seconds.
             - sol (str or None): Binary solution string for e_j variables if satisfiable, or an error message.
+            - info (list): Build time and size of the model (see core.cpsat.BUILD_FIELDS).
     """
 
     # Parse the input file to extract problem parameters
     n, _, w, H_transpose, s_transpose = parse_input_file(file_path)
     
     # Solve the problem using the specified solving function 
-    status, res_time, sol = solve_function(n, w, H_transpose, s_transpose)
+    status, res_time, sol, info = solve_function(n, w, H_transpose, s_transpose, parameters=parameters, named=named)
     file = os.path.basename(file_path)
 
     # If the solution is satisfiable, verify its validity
     if status == 'sat' and sol is not None:
-        is_valid = verify_sol(file_path, sol)
-        if is_valid: 
-            return file, status, res_time, sol
+        verification = verify_sol(H_transpose, s_transpose, w, sol)
+        if verification.valid:
+            return file, status, res_time, sol, info
         else:
-            return file, status, res_time, "Invqlid solution"
+            return file, status, res_time, "Invqlid solution", info
     else:
-        return file, status, res_time, "No solution"
+        return file, status, res_time, "No solution", info
 
 
 
 def main():
     # Set up argument parser for command-line options
     parser = argparse.ArgumentParser(description="CPSAT solver for syndrome decoding.")
-    parser.add_argument('-m', '--method', choices=['CNF1', 'CNF2'], required=True, help="Resolution method to use (CNF1 or CNF2)")
+    parser.add_argument('-m', '--method', choices=list(SOLVE_FUNCTIONS), required=True, help="Resolution method to use (CNF1, CNF2 or XOR)")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument('-f', '--file', help='Path to an input file')
     group.add_argument('-d', '--dir', help='Path to a directory to process')
+    parser.add_argument('--anonymous', action='store_true', help="Leave the model variables unnamed (smaller model, faster to build)")
+    add_parameter_arguments(parser)
     args = parser.parse_args()
 
+    try:
+        parameters = parameters_from_args(args)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    settings = format_parameters(parameters)
+
     # Select the solving function based on the chosen method
-    solve_function = build_and_solve_CP1 if args.method == 'CNF1' else build_and_solve_CP2
+    solve_function = SOLVE_FUNCTIONS[args.method]
 
     if args.file:
         # Process a single file
-        file, status, res_time, sol = process_file(args.file, solve_function)
+        file, status, res_time, sol, info = process_file(args.file, solve_function, parameters, not args.anonymous)
         directory = os.path.dirname(args.file)
         csv_filepath = os.path.join(directory, f"CPSAT_{args.method}_{os.path.splitext(file)[0]}.csv")
         with open(csv_filepath, mode='w', newline='') as csvfile:
             csv_writer = csv.writer(csvfile)
-            csv_writer.writerow(["File", "Result", "Time (s)", "Solution"])
-            csv_writer.writerow([file, status, res_time, sol])
+            csv_writer.writerow(CPSAT_FIELDS)
+            csv_writer.writerow([file, status, res_time, sol] + info + [settings])
             csvfile.flush()
     else:
         # Process all files in a directory
@@ -232,7 +197,7 @@ def main():
         os.makedirs(args.dir, exist_ok=True)  
         with open(csv_filepath, mode='w', newline='') as csvfile:
             csv_writer = csv.writer(csvfile)
-            csv_writer.writerow(["File", "Result", "Time (s)", "Solution"])
+            csv_writer.writerow(CPSAT_FIELDS)
             csvfile.flush()
 
             # Filter and sort files in the directory
@@ -246,8 +211,8 @@ def main():
             for entry in entries:
                 path = os.path.join(args.dir, entry)
                 print(f"\n--- Processing {path} ---")
-                file, status, res_time, sol = process_file(path, solve_function)
-                csv_writer.writerow([file, status, res_time, sol])
+                file, status, res_time, sol, info = process_file(path, solve_function, parameters, not args.anonymous)
+                csv_writer.writerow([file, status, res_time, sol] + info + [settings])
                 csvfile.flush()
 
     print(f"Results written to {csv_filepath}")
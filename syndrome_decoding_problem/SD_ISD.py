@@ -0,0 +1,97 @@
+import csv
+import argparse
+from utils import *
+from core.isd import ALGORITHMS, DEFAULT_BATCH, DEFAULT_SWAPS, isd
+from core.results import RESULT_FIELDS
+
+# Columns of the result CSV: the ones of SD_CPSAT.main, then the weight found and the search settings
+ISD_FIELDS = RESULT_FIELDS + ["Weight", "Iterations", "Parameters"]
+
+def process_file(file_path, algorithm, p=2, timeout=None, workers=1, seed=0, batch=DEFAULT_BATCH, swaps=None):
+    """
+    Process a single input file and solve the syndrome decoding problem by information set decoding.
+
+    Args:
+        file_path (str): Path to the input file containing problem parameters.
+        algorithm (str): 'prange' or 'lee-brickell'.
+        p, timeout, workers, seed, batch, swaps: As for core.isd.isd.
+
+    Returns:
+        list: One row of the result CSV (see ISD_FIELDS), without the parameters.
+    """
+
+    # Parse the input file to extract problem parameters
+    n, _, w, H_transpose, s_transpose = parse_input_file(file_path)
+
+    result = isd(H_transpose, s_transpose, w, algorithm, p, timeout, workers=workers, seed=seed, batch=batch, swaps=swaps)
+    file = os.path.basename(file_path)
+    res_time = f"{result.seconds:.5f}"
+
+    # ISD cannot prove that there is no solution: the search ends with one or at the time limit
+    if result.status == 'sat':
+        sol = result.solution
+        if not verify_sol(H_transpose, s_transpose, w, sol).valid:
+            sol = "Invalid solution"
+    else:
+        sol = "No solution"
+    weight = "" if result.weight is None else result.weight
+    return [file, result.status, res_time, sol, weight, result.iterations]
+
+
+def main():
+    # Set up argument parser for command-line options
+    parser = argparse.ArgumentParser(description="Information set decoding (Prange, Lee-Brickell) for syndrome decoding.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('-f', '--file', help='Path to an input file')
+    group.add_argument('-d', '--dir', help='Path to a directory to process')
+    parser.add_argument('-a', '--algorithm', choices=ALGORITHMS, default='lee-brickell', help="ISD algorithm. Default: lee-brickell")
+    parser.add_argument('-p', type=int, default=2, help="Largest number of columns outside the information set (lee-brickell). Default: 2")
+    parser.add_argument('-t', '--timeout', type=float, help="Time limit per instance in seconds. Default: none")
+    parser.add_argument('-j', '--workers', type=int, default=1, help="Processes running the iterations (0: all cores). Default: 1")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the random information sets. Default: 0")
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH, help=f"Iterations of a worker between two reports. Default: {DEFAULT_BATCH}")
+    parser.add_argument('--swaps', type=int, help="Column swaps between two information sets (0: new elimination). Default: 1 (prange), 16 (lee-brickell)")
+    args = parser.parse_args()
+
+    options = (args.algorithm, args.p, args.timeout, args.workers or None, args.seed, args.batch, args.swaps)
+    swaps = DEFAULT_SWAPS[args.algorithm] if args.swaps is None else args.swaps
+    settings = f"algorithm={args.algorithm} p={args.p} swaps={swaps} workers={args.workers} seed={args.seed} batch={args.batch}"
+    prefix = f"ISD_{args.algorithm}" + (f"_p{args.p}" if args.algorithm == 'lee-brickell' else "")
+
+    if args.file:
+        # Process a single file
+        row = process_file(args.file, *options)
+        directory = os.path.dirname(args.file)
+        csv_filepath = os.path.join(directory, f"{prefix}_{os.path.splitext(row[0])[0]}.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(ISD_FIELDS)
+            csv_writer.writerow(row + [settings])
+    else:
+        # Process all files in a directory
+        csv_filepath = os.path.join(args.dir, f"{prefix}.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(ISD_FIELDS)
+            csvfile.flush()
+
+            # Filter and sort files in the directory
+            entries = [
+                entry for entry in os.listdir(args.dir)
+                if os.path.isfile(os.path.join(args.dir, entry)) and '.' not in os.path.basename(entry)
+            ]
+            entries.sort(key=extract_SD_n)
+
+            # Process each file in the directory
+            for entry in entries:
+                path = os.path.join(args.dir, entry)
+                print(f"\n--- Processing {path} ---")
+                csv_writer.writerow(process_file(path, *options) + [settings])
+                csvfile.flush()
+
+    print(f"Results written to {csv_filepath}")
+
+
+
+if __name__ == "__main__":
+    main()
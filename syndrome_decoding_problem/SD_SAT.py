@@ -0,0 +1,133 @@
+import time
+import csv
+import argparse
+from SD_CNF import build_CNF1, build_CNF2
+from utils import *
+from core.sat import STAT_FIELDS, solve_cnf, solver_names, model_to_bits
+from core.results import RESULT_FIELDS
+
+# Columns of the result CSV: the ones of SD_CPSAT.main, then the encoding time and solver statistics
+SAT_FIELDS = RESULT_FIELDS + ["Encoding time (s)"] + [field.capitalize() for field in STAT_FIELDS]
+
+def build_and_solve_SAT(n, w, H_transpose, s_transpose, method, cc, pb, solver_name, timeout=10800, workers=1):
+    """
+    Build a CNF model of the syndrome decoding problem and solve it in process with a pysat solver.
+
+    Args:
+        n (int): Total number of variables.
+        w (int): Maximum Hamming weight.
+        H_transpose (GF2Matrix): The transposed parity-check matrix.
+        s_transpose (str): The syndrome vector.
+        method (str): 'CNF1' or 'CNF2'.
+        cc (int): Cardinality encoding.
+        pb (int): Pseudo-Boolean encoding.
+        solver_name (str): pysat solver (e.g. 'cadical153', 'glucose4', 'maplechrono').
+        timeout (float): Time limit of the solver in seconds.
+        workers (int or None): Processes encoding the rows.
+
+    Returns:
+        status_str (str): 'sat', 'unsat', or 'timeout'.
+        res_time (str): Resolution time in seconds.
+        solution (str or None): Binary solution string for e_j variables if satisfiable.
+        encode_time (str): Time spent building the formula, in seconds.
+        stats (dict): Solver statistics.
+    """
+    build = build_CNF1 if method == 'CNF1' else build_CNF2
+
+    start = time.time()
+    cnf = build(n, w, H_transpose, s_transpose, cc, pb, workers=workers)
+    encode_time = f"{time.time() - start:.5f}"
+
+    # The formula goes straight from the clause arena to the solver
+    result = solve_cnf(cnf, solver_name, timeout)
+    res_time = f"{result.seconds:.5f}"
+
+    # Variables e_j are numbered from 1 to n in both models
+    solution = model_to_bits(result.model, n) if result.status == 'sat' else None
+
+    return result.status, res_time, solution, encode_time, result.stats
+
+
+def process_file(file_path, method, cc, pb, solver_name, timeout=10800, workers=1):
+    """
+    Process a single input file and solve the syndrome decoding problem.
+
+    Args:
+        file_path (str): Path to the input file containing problem parameters.
+        method, cc, pb, solver_name, timeout, workers: As for build_and_solve_SAT.
+
+    Returns:
+        list: One row of the result CSV (see SAT_FIELDS).
+    """
+
+    # Parse the input file to extract problem parameters
+    n, _, w, H_transpose, s_transpose = parse_input_file(file_path)
+
+    status, res_time, sol, encode_time, stats = build_and_solve_SAT(n, w, H_transpose, s_transpose, method, cc, pb,
+                                                                  solver_name, timeout, workers)
+    file = os.path.basename(file_path)
+
+    # If the solution is satisfiable, verify its validity
+    if status == 'sat' and sol is not None:
+        if not verify_sol(H_transpose, s_transpose, w, sol).valid:
+            sol = "Invalid solution"
+    else:
+        sol = "No solution"
+    return [file, status, res_time, sol, encode_time] + [stats.get(field, "") for field in STAT_FIELDS]
+
+
+
+def main():
+    # Set up argument parser for command-line options
+    parser = argparse.ArgumentParser(description="In-process pysat solver for the CNF models of syndrome decoding.")
+    parser.add_argument('-m', '--method', choices=['CNF1', 'CNF2'], required=True, help="CNF model to solve (CNF1 or CNF2)")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('-f', '--file', help='Path to an input file')
+    group.add_argument('-d', '--dir', help='Path to a directory to process')
+    parser.add_argument('--cc', type=int, default=3, help="Cardinality encoding. Default: 3")
+    parser.add_argument('--pb', type=int, required=True, help="Pseudo-Boolean encoding.")
+    parser.add_argument('-s', '--solver', choices=solver_names(), default='cadical153', help="pysat solver. Default: cadical153")
+    parser.add_argument('-t', '--timeout', type=float, default=10800, help="Time limit per instance in seconds. Default: 10800")
+    parser.add_argument('-j', '--workers', type=int, default=1, help="Processes encoding the rows in parallel (0: all cores). Default: 1")
+    args = parser.parse_args()
+
+    options = (args.method, args.cc, args.pb, args.solver, args.timeout, args.workers or None)
+    prefix = f"{args.solver}_{args.method}_PB_{args.pb}_encoding_{args.cc}"
+
+    if args.file:
+        # Process a single file
+        row = process_file(args.file, *options)
+        directory = os.path.dirname(args.file)
+        csv_filepath = os.path.join(directory, f"{prefix}_{os.path.splitext(row[0])[0]}.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(SAT_FIELDS)
+            csv_writer.writerow(row)
+    else:
+        # Process all files in a directory
+        csv_filepath = os.path.join(args.dir, f"{prefix}.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(SAT_FIELDS)
+            csvfile.flush()
+
+            # Filter and sort files in the directory
+            entries = [
+                entry for entry in os.listdir(args.dir)
+                if os.path.isfile(os.path.join(args.dir, entry)) and '.' not in os.path.basename(entry)
+            ]
+            entries.sort(key=extract_SD_n)
+
+            # Process each file in the directory
+            for entry in entries:
+                path = os.path.join(args.dir, entry)
+                print(f"\n--- Processing {path} ---")
+                csv_writer.writerow(process_file(path, *options))
+                csvfile.flush()
+
+    print(f"Results written to {csv_filepath}")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 from pysat.card import *
 from utils import *
+from core.arena import ClauseArena
+from core.cache import hamming_weight_atmost
+from core.compress import open_text
 
 def build_XNF1(n, w, anf_filename, xnf_filename, encoding):
     """"
@@ -14,28 +17,24 @@ def build_XNF1(n, w, anf_filename, xnf_filename, encoding):
     """
     
     # Read the ANF file and store all lines
-    with open(anf_filename, 'r') as anf_file:
+    with open_text(anf_filename) as anf_file:
         lines = anf_file.readlines()
 
-    # Variables e_j numbered from 1 to n
-    e_vars = list(range(1, n+1))
+    # Variables e_j are numbered from 1 to n
     top_id = n + 1 # n+1 for 'T' (true constant)
 
     # Skip ANF header and replace 'T' by top_id in all equations
     anf_content = [line.replace('T', str(top_id)) for line in lines[1:]]
 
-    # Encode the constraint on the total Hamming weight of e
-    cnf = CardEnc.atmost(lits=e_vars, top_id=top_id, bound=w, encoding=encoding)
-    nb_vars = cnf.nv  # Update top_id
-
-    # Convert the generated CNF clauses to text lines
-    cnf_clauses = [" ".join(map(str, clause)) + " 0" for clause in cnf.clauses]
+    # Encode the constraint on the total Hamming weight of e (cached on disk, it only depends on n, w and the encoding)
+    # The clauses are stored compactly and rendered when the file is written
+    cnf_clauses, nb_vars = hamming_weight_atmost(n, w, top_id, encoding)
 
     # Total number of clauses = ANF lines (without header) + AtMost clauses
     nb_lines = len(anf_content) + len(cnf_clauses)
 
     # Write the final XNF file
-    with open(xnf_filename, 'w') as xnf_file:
+    with open_text(xnf_filename, 'w') as xnf_file:
         # Write XNF header: p cnf <num_vars> <num_clauses>
         xnf_file.write(f"p cnf {nb_vars} {nb_lines + 1}\n")
 
@@ -43,7 +42,7 @@ def build_XNF1(n, w, anf_filename, xnf_filename, encoding):
         xnf_file.write(f"{top_id} 0\n")
         
         # Append all CNF clauses
-        xnf_file.write("\n".join(cnf_clauses) + "\n")
+        cnf_clauses.write_clauses(xnf_file)
 
         # Write ANF lines without header
         xnf_file.writelines(anf_content)
@@ -66,13 +65,12 @@ def build_XNF2(n, w, anf_filename, xnf_filename, encoding):
     """
 
     # Read the ANF file and store all lines
-    with open(anf_filename, 'r') as anf_file:
+    with open_text(anf_filename) as anf_file:
         lines = anf_file.readlines()
 
-    # Variables e_j numbered from 1 to n
-    e_vars = list(range(1, n+1))
+    # Variables e_j are numbered from 1 to n
     top_id = n + 1 # n+1 for 'T' (true constant)
-    cnf_lines = []  # Stocker les clauses CNF générées
+    cnf_lines = ClauseArena()  # Stocker les clauses CNF générées
 
     # Process each line of the ANF file, skipping the header
     for line in lines[1:]: 
@@ -86,15 +84,12 @@ def build_XNF2(n, w, anf_filename, xnf_filename, encoding):
         # If the number of variables exceeds w, encode a local AtMost constraint
         if len(variables) > w:
             cnf = CardEnc.atmost(lits=variables, top_id=top_id, bound=w, encoding=encoding)
-            cnf_lines.extend([" ".join(map(str, clause)) + " 0" for clause in cnf.clauses])
+            cnf_lines.extend(cnf.clauses)
             top_id = cnf.nv 
 
-    # Encode the constraint on the total Hamming weight of e
-    cnf = CardEnc.atmost(lits=e_vars, top_id=top_id, bound=w, encoding=encoding)
-    nb_vars = cnf.nv # Update top_id
-
-    # Convert the generated CNF clauses to text lines
-    cnf_lines.extend([" ".join(map(str, clause)) + " 0" for clause in cnf.clauses])
+    # Encode the constraint on the total Hamming weight of e (cached on disk)
+    atmost, nb_vars = hamming_weight_atmost(n, w, top_id, encoding)
+    cnf_lines.append_arena(atmost)
 
     # Skip ANF header and replace 'T' by top_id in all equations
     anf_content = [line.replace('T', str(top_id)) for line in lines[1:]]
@@ -103,7 +98,7 @@ def build_XNF2(n, w, anf_filename, xnf_filename, encoding):
     nb_lines = len(anf_content) + len(cnf_lines)
 
     # Write the final XNF file
-    with open(xnf_filename, 'w') as xnf_file:
+    with open_text(xnf_filename, 'w') as xnf_file:
         # Write XNF header: p cnf <num_vars> <num_clauses>
         xnf_file.write(f"p cnf {nb_vars} {nb_lines + 1}\n")
 
@@ -111,7 +106,7 @@ def build_XNF2(n, w, anf_filename, xnf_filename, encoding):
         xnf_file.write(f"{top_id} 0\n")
 
         # Append all CNF clauses
-        xnf_file.write("\n".join(cnf_lines) + "\n")
+        cnf_lines.write_clauses(xnf_file)
         
         # Write ANF lines without header
         xnf_file.writelines(anf_content)
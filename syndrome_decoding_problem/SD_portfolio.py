@@ -0,0 +1,139 @@
+import csv
+import argparse
+from ortools.sat import sat_parameters_pb2
+from SD_CPSAT import build_and_solve_CP1, build_and_solve_CP2
+from SD_SAT import build_and_solve_SAT
+from utils import *
+from core.batch import parse_list
+from core.portfolio import race
+from core.results import RESULT_FIELDS
+
+# Configurations raced by default, the first ones go first when there are fewer cores
+DEFAULT_CONFIGS = ["CP1", "CNF1:cadical153:1", "CP2", "CNF2:cadical153:1", "CNF1:glucose4:5", "CNF2:maplechrono:5"]
+
+# Columns of the result CSV: the ones of SD_CPSAT.main, then the winning configuration
+PORTFOLIO_FIELDS = RESULT_FIELDS + ["Configuration"]
+
+def solve_CP(method, n, w, H_transpose, s_transpose, timeout, workers=1):
+    """CP-SAT entrant with an explicit number of search workers: (status, solution)."""
+    solve_function = build_and_solve_CP1 if method == "CP1" else build_and_solve_CP2
+    parameters = sat_parameters_pb2.SatParameters(num_workers=workers)
+    status, _, solution, _ = solve_function(n, w, H_transpose, s_transpose, timeout, parameters=parameters, named=False)
+    return status, solution
+
+def solve_SAT(method, solver_name, pb, cc, n, w, H_transpose, s_transpose):
+    """pysat entrant: (status, solution), the race enforces the time limit."""
+    status, _, solution, _, _ = build_and_solve_SAT(n, w, H_transpose, s_transpose, method, cc, pb, solver_name, timeout=None)
+    return status, solution
+
+def parse_config(spec, n, w, H_transpose, s_transpose, timeout):
+    """
+    Turn a configuration into a race entrant.
+
+    Every entrant gets its own core: the pysat solvers are single-threaded, and a CP-SAT entrant
+    runs a single search worker unless its configuration asks for more (CP-SAT's default would
+    start one worker per core next to the other entrants).
+
+    Args:
+        spec (str): 'CP1[:<workers>]' or 'CP2[:<workers>]' (CP-SAT with 1 search worker by default,
+            0 for CP-SAT's default of all cores), or 'CNF1:<solver>:<pb>[:<cc>]' / 'CNF2:<solver>:<pb>[:<cc>]'
+            (pysat solver on the CNF model, cardinality encoding 3 by default).
+        n, w, H_transpose, s_transpose: The instance.
+        timeout (float): Time limit of the race.
+
+    Returns:
+        tuple: (task, args) for core.portfolio.race.
+    """
+    parts = spec.split(":")
+    try:
+        if parts[0] in ("CP1", "CP2") and len(parts) in (1, 2):
+            workers = int(parts[1]) if len(parts) == 2 else 1
+            if workers >= 0:
+                return solve_CP, (parts[0], n, w, H_transpose, s_transpose, timeout, workers)
+        if parts[0] in ("CNF1", "CNF2") and len(parts) in (3, 4):
+            cc = int(parts[3]) if len(parts) == 4 else 3
+            return solve_SAT, (parts[0], parts[1], int(parts[2]), cc, n, w, H_transpose, s_transpose)
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid configuration '{spec}', expected CP<1|2>[:<workers>] or CNF<1|2>:<solver>:<pb>[:<cc>].")
+
+def process_file(file_path, configs, timeout=10800):
+    """
+    Race the configurations on one instance and keep the first verified answer.
+
+    A 'sat' answer is accepted once its solution is verified, an 'unsat' answer is accepted
+    as is (every configuration models the same problem).
+
+    Returns:
+        list: One row of the result CSV (see PORTFOLIO_FIELDS).
+    """
+    n, _, w, H_transpose, s_transpose = parse_input_file(file_path)
+    file = os.path.basename(file_path)
+    entrants = {spec: parse_config(spec, n, w, H_transpose, s_transpose, timeout) for spec in configs}
+
+    def accept(name, outcome):
+        status, solution = outcome
+        if status == 'sat':
+            return solution is not None and verify_sol(H_transpose, s_transpose, w, solution).valid
+        return status == 'unsat'
+
+    result = race(entrants, accept, timeout)
+    res_time = f"{result.seconds:.5f}"
+    if result.winner is None:
+        return [file, 'timeout', res_time, "No solution", ""]
+    status, solution = result.outcome
+    return [file, status, res_time, solution if status == 'sat' else "No solution", result.winner]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio of CP-SAT and pysat configurations racing on each syndrome decoding instance.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('-f', '--file', help='Path to an input file')
+    group.add_argument('-d', '--dir', help='Path to a directory to process')
+    parser.add_argument('-c', '--configs', type=parse_list,
+                        help="Comma-separated configurations: CP<1|2>[:<workers>], CNF<1|2>:<solver>:<pb>[:<cc>]. "
+                             f"Default: the first of {','.join(DEFAULT_CONFIGS)}, one per core")
+    parser.add_argument('-t', '--timeout', type=float, default=10800, help="Time limit per instance in seconds. Default: 10800")
+    args = parser.parse_args()
+
+    configs = args.configs or DEFAULT_CONFIGS[:max(1, os.cpu_count() or 1)]
+    for spec in configs:
+        try:
+            parse_config(spec, None, None, None, None, None)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.file:
+        # Process a single file
+        row = process_file(args.file, configs, args.timeout)
+        directory = os.path.dirname(args.file)
+        csv_filepath = os.path.join(directory, f"PORTFOLIO_{os.path.splitext(row[0])[0]}.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(PORTFOLIO_FIELDS)
+            csv_writer.writerow(row)
+    else:
+        # Process all files in a directory
+        csv_filepath = os.path.join(args.dir, "PORTFOLIO.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(PORTFOLIO_FIELDS)
+            csvfile.flush()
+
+            entries = [
+                entry for entry in os.listdir(args.dir)
+                if os.path.isfile(os.path.join(args.dir, entry)) and '.' not in os.path.basename(entry)
+            ]
+            entries.sort(key=extract_SD_n)
+
+            for entry in entries:
+                path = os.path.join(args.dir, entry)
+                print(f"\n--- Processing {path} ---")
+                csv_writer.writerow(process_file(path, configs, args.timeout))
+                csvfile.flush()
+
+    print(f"Results written to {csv_filepath}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import time
+import csv
+import argparse
+from SD_CNF import build_CNF1, build_CNF2
+from utils import *
+from core.sat import STAT_FIELDS, SWEEPS, solver_names, supports_interrupt, sweep_weight, model_to_bits
+from core.results import RESULT_FIELDS
+
+# Columns of the result CSV: the ones of SD_CPSAT.main (for the smallest weight found), then the sweep
+SWEEP_FIELDS = (RESULT_FIELDS + ["Minimum w", "Proven", "Encoding time (s)", "Steps"]
+                + [field.capitalize() for field in STAT_FIELDS])
+
+def format_steps(steps):
+    """Steps of a sweep as 'w:status:seconds' separated by spaces."""
+    return " ".join(f"{step.w}:{step.status}:{step.seconds:.5f}" for step in steps)
+
+def sweep_SAT(n, w_max, H_transpose, s_transpose, method, cc, pb, solver_name, strategy="descending", timeout=None, workers=1):
+    """
+    Find the smallest weight of a solution of the syndrome decoding problem, up to w_max, in one pysat session.
+
+    The parity equations are encoded once (with K_{E_i} bounded by w_max), the weight bound of
+    each step is a totalizer output assumed false (see core.sat.sweep_weight).
+
+    Args:
+        n (int): Total number of variables.
+        w_max (int): Largest weight probed.
+        H_transpose (GF2Matrix): The transposed parity-check matrix.
+        s_transpose (str): The syndrome vector.
+        method (str): 'CNF1' or 'CNF2'.
+        cc (int): Cardinality encoding (CNF1's exactly-one constraints).
+        pb (int): Pseudo-Boolean encoding.
+        solver_name (str): pysat solver.
+        strategy (str): 'descending' or 'binary'.
+        timeout (float or None): Time limit of each step in seconds.
+        workers (int or None): Processes encoding the rows.
+
+    Returns:
+        result (SweepResult): Smallest satisfiable weight, model and steps.
+        encode_time (str): Time spent building the formula, in seconds.
+    """
+    build = build_CNF1 if method == 'CNF1' else build_CNF2
+
+    start = time.time()
+    cnf = build(n, w_max, H_transpose, s_transpose, cc, pb, workers=workers, atmost=False)
+    encode_time = f"{time.time() - start:.5f}"
+
+    result = sweep_weight(cnf, n, w_max, solver_name, strategy, timeout)
+    return result, encode_time
+
+
+def process_file(file_path, method, cc, pb, solver_name, strategy="descending", timeout=None, workers=1, w_max=None):
+    """
+    Process a single input file and sweep the weight of its solutions.
+
+    Args:
+        file_path (str): Path to the input file containing problem parameters.
+        method, cc, pb, solver_name, strategy, timeout, workers: As for sweep_SAT.
+        w_max (int or None): Largest weight probed (None: the weight of the instance).
+
+    Returns:
+        list: One row of the result CSV (see SWEEP_FIELDS).
+    """
+
+    # Parse the input file to extract problem parameters
+    n, _, w, H_transpose, s_transpose = parse_input_file(file_path)
+    if w_max is None:
+        w_max = w
+
+    result, encode_time = sweep_SAT(n, w_max, H_transpose, s_transpose, method, cc, pb, solver_name, strategy, timeout, workers)
+    file = os.path.basename(file_path)
+    res_time = f"{sum(step.seconds for step in result.steps):.5f}"
+
+    if result.w is not None:
+        # The solution of the smallest weight found, verified against that weight
+        status = 'sat'
+        sol = model_to_bits(result.model, n)
+        if not verify_sol(H_transpose, s_transpose, result.w, sol).valid:
+            sol = "Invalid solution"
+        min_w = result.w
+    else:
+        status = 'unsat' if result.proven else 'timeout'
+        sol = "No solution"
+        min_w = ""
+    return ([file, status, res_time, sol, min_w, result.proven, encode_time, format_steps(result.steps)]
+            + [result.stats.get(field, "") for field in STAT_FIELDS])
+
+
+
+def main():
+    # Set up argument parser for command-line options
+    parser = argparse.ArgumentParser(description="Incremental weight sweep of the CNF models of syndrome decoding in one pysat session.")
+    parser.add_argument('-m', '--method', choices=['CNF1', 'CNF2'], required=True, help="CNF model to solve (CNF1 or CNF2)")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('-f', '--file', help='Path to an input file')
+    group.add_argument('-d', '--dir', help='Path to a directory to process')
+    parser.add_argument('--cc', type=int, default=3, help="Cardinality encoding. Default: 3")
+    parser.add_argument('--pb', type=int, required=True, help="Pseudo-Boolean encoding.")
+    parser.add_argument('-s', '--solver', choices=solver_names(), default='cadical153', help="pysat solver. Default: cadical153")
+    parser.add_argument('--sweep', choices=SWEEPS, default='descending',
+                        help="Order of the weights probed: descending (below each solution found) or binary search. Default: descending")
+    parser.add_argument('--w_max', type=int, help="Largest weight probed. Default: the weight of the instance")
+    parser.add_argument('-t', '--timeout', type=float, help="Time limit per step in seconds (needs a solver that can be interrupted, not cadical153)")
+    parser.add_argument('-j', '--workers', type=int, default=1, help="Processes encoding the rows in parallel (0: all cores). Default: 1")
+    args = parser.parse_args()
+
+    if args.timeout is not None and not supports_interrupt(args.solver):
+        parser.error(f"the {args.solver} solver cannot be interrupted, use another solver with --timeout (e.g. -s glucose4)")
+
+    options = (args.method, args.cc, args.pb, args.solver, args.sweep, args.timeout, args.workers or None, args.w_max)
+    prefix = f"SWEEP_{args.solver}_{args.method}_PB_{args.pb}_encoding_{args.cc}"
+
+    if args.file:
+        # Process a single file
+        row = process_file(args.file, *options)
+        directory = os.path.dirname(args.file)
+        csv_filepath = os.path.join(directory, f"{prefix}_{os.path.splitext(row[0])[0]}.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(SWEEP_FIELDS)
+            csv_writer.writerow(row)
+    else:
+        # Process all files in a directory
+        csv_filepath = os.path.join(args.dir, f"{prefix}.csv")
+        with open(csv_filepath, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(SWEEP_FIELDS)
+            csvfile.flush()
+
+            # Filter and sort files in the directory
+            entries = [
+                entry for entry in os.listdir(args.dir)
+                if os.path.isfile(os.path.join(args.dir, entry)) and '.' not in os.path.basename(entry)
+            ]
+            entries.sort(key=extract_SD_n)
+
+            # Process each file in the directory
+            for entry in entries:
+                path = os.path.join(args.dir, entry)
+                print(f"\n--- Processing {path} ---")
+                csv_writer.writerow(process_file(path, *options))
+                csvfile.flush()
+
+    print(f"Results written to {csv_filepath}")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,37 @@
 import os
 import sys
 import csv
+import argparse
+
+# Make the shared 'core' package importable when the script is run from this directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.gf2 import GF2Matrix
+from core.instance import read_text_instance
+from core.checker import check_candidates, syndrome_to_string
+from core.compress import open_text, strip_compression
+from core.results import bulk_verify, print_summary, write_report
 
 csv.field_size_limit(sys.maxsize)
 
-def parse_input_file(file_name):
+def parse_input_file(file_name, verbose=True):
     """Parses the input file and extracts the necessary information."""
-    with open(file_name, 'r') as f:
-        lines = f.readlines()
-
-    n = int(lines[1].strip())  # Get n
-    print(f"n = {n}")
-
-    w = int(lines[5].strip())  # Retrieve the target weight w
-    print(f"w = {w}")
-
-    r = n // 2  # Number of lines of the syndrome (and size of identity)
-    P_cols = [line.strip() for line in lines[7:7 + r]]  # Columns of P (= rows of H^T)
-
-    # Construction of H^T with I above
-    H_transpose = []
-    for i in range(n):
-        if i < r:
-            # Column i of the identity
-            identity_part = ['0'] * r
-            identity_part[i] = '1'
-            column = ''.join(identity_part)
-        else:
-            # Column of P at index i - r
-            column = P_cols[i - r]
-        H_transpose.append(column)
-    
-    #In the display, one row corresponds to one column, which is more practical for calculations.
-    H_transpose = [''.join(row) for row in zip(*H_transpose)]
+    instance = read_text_instance(file_name)
+    n, w = instance.n, instance.w
+    if verbose:
+        print(f"n = {n}")
+        print(f"w = {w}")
 
-    print("\nH^T ")
-    for col in H_transpose:
-        print(col)
+    r = instance.H_transpose.nrows  # Number of lines of the syndrome (and size of identity)
 
-    s_transpose = lines[7 + r + 1].strip()  # Syndrome s^T
-    print("\ns^T :")
-    print(s_transpose, "\n")
+    # Construction of H = [I | P], one row per parity-check equation,
+    # which is more practical for calculations.
+    H_transpose = GF2Matrix.identity(r).hstack(instance.H_transpose)
+
+    s_transpose = instance.s_transpose  # Syndrome s^T
+    if verbose:
+        print("\ns^T :")
+        print(s_transpose, "\n")
 
     return n, w, H_transpose, s_transpose
 
@@ -52,23 +43,15 @@ def verify_solution(candidate, H_transpose, s, w, n):
     if len(candidate) != n:
         raise ValueError(f"The candidate vector must be of length {n}, but it is of length {len(candidate)}.")
 
-    # Weight check (number of bits set to 1)
-    weight = candidate.count('1')
+    # Weight and syndrome of the candidate, computed in one batched pass
+    result = check_candidates(H_transpose, [candidate], s)
+    weight = int(result.weights[0])
     print(f"--- Weight of the solution: {weight} ---")
     if weight > w:
         print(f"Failure: the candidate solution contains {weight} bits set to 1 (maximum allowed: {w}).")
         return False, None
 
-    syndrome = ""
-    # For each column, we calculate the dot product
-    for colonne in H_transpose:
-        # We check the length of the candidate solution and the column
-        if len(colonne) != len(candidate):
-            raise ValueError("The size of a column and the vector do not match.")
-
-        # Calculating the dot product modulo 2
-        somme = sum(int(bit_col) * int(bit_vect) for bit_col, bit_vect in zip(colonne, candidate))
-        syndrome += str(somme % 2)
+    syndrome = syndrome_to_string(result.syndromes[0])
 
     if syndrome == s:
         return True, syndrome
@@ -86,13 +69,13 @@ def extract_binary_solution(csv_path, target_file_name, n):
     if not os.path.exists(csv_path):
         return None
 
-    with open(csv_path, mode='r', encoding='utf-8') as f:
+    with open_text(csv_path, encoding='utf-8') as f:
         # Using DictReader - Ensure your CSV header uses 'File' and 'Solution'
         reader = csv.DictReader(f, delimiter=',')
         
         for row in reader:
             # Match the challenge filename
-            if row['File'] == os.path.basename(target_file_name):
+            if row['File'] == strip_compression(os.path.basename(target_file_name)):
                 print(f"Found matching entry for {target_file_name} in CSV.")
                 solution_str = row['Solution'].strip()
                 
@@ -120,9 +103,37 @@ def extract_binary_solution(csv_path, target_file_name, n):
     return None
 
 
+def load_instance(file_name):
+    """Loads an instance as (n, H, s, w) for the bulk verification."""
+    n, w, H, s = parse_input_file(file_name, verbose=False)
+    return n, H, s, w
+
+
+def bulk_main(argv):
+    """Verifies every row of one or several results CSVs in parallel and prints a summary table."""
+    parser = argparse.ArgumentParser(prog=f"{os.path.basename(sys.argv[0])} --bulk",
+                                     description="Bulk verification of results CSV files.")
+    parser.add_argument("instance_dir", help="Directory containing the instance files")
+    parser.add_argument("results", help="Results CSV file, or directory of CSV files")
+    parser.add_argument("-j", "--workers", type=int, help="Number of worker processes. Default: number of CPUs")
+    parser.add_argument("-o", "--output", help="Write the per-row report to this CSV file")
+    args = parser.parse_args(argv)
+
+    report = bulk_verify(args.instance_dir, args.results, load_instance, workers=args.workers)
+    print_summary(report)
+    if args.output:
+        write_report(report, args.output)
+        print(f"Report written to {args.output}")
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--bulk":
+        bulk_main(sys.argv[2:])
+        return
+
     if len(sys.argv) < 3:
         print("Usage: python check_SDP_solution.py <input_file> <csv_file_or_solution>")
+        print("       python check_SDP_solution.py --bulk <instance_dir> <csv_file_or_dir> [-j WORKERS] [-o REPORT]")
         sys.exit(1)
 
     input_file = sys.argv[1]  # SD File
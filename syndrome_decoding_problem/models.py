@@ -1,9 +1,16 @@
 import os
 import argparse
 import sys
+import pysat
 from SD_CNF import build_CNF1, build_CNF2
 from SD_XNF import build_XNF1, build_XNF2
-from utils import parse_input_file, write_cnf_to_file, process_matrix_and_write_to_file
+from utils import parse_input_file, build_var_sets, write_cnf_to_file, cnf_output_path, process_matrix_and_write_to_file
+from core.dimacs import DimacsWriter
+from core.batch import parse_list, expand_inputs, run_batch
+from core.manifest import Manifest, file_digest, build_key
+from core.compress import COMPRESSIONS, with_compression
+
+FORMATS = ["CNF1", "CNF2", "XNF1", "XNF2"]
 
 def log(msg, level="INFO"):
     """Standardized logging function."""
@@ -16,20 +23,208 @@ def parse_args():
     )
     # Required arguments
     parser.add_argument("input_file", help="Path to the input instance file")
-    parser.add_argument("-f", "--format", choices=["CNF1", "CNF2", "XNF1", "XNF2"], required=True,
+    parser.add_argument("-f", "--format", choices=FORMATS, required=True,
                         help="Output format and variant (e.g., CNF1, XNF2)")
-    
+
     # Parameter options
-    parser.add_argument("--cc", type=int, default=3, 
+    parser.add_argument("--cc", type=int, default=3,
                         help="Cardinality encoding (for PySAT or XNF). Default: 3")
-    parser.add_argument("--pb", type=int, 
+    parser.add_argument("--pb", type=int,
                         help="Pseudo-Boolean encoding (required for CNF models).")
-    parser.add_argument("--w_override", type=int, 
+    parser.add_argument("--w_override", type=int,
                         help="Override the target weight w from the input file.")
-    
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Processes encoding the CNF rows in parallel (0: all cores). Default: 1")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write CNF clauses to disk as they are encoded instead of building the formula in memory.")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild the model even if the manifest says it is up to date.")
+    parser.add_argument("--compress", choices=COMPRESSIONS,
+                        help="Compress the generated files (their name gets the matching extension).")
+
     return parser.parse_args()
 
+def seed_manifest(seed, force=False):
+    """Manifest of the models generated under Challenges/seed_<seed>."""
+    return Manifest(f"Challenges/seed_{seed}", force=force)
+
+def generate_cnf(input_file, variant, n, seed, w, H_transpose, s_transpose, cc, pb, stream=False, workers=1, var_sets=None,
+                 manifest=None, digest=None, compression=None):
+    """
+    Build a CNF model of a parsed instance and write it to its output file.
+
+    Args:
+        input_file (str): Path to the instance file (names the output).
+        variant (str): '1' or '2'.
+        n, seed, w, H_transpose, s_transpose: The instance, as returned by parse_input_file.
+        cc (int): Cardinality encoding.
+        pb (int): Pseudo-Boolean encoding.
+        stream (bool): Write the clauses as they are encoded.
+        workers (int or None): Processes encoding the rows.
+        var_sets (tuple or None): (V, K) from build_var_sets, shared between models of the same instance.
+        manifest (Manifest or None): Skip the model if it is up to date in this manifest, and record it otherwise.
+        digest (str): file_digest of the instance, required with a manifest.
+        compression (str or None): Compression of the output (see core.compress).
+
+    Returns:
+        output_file (str or None): Path of the CNF file, None if it was up to date.
+    """
+    output_file = cnf_output_path(input_file, cc, pb, seed, variant, compression)
+    if manifest is not None:
+        key = build_key(digest, format=f"CNF{variant}", w=w, cc=cc, pb=pb, pysat=pysat.__version__)
+        if manifest.is_fresh(output_file, key):
+            log(f"CNF{variant} model is up to date: {output_file}, skipping generation.")
+            return None
+
+    log(f"Building CNF Variant {variant}...")
+    build = build_CNF1 if variant == "1" else build_CNF2
+
+    if stream:
+        # Peak memory is bounded by one row's encoding, the header is patched on close
+        with DimacsWriter(output_file) as writer:
+            build(n, w, H_transpose, s_transpose, cc, pb, cnf=writer, workers=workers, var_sets=var_sets)
+        log(f"CNF clauses have been streamed to {output_file}")
+    else:
+        cnf = build(n, w, H_transpose, s_transpose, cc, pb, workers=workers, var_sets=var_sets)
+
+        # Output folder and filename handled by write_cnf_to_file utility
+        output_file = write_cnf_to_file(input_file, cc, pb, cnf, seed, variant, compression)
+    if manifest is not None:
+        manifest.record(output_file, key)
+    log(f"CNF{variant} model generated successfully.")
+    return output_file
+
+def anf_output_path(input_file, seed, compression=None):
+    """Path of the intermediate ANF file of an instance (its folder is created if needed)."""
+    anf_dir = f"Challenges/seed_{seed}/ANF"
+    os.makedirs(anf_dir, exist_ok=True)
+    input_basename = os.path.splitext(os.path.basename(input_file))[0]
+    return with_compression(os.path.join(anf_dir, f"{input_basename}.anf"), compression)
+
+def generate_xnf(input_file, variant, n, seed, w, H_transpose, s_transpose, cc, manifest=None, digest=None, compression=None):
+    """
+    Build an XNF model of a parsed instance, creating the intermediate ANF file if needed.
+
+    With a manifest (and the file_digest of the instance), the ANF file and the model are
+    only rebuilt when they are out of date. Without one, both are always written.
+    With a compression, both files are compressed (see core.compress).
+
+    Returns:
+        xnf_filename (str or None): Path of the XNF file, None if it was up to date.
+    """
+    # Setup directory structure
+    xnf_dir = f"Challenges/seed_{seed}/XNF{variant}/encoding_{cc}"
+    os.makedirs(xnf_dir, exist_ok=True)
+
+    input_basename = os.path.splitext(os.path.basename(input_file))[0]
+    anf_filename = anf_output_path(input_file, seed, compression)
+    xnf_filename = with_compression(os.path.join(xnf_dir, f"{input_basename}.cnf"), compression)
+
+    if manifest is not None:
+        anf_key = build_key(digest, format="ANF")
+        key = build_key(digest, format=f"XNF{variant}", w=w, cc=cc, pysat=pysat.__version__)
+        if manifest.is_fresh(xnf_filename, key) and manifest.is_fresh(anf_filename, anf_key):
+            log(f"XNF{variant} model is up to date: {xnf_filename}, skipping generation.")
+            return None
+
+    log(f"Building XNF Variant {variant} for seed {seed}...")
+
+    # Generate ANF (Algebraic Normal Form) unless it is up to date
+    if manifest is None or not manifest.is_fresh(anf_filename, anf_key):
+        log(f"Creating intermediate ANF file at: {anf_filename}")
+        process_matrix_and_write_to_file(n, H_transpose, s_transpose, anf_filename)
+        if manifest is not None:
+            manifest.record(anf_filename, anf_key)
+    else:
+        log(f"ANF is up to date: {anf_filename}, skipping generation.")
+
+    # Build XNF
+    if variant == "1":
+        build_XNF1(n, w, anf_filename, xnf_filename, cc)
+    else:
+        build_XNF2(n, w, anf_filename, xnf_filename, cc)
+
+    if manifest is not None:
+        manifest.record(xnf_filename, key)
+    log(f"XNF{variant} model generated at: {xnf_filename}")
+    return xnf_filename
+
+def generate_models(input_file, formats, ccs, pbs, w_override=None, force=False, compression=None):
+    """
+    Generate every requested model of one instance, parsing it only once.
+
+    The V/K sets are shared by all CNF models, the ANF file by all XNF models, and the
+    global cardinality encoding comes from the on-disk cache after its first use.
+    Models that are up to date in the manifest of the seed folder are skipped.
+
+    Args:
+        input_file (str): Path to the instance file.
+        formats (list of str): Formats among FORMATS.
+        ccs (list of int): Cardinality encodings.
+        pbs (list of int): Pseudo-Boolean encodings (used by the CNF formats).
+        w_override (int or None): Target weight replacing the one of the instance.
+        force (bool): Rebuild the models that are up to date.
+        compression (str or None): Compression of the generated files (see core.compress).
+
+    Returns:
+        list of str: Paths of the files written.
+    """
+    n, seed, w, H_transpose, s_transpose = parse_input_file(input_file)
+    if w_override is not None:
+        w = w_override
+    manifest = seed_manifest(seed, force)
+    digest = file_digest(input_file)
+
+    outputs = []
+    var_sets = None
+    for fmt in formats:
+        variant = fmt[-1]
+        for cc in ccs:
+            if fmt.startswith("CNF"):
+                if var_sets is None:
+                    var_sets = build_var_sets(H_transpose, s_transpose, n, w)
+                for pb in pbs:
+                    outputs.append(generate_cnf(input_file, variant, n, seed, w, H_transpose, s_transpose, cc, pb,
+                                                var_sets=var_sets, manifest=manifest, digest=digest, compression=compression))
+            else:
+                outputs.append(generate_xnf(input_file, variant, n, seed, w, H_transpose, s_transpose, cc,
+                                            manifest=manifest, digest=digest, compression=compression))
+    return [output for output in outputs if output is not None]
+
+def batch_main(argv):
+    """Generates every format x encoding combination for many instances over a process pool."""
+    parser = argparse.ArgumentParser(prog=f"{os.path.basename(sys.argv[0])} --batch",
+                                     description="Generate CNF/XNF models for many instances and encodings in parallel.")
+    parser.add_argument("inputs", nargs="+", help="Instance files, directories or glob patterns (e.g. 'Challenges/seed_*/SD')")
+    parser.add_argument("-f", "--formats", type=lambda spec: parse_list(spec), required=True,
+                        help=f"Comma-separated formats among {','.join(FORMATS)}")
+    parser.add_argument("--cc", type=lambda spec: parse_list(spec, int), default=[3],
+                        help="Comma-separated cardinality encodings. Default: 3")
+    parser.add_argument("--pb", type=lambda spec: parse_list(spec, int),
+                        help="Comma-separated pseudo-Boolean encodings (required for CNF models).")
+    parser.add_argument("--w_override", type=int, help="Override the target weight w of every instance.")
+    parser.add_argument("-j", "--workers", type=int, help="Number of worker processes. Default: number of CPUs")
+    parser.add_argument("--force", action="store_true", help="Rebuild the models that are up to date in the manifests.")
+    parser.add_argument("--compress", choices=COMPRESSIONS, help="Compress the generated files (their name gets the matching extension).")
+    args = parser.parse_args(argv)
+
+    unknown = [fmt for fmt in args.formats if fmt not in FORMATS]
+    if unknown:
+        parser.error(f"unknown formats: {', '.join(unknown)}")
+    if any(fmt.startswith("CNF") for fmt in args.formats) and not args.pb:
+        parser.error("--pb is required for CNF models.")
+
+    input_files = expand_inputs(args.inputs)
+    log(f"{len(input_files)} instances, formats {','.join(args.formats)}, cc {args.cc}, pb {args.pb}")
+    results = run_batch(generate_models, input_files, (args.formats, args.cc, args.pb or [], args.w_override, args.force, args.compress), workers=args.workers)
+    if any(result.error is not None for result in results):
+        sys.exit(1)
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        batch_main(sys.argv[2:])
+        return
+
     args = parse_args()
 
     # Check if input file exists before processing
@@ -46,53 +241,26 @@ def main():
         log(f"Overriding weight: w={w} -> w={args.w_override}")
         w = args.w_override
 
-    # Handle CNF Formats 
+    # Up-to-date models are skipped unless --force is given
+    manifest = seed_manifest(seed, args.force)
+    digest = file_digest(args.input_file)
+
+    # Handle CNF Formats
     if args.format.startswith("CNF"):
         if args.pb is None:
             log("Pseudo-Boolean encoding (--pb) is required for CNF models.", "ERROR")
             sys.exit(1)
-        
-        variant = args.format[-1]  # Extract '1' or '2' from the format string
-        log(f"Building CNF Variant {variant}...")
-        
-        if variant == "1":
-            cnf = build_CNF1(n, w, H_transpose, s_transpose, args.cc, args.pb)
-        else:
-            cnf = build_CNF2(n, w, H_transpose, s_transpose, args.cc, args.pb)
 
-        # Output folder and filename handled by write_cnf_to_file utility
-        write_cnf_to_file(args.input_file, args.cc, args.pb, cnf, seed, variant)
-        log(f"CNF{variant} model generated successfully.")
+        variant = args.format[-1]  # Extract '1' or '2' from the format string
+        generate_cnf(args.input_file, variant, n, seed, w, H_transpose, s_transpose, args.cc, args.pb,
+                     stream=args.stream, workers=args.workers or None, manifest=manifest, digest=digest,
+                     compression=args.compress)
 
     # Handle XNF Formats
     elif args.format.startswith("XNF"):
         variant = args.format[-1]
-        log(f"Building XNF Variant {variant} for seed {seed}...")
-
-        # Setup directory structure
-        anf_dir = f"Challenges/seed_{seed}/ANF"
-        xnf_dir = f"Challenges/seed_{seed}/XNF{variant}/encoding_{args.cc}"
-        os.makedirs(anf_dir, exist_ok=True)
-        os.makedirs(xnf_dir, exist_ok=True)
-
-        input_basename = os.path.splitext(os.path.basename(args.input_file))[0]
-        anf_filename = os.path.join(anf_dir, f"{input_basename}.anf")
-        xnf_filename = os.path.join(xnf_dir, f"{input_basename}.cnf")
-
-        # Generate ANF (Algebraic Normal Form) if it doesn't exist
-        if not os.path.exists(anf_filename):
-            log(f"Creating intermediate ANF file at: {anf_filename}")
-            process_matrix_and_write_to_file(n, H_transpose, s_transpose, anf_filename)
-        else:
-            log(f"ANF already exists: {anf_filename}, skipping generation.")
-
-        # Build XNF 
-        if variant == "1":
-            build_XNF1(n, w, anf_filename, xnf_filename, args.cc)
-        else:
-            build_XNF2(n, w, anf_filename, xnf_filename, args.cc)
-
-        log(f"XNF{variant} model generated at: {xnf_filename}")
+        generate_xnf(args.input_file, variant, n, seed, w, H_transpose, s_transpose, args.cc, manifest=manifest, digest=digest,
+                     compression=args.compress)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
 
 import sys
-import random
 import os
 import math
+import argparse
+
+# Make the shared 'core' package importable when the script is run from this directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.generate import bit_stream, write_bit_rows, generate_grid, parse_range
 
 def eprint(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
@@ -14,6 +19,9 @@ def usage():
     eprint(" - 'seed' is the random seed value.")
     eprint("This script generates an instance of the syndrome decoding problem.")
     eprint("The instance will be saved in 'Challenges/seed_${seed}/SD/SD_n_seed'.")
+    eprint("To generate a whole grid of instances in parallel, use:")
+    eprint(" --grid <n_range> <seed_range> [-j workers] [--legacy]")
+    eprint("where ranges are given as 'start:stop[:step]' (inclusive) or 'a,b,c'.")
 
 def dGV(n, k):
     d = 0
@@ -22,36 +30,57 @@ def dGV(n, k):
     while aux >= 0:
         aux -= b
         d += 1
-        b *= (n - d + 1)
-        b /= d
+        b = b * (n - d + 1) // d  # exact binomial coefficient, floats overflow for large n
     return d 
 
-def main(n, seed):
-    w = math.ceil(1.05 * dGV(n, n // 2))
-    random.seed(seed)
-    text = ""
-    text += "# n\n" + str(n) + "\n"
-    text += "# seed\n" + str(seed) + "\n"
-    text += "# w\n" + str(w) + "\n"
-    text += "# H^transpose (each line corresponds to column of H, the identity part is omitted)\n"
-
-    for _ in range(n - n // 2):
-        line = "".join(str(random.randint(0, 1)) for _ in range(n // 2))
-        text += line + "\n"
+def main(n, seed, legacy=True):
+    """
+    Generate the instance (n, seed) and return its path.
 
-    text += "# s^transpose\n"
-    s_line = "".join(str(random.randint(0, 1)) for _ in range(n // 2))
-    text += s_line + "\n"
+    Rows are streamed to the file as they are drawn, so memory stays bounded for large n.
+    With legacy=True the instance is identical to the one produced by random.seed(seed);
+    otherwise bits come from the NumPy stream of (n, seed) (see core.generate.instance_rng).
+    """
+    w = math.ceil(1.05 * dGV(n, n // 2))
+    m = n // 2
+    stream = bit_stream(n, seed, legacy=legacy)
 
     # New directory path
     directory = f"Challenges/seed_{seed}/SD/"
     os.makedirs(directory, exist_ok=True)
 
     filename = f"{directory}SD_{n}_{seed}"
-    with open(filename, "w") as file:
-        file.write(text)
+    with open(filename, "wb") as file:
+        header = ""
+        header += "# n\n" + str(n) + "\n"
+        header += "# seed\n" + str(seed) + "\n"
+        header += "# w\n" + str(w) + "\n"
+        header += "# H^transpose (each line corresponds to column of H, the identity part is omitted)\n"
+        file.write(header.encode("ascii"))
+
+        # The n - m columns of P, then the syndrome, drawn in this order
+        write_bit_rows(file, stream, n - m, m)
+        file.write(b"# s^transpose\n")
+        write_bit_rows(file, stream, 1, m)
+    return filename
+
+def grid_main(argv):
+    parser = argparse.ArgumentParser(prog=f"{os.path.basename(sys.argv[0])} --grid",
+                                     description="Generate a grid of syndrome decoding instances in parallel.")
+    parser.add_argument("n_range", type=parse_range, help="Sizes, e.g. '100:1000:100' or '10,20,30'")
+    parser.add_argument("seed_range", type=parse_range, help="Seeds, e.g. '0:49'")
+    parser.add_argument("-j", "--workers", type=int, help="Number of worker processes. Default: number of CPUs")
+    parser.add_argument("--legacy", action="store_true",
+                        help="Reproduce the instances of random.seed(seed) instead of the NumPy streams")
+    args = parser.parse_args(argv)
+
+    generated = generate_grid(main, args.n_range, args.seed_range, workers=args.workers, legacy=args.legacy)
+    print(f"{len(generated)} instances generated.")
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--grid":
+        grid_main(sys.argv[2:])
+        exit(0)
     if len(sys.argv) != 3:
         usage()
         exit(1)
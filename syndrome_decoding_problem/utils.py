@@ -1,6 +1,13 @@
 import os
 import re
-import subprocess
+import sys
+
+# Make the shared 'core' package importable when scripts are run from this directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.instance import read_text_instance
+from core.checker import verify_systematic
+from core.compress import open_text, with_compression
 
 def parse_input_file(file_name):
     """
@@ -13,33 +20,16 @@ def parse_input_file(file_name):
         n (int): Total number of variables.
         seed (int): Random seed used to generate the instance.
         w (int): Maximum Hamming weight.
-        H_transpose (list of str): The transposed parity-check matrix.
+        H_transpose (GF2Matrix): The transposed parity-check matrix, one row per equation.
         s_transpose (str): The syndrome vector.
     """
 
-    with open(file_name, 'r') as f:
-        lines = f.readlines()
-
-    n = int(lines[1].strip())  # Extract n
-    # print(f"n = {n}")
-
-    seed = int(lines[3].strip())  # Extract the seed
-    # print(f"seed = {seed}")
+    # Memory-mapped parse, the matrix block is packed without per-line Python objects
+    instance = read_text_instance(file_name)
+    if instance.kind != "SD":
+        raise ValueError(f"{file_name} is not a syndrome decoding instance.")
 
-    w = int(lines[5].strip())  # Extract target weight w
-    # print(f"w = {w}")
-
-    H_transpose = [line.strip() for line in lines[7:7 + n//2]]  # Read H^transpose matrix
-    H_transpose = [''.join(row) for row in zip(*H_transpose)]  # Transpose the matrix
-    # print("\nH^transpose:")
-    # for row in H_transpose:
-    #     print(row)
-
-    s_transpose = lines[7 + n//2 + 1].strip()  # Read s^transpose (syndrome)
-    # print("\ns^transpose:")
-    # print(s_transpose, "\n")
-    
-    return n, seed, w, H_transpose, s_transpose
+    return instance.n, instance.seed, instance.w, instance.H_transpose, instance.s_transpose
 
 
 def build_var_sets(H_transpose, s_transpose, n, w):
@@ -47,7 +37,7 @@ def build_var_sets(H_transpose, s_transpose, n, w):
     Construct the sets V and K.
     
     Args:
-        H_transpose (list of str): The transposed parity-check matrix (H^T), one string per row.
+        H_transpose (GF2Matrix): The transposed parity-check matrix (H^T), one row per equation.
         s_transpose (str): The syndrome vector as a string of 0s and 1s.
         n (int): Total number of variables.
         w (int): Parameter controlling the maximum Hamming weight.
@@ -59,11 +49,9 @@ def build_var_sets(H_transpose, s_transpose, n, w):
     
     # Build V_{E_i} sets for each equation
     V = []
-    for i, row in enumerate(H_transpose):
+    for i, support in enumerate(H_transpose.row_supports()):
         V_i = [i + 1]  # Identity variable
-        for j, val in enumerate(row):
-            if val == '1':
-                V_i.append(j + int(n / 2) + 1)
+        V_i.extend((support + H_transpose.nrows + 1).tolist())
         V.append(V_i)
 
     # Build K_{E_i} sets (valid cardinalities mod 2)
@@ -77,28 +65,54 @@ def build_var_sets(H_transpose, s_transpose, n, w):
     return V, K
 
 
-def write_cnf_to_file(input_file, cc_encoding, pb_encoding, cnf, seed, variant):
+def cnf_output_path(input_file, cc_encoding, pb_encoding, seed, variant, compression=None):
     """
-    Save CNF clauses to a file in a structured output directory.
+    Path of the CNF file of an instance in the structured output directory (created if needed).
 
     Args:
         input_file (str): Path to the original input file.
         cc_encoding (str): Cardinality constraint encoding to use.
         pb_encoding (str):  Pseudo-Boolean constraint encoding to use.
-        cnf (CNF object): A CNF object.
         seed (int): Random seed used to generate the instance.
+        variant (str): CNF variant ('1' or '2').
+        compression (str or None): Compression of the file (see core.compress), None for plain text.
+
+    Returns:
+        output_file (str): Path of the CNF file.
     """
 
     # Generate the output file name based on input and encoding types
     file_name, _ = os.path.splitext(input_file)
     output_file = f"./Challenges/seed_{seed}/CNF{variant}/PB_{pb_encoding}/encoding_{cc_encoding}/{file_name.split('/')[-1]}.cnf"
+    output_file = with_compression(output_file, compression)
     
     os.makedirs(os.path.dirname(output_file), exist_ok=True)  # Create directories if they don't exist
+    return output_file
+
+
+def write_cnf_to_file(input_file, cc_encoding, pb_encoding, cnf, seed, variant, compression=None):
+    """
+    Save CNF clauses to a file in a structured output directory.
+
+    Args:
+        input_file (str): Path to the original input file.
+        cc_encoding (str): Cardinality constraint encoding to use.
+        pb_encoding (str):  Pseudo-Boolean constraint encoding to use.
+        cnf (ClauseArena or CNF): The formula.
+        seed (int): Random seed used to generate the instance.
+        compression (str or None): Compression of the file (see core.compress), None for plain text.
+
+    Returns:
+        output_file (str): Path of the CNF file.
+    """
+
+    output_file = cnf_output_path(input_file, cc_encoding, pb_encoding, seed, variant, compression)
     
     # Save CNF clauses to the file
     cnf.to_file(output_file)
     
     print(f"CNF clauses have been saved to {output_file}")
+    return output_file
 
 
 def extract_SD_n(filename):
@@ -116,38 +130,24 @@ def extract_SD_n(filename):
 
 
 
-def verify_sol(input_file, solution) :
+def verify_sol(H_transpose, s_transpose, w, solution):
     """
     Verifies the correctness of a candidate solution for a Syndrome Decoding Problem (SDP)
-    by calling an external checker script.
+    in process, on the already-parsed instance.
 
     Args:
-        input_file (str): Path to the input file describing the SDP instance.
+        H_transpose (GF2Matrix): The transposed parity-check matrix returned by parse_input_file.
+        s_transpose (str): The syndrome vector.
+        w (int): Maximum Hamming weight.
         solution (str): A binary string representing the candidate solution.
 
     Returns:
-        bool: True if the solution is correct according to the checker, False otherwise.
+        Verification: Verdict ('valid'), weight, computed syndrome and failure reason of the candidate.
     """
 
-    if solution:
-        try:
-            # Call the external Python script to check the solution
-            result = subprocess.run(
-                ['python3', 'check_SDP_solution.py', input_file, solution],
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True
-            )
-            output = result.stdout.strip()
-
-            # Check if the checker script confirms correctness
-            if "The candidate solution is correct." in output:
-                return True
-            else:
-                return False
-        except subprocess.CalledProcessError as e:
-            # If the subprocess fails (e.g., script crashes), print the error
-            print("Error during external verification:", e.stderr)
-    else:
+    if not solution:
         print("No solution found.")
+    return verify_systematic(H_transpose, solution, s_transpose, w)
 
 
 
@@ -158,7 +158,7 @@ def process_matrix_and_write_to_file(n, H_transpose, s_transpose, anf_filename):
 
     Args:
         n (int): Total number of variables.
-        H_transpose (list of str): Transposed parity-check matrix.
+        H_transpose (GF2Matrix): Transposed parity-check matrix.
         s_transpose (str): Syndrome vector.
         anf_filename (str): Path to the output file in ANF format.
     """
@@ -171,12 +171,10 @@ def process_matrix_and_write_to_file(n, H_transpose, s_transpose, anf_filename):
     lines_to_write.append(header)
 
     # Construct each equation line in ANF format
-    for i in range(m):
+    for i, support in enumerate(H_transpose.row_supports()):
         line = [str(i + 1)] # Start with the variable index of the identity part
         # For each 1 in H_transpose[i][j], add the corresponding variable index
-        for j in range(m):
-            if H_transpose[i][j] == '1':
-                line.append(str(j + m + 1))
+        line.extend(map(str, (support + m + 1).tolist()))
         
         # If the syndrome bit is 0, add the constant term 'T' (i.e., True constant)
         if s_transpose[i] == '0':
@@ -188,7 +186,7 @@ def process_matrix_and_write_to_file(n, H_transpose, s_transpose, anf_filename):
         lines_to_write.append(f"x {' '.join(line)}")  
 
     # Write all lines to the output ANF file
-    with open(anf_filename, 'w') as file:
+    with open_text(anf_filename, 'w') as file:
         for line in lines_to_write:
             file.write(line + '\n')
 